@@ -0,0 +1,86 @@
+"""
+每幀有預算的鬼 AI 排程器
+
+鬼撞牆時才會跑 _choose_path_variant（BFS），多隻鬼同一幀撞牆時成本會疊在一起。
+排程器限制每幀花在路徑規劃上的時間：
+- 預算內：照常規劃
+- 預算用完：鬼保留上一個決策（停在原地一幀），下一幀優先補上
+- 每幀至少讓「等最久的那隻鬼」規劃一次，避免永遠輪不到
+  （鬼被移出地圖時 forget() 把它從等待佇列拿掉，否則佇列頭卡著一隻不會再出現的鬼）
+
+另外統計規劃後仍沒有路線、退回四方向隨機測試的次數（依鬼的顏色；橘鬼有一半是刻意亂走）。
+"""
+from collections import OrderedDict
+
+
+class AIScheduler:
+    def __init__(self, budget_us=2000):
+        # budget_us = None → 不限制（每次都允許規劃）
+        self.budget_ns = None if budget_us is None else int(budget_us * 1000)
+
+        self._spent_ns = 0
+        self._forced = False
+        self._waiting = OrderedDict()   # 被延後的鬼的 entity_id（依延後順序）
+
+        # 調校用統計
+        self.frames = 0
+        self.planned = 0          # 實際執行的規劃次數
+        self.deferred = 0         # 因預算不足被延後的決策數
+        self.overruns = 0         # 規劃總時間超過預算的幀數
+        self.max_frame_ns = 0     # 單幀最長規劃時間
+        self.fallbacks = {}       # 鬼的顏色 → 規劃後仍退回四方向測試的次數
+
+    def begin_frame(self):
+        self._spent_ns = 0
+        self._forced = False
+
+    def end_frame(self):
+        self.frames += 1
+        if self.budget_ns is not None and self._spent_ns > self.budget_ns:
+            self.overruns += 1
+        if self._spent_ns > self.max_frame_ns:
+            self.max_frame_ns = self._spent_ns
+
+    def allow(self, ghost):
+        """這隻鬼這一幀能不能做路徑規劃"""
+        if self.budget_ns is None:
+            return True
+
+        key = ghost.entity_id
+        if self._spent_ns < self.budget_ns:
+            self._waiting.pop(key, None)
+            return True
+
+        # 預算已用完：每幀仍讓等最久的那隻鬼規劃一次
+        if not self._forced and self._waiting and next(iter(self._waiting)) == key:
+            self._forced = True
+            self._waiting.popitem(last=False)
+            return True
+
+        self.deferred += 1
+        self._waiting.setdefault(key, None)
+        return False
+
+    def forget(self, ghost):
+        """鬼被移出地圖（被吃掉、換地圖）時呼叫"""
+        self._waiting.pop(ghost.entity_id, None)
+
+    def charge(self, elapsed_ns):
+        """記錄一次規劃花費的時間"""
+        self._spent_ns += elapsed_ns
+        self.planned += 1
+
+    def fallback(self, ghost):
+        """記錄一次規劃沒有給出下一步、改用四方向測試"""
+        color = ghost.ghost_color
+        self.fallbacks[color] = self.fallbacks.get(color, 0) + 1
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "planned": self.planned,
+            "deferred": self.deferred,
+            "overruns": self.overruns,
+            "max_frame_us": self.max_frame_ns / 1000,
+            "fallbacks": sum(self.fallbacks.values()),
+        }
@@ -0,0 +1,337 @@
+"""
+鬼 AI 移到另一個行程（多核心時釋放繪圖 / 更新迴圈；GIL 讓執行緒幫不上忙）
+
+主行程每 tick 結束時把玩家與每隻鬼的位置 / 方向 / 狀態寫進 shared memory（導覽格只在 mode.nav_version
+變了時才重寫，worker 也只在版本變了時才重建格子），
+worker 行程讀取後用自己的「影子鬼」（ghost_ai.Ghost，保存 AI 模式、計時器、巡邏點、卡住偵測）
+算出每隻鬼下一個要轉彎的格子與方向，寫回 shared memory；主行程下一 tick 才讀到（慢一 tick），
+鬼走到那一格正中心時照著轉（Ghost.follow），沒有對應的決策就停一 tick 等 worker。
+
+輸入、輸出都是雙緩衝（tick 奇偶各一份），每份以 stamp 當 seqlock：寫入前設 -1、寫完設 tick，
+讀的一方複製後再確認 stamp 沒變，避免讀到寫一半的資料。
+shared memory 依鬼數與地圖格數配置；換到更大的地圖 / 更多鬼時主行程另開一塊更大的，通知 worker 改用。
+
+    worker = AIWorker(seed=0)
+    worker.attach(mode)     # 之後 mode.update() 改由 worker 決策
+    ...
+    worker.close()
+
+注意：決策時機取決於兩個行程的排程，鬼的行為無法逐 tick 重現（不要和雜湊串流一起用）；
+AI 狀態在 worker 裡，快照 / 事件紀錄看不到鬼的 AI 模式變化。
+"""
+import multiprocessing
+import random
+import struct
+from multiprocessing import shared_memory
+
+from ai_scheduler import AIScheduler
+from character import HALF_TILE
+from constants import HPA_WARM_PER_TICK, TILE_SIZE
+from ghost_ai import Ghost
+from grid_map import GridMap, compute_exits
+from pathfinding import make_pathfinder
+from snapshot import GHOST_COLORS, GHOST_STATES
+
+GHOST_CAPACITY = 256          # shared memory 一開始容納的鬼數 / 地圖格數，不夠時加大
+CELL_CAPACITY = 128 * 128
+WRITING = -1      # stamp：正在寫入
+
+_STAMP = struct.Struct("<q")
+# 輸入：stamp, session, 導覽格版本, 寬, 高, 鬼數, 玩家 x, y, dx, dy ＋ 每隻鬼 ＋ 導覽格
+_IN_HEAD = struct.Struct("<qqqHHHdddd")
+_GHOST_IN = struct.Struct("<qddbbBB")      # entity_id, x, y, dx, dy, 顏色, 狀態
+# 輸出：stamp, session, 決策數, 累計規劃次數, 累計退回四方向測試次數 ＋ 每隻鬼
+_OUT_HEAD = struct.Struct("<qqHqq")
+_DECISION = struct.Struct("<qibb")         # entity_id, 格子索引（-1 = 還不用轉彎）, dx, dy
+
+
+
+def _layout(ghosts, cells):
+    """(輸入兩份的起點, 輸出兩份的起點, 導覽格在輸入裡的位移, 總大小)；tick 奇偶各一份"""
+    in_size = _IN_HEAD.size + ghosts * _GHOST_IN.size + cells
+    out_size = _OUT_HEAD.size + ghosts * _DECISION.size
+    return ((0, in_size), (2 * in_size, 2 * in_size + out_size),
+            _IN_HEAD.size + ghosts * _GHOST_IN.size, 2 * in_size + 2 * out_size)
+
+
+class AIWorker:
+    def __init__(self, seed=None):
+        # spawn：不把主行程的 GL context / 視窗 fork 進 worker
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, seed), daemon=True)
+        self.process.start()
+        child.close()
+
+        self.shm = None
+        self._allocate(GHOST_CAPACITY, CELL_CAPACITY)
+
+        self._session = 0
+        self._last = 0
+        self._decisions = {}
+        self._nav_written = [None, None]    # 兩份輸入裡目前存的導覽格版本
+
+        # 調校用統計
+        self.submitted = 0     # 送出的 tick 數
+        self.received = 0      # 讀到的新決策批次
+        self.lag_ticks = 0     # 讀到時的落後 tick 數總和
+        self.stalls = 0        # 鬼停下來等決策的次數（Ghost.follow 回傳 False）
+        self.planned = 0       # worker 端累計規劃次數
+        self.fallbacks = 0     # worker 端累計退回四方向測試次數
+        self.resizes = 0       # shared memory 加大的次數
+
+    def _allocate(self, ghosts, cells):
+        """
+        配置（或換成更大的）shared memory 並通知 worker。舊的那塊立刻 unlink：worker 已經 map 的照樣能讀到換過去為止，
+        還沒來得及開的（剛啟動就加大）worker 會跳過，改用佇列裡接著的這一塊
+        """
+        layout = _layout(ghosts, cells)
+        shm = shared_memory.SharedMemory(create=True, size=layout[3])
+        shm.buf[:layout[3]] = bytes(layout[3])
+        self._conn.send(("shm", shm.name, ghosts, cells))
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+        self.shm = shm
+        self._ghost_capacity, self._cell_capacity = ghosts, cells
+        self._in_offsets, self._out_offsets, self._nav_offset, _ = layout
+        self._nav_written = [None, None]
+
+    def attach(self, mode):
+        """讓 mode 的鬼改由 worker 決策（換模式時再呼叫一次，worker 會丟掉舊的影子鬼）"""
+        self._session += 1
+        self._last = 0
+        self._decisions = {}
+        self._nav_written = [None, None]    # 新模式的 nav_version 從頭算
+        self._conn.send(("session", self._session, mode.pathfinder.name))
+        mode.ai_worker = self
+
+    # ---------------- 主行程端 ----------------
+
+    def submit(self, mode):
+        """tick 結束時呼叫：寫入這一 tick 的狀態並通知 worker"""
+        tick = mode.tick
+        grid = mode.map
+        ghosts = mode.ghosts
+        n = len(ghosts)
+        cells = grid.width * grid.height
+        if n > self._ghost_capacity or cells > self._cell_capacity:
+            self._allocate(max(n, self._ghost_capacity), max(cells, self._cell_capacity))
+            self.resizes += 1
+
+        buf = self.shm.buf
+        half = tick % 2
+        offset = self._in_offsets[half]
+        version = mode.nav_version
+        p = mode.player
+        _IN_HEAD.pack_into(buf, offset, WRITING, self._session, version, grid.width, grid.height, n,
+                           p.center_x, p.center_y, p.change_x, p.change_y)
+        pos = offset + _IN_HEAD.size
+        pack = _GHOST_IN.pack_into
+        states = GHOST_STATES
+        for g in ghosts:
+            pack(buf, pos, g.entity_id, g.center_x, g.center_y, g.change_x, g.change_y,
+                 g._color_id, states.index(g.state))
+            pos += _GHOST_IN.size
+        if self._nav_written[half] != version:
+            nav = offset + self._nav_offset
+            buf[nav:nav + cells] = grid.nav
+            self._nav_written[half] = version
+        _STAMP.pack_into(buf, offset, tick)
+
+        self._conn.send(("tick", self._session, tick))
+        self.submitted += 1
+
+    def poll(self, tick):
+        """tick 開始時呼叫：取最新一批決策（entity_id → (格子索引, dx, dy)）"""
+        buf = self.shm.buf
+        heads = sorted((_OUT_HEAD.unpack_from(buf, off), off) for off in self._out_offsets)
+        for (stamp, session, n, planned, fallbacks), offset in reversed(heads):
+            if session != self._session or stamp <= self._last:
+                continue
+            pos = offset + _OUT_HEAD.size
+            data = bytes(buf[pos:pos + n * _DECISION.size])
+            if _STAMP.unpack_from(buf, offset)[0] != stamp:
+                continue
+            self._last = stamp
+            self._decisions = {gid: (cell, dx, dy) for gid, cell, dx, dy in _DECISION.iter_unpack(data)
+                               if cell >= 0}
+            self.received += 1
+            self.lag_ticks += tick - stamp
+            self.planned, self.fallbacks = planned, fallbacks
+            break
+        return self._decisions
+
+    def close(self):
+        if self.process.is_alive():
+            self._conn.send(("stop",))
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.terminate()
+        self._conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "received": self.received,
+            "mean_lag_ticks": self.lag_ticks / max(self.received, 1),
+            "stalls": self.stalls,
+            "planned": self.planned,
+            "fallbacks": self.fallbacks,
+            "resizes": self.resizes,
+        }
+
+
+# ---------------- worker 行程端 ----------------
+
+def _upcoming_centre(g):
+    """鬼接下來會經過的格子中心（已經在中心、或還沒走到這格中心時就是目前這格）"""
+    cx = int(g.center_x // TILE_SIZE) * TILE_SIZE + HALF_TILE
+    cy = int(g.center_y // TILE_SIZE) * TILE_SIZE + HALF_TILE
+    if (g.center_x - cx) * g.change_x + (g.center_y - cy) * g.change_y > 0:
+        cx += g.change_x * TILE_SIZE
+        cy += g.change_y * TILE_SIZE
+    return cx, cy
+
+
+def _plan(g, grid, target, planner):
+    """
+    對「下一個會經過的格子中心」預先決策；同一格、同方向、同狀態只算一次
+    （和單行程一樣每個轉彎點只擲一次亂數）。回傳 (格子索引, dx, dy) 或 None（不用轉彎）
+    """
+    cx, cy = _upcoming_centre(g)
+    key = (cx, cy, g.change_x, g.change_y, g.state)
+    if key == g._planned_key:
+        return g._planned
+    x, y, dx, dy = g.center_x, g.center_y, g.change_x, g.change_y
+    g.center_x, g.center_y = cx, cy
+    decision = None
+    if g._blocked(grid, dx, dy):
+        g._choose_direction(grid, target[0], target[1], planner)
+        col = int(cx // TILE_SIZE)
+        row = grid.height - 1 - int(cy // TILE_SIZE)
+        decision = (row * grid.width + col, g.change_x, g.change_y)
+    g.center_x, g.center_y, g.change_x, g.change_y = x, y, dx, dy
+    g._planned_key = key
+    g._planned = decision
+    return decision
+
+
+def _worker_main(conn, seed):
+    if seed is not None:
+        random.seed(seed)
+    shm = None
+    buf = None
+    planner = AIScheduler(None)
+    session = 0
+    pathfinder = make_pathfinder("astar")
+    shadows = {}
+    grid = None
+    nav_version = None
+
+    try:
+        while True:
+            # 只處理最新的 tick；控制訊息照順序處理
+            tick = None
+            msg = conn.recv()
+            while True:
+                if msg[0] == "stop":
+                    return
+                if msg[0] == "shm":
+                    # 換成主行程新配置的那一塊；之前的 tick 在舊的那塊，丟掉
+                    buf = None
+                    if shm is not None:
+                        shm.close()
+                        shm = None
+                    try:
+                        shm = shared_memory.SharedMemory(name=msg[1])
+                    except FileNotFoundError:
+                        # 主行程已經換成更大的一塊（通知就在後面），這塊不用開
+                        tick = None
+                    else:
+                        buf = shm.buf
+                        in_offsets, out_offsets, nav_offset, _ = _layout(msg[2], msg[3])
+                        tick = None
+                elif msg[0] == "session":
+                    session = msg[1]
+                    pathfinder = make_pathfinder(msg[2])
+                    shadows = {}
+                    grid = None     # 下一個 tick 重建格子（新模式的 nav_version 從頭算），順便讓新的尋路後端 prepare
+                    tick = None
+                elif msg[1] == session:
+                    tick = msg[2]
+                if not conn.poll():
+                    break
+                msg = conn.recv()
+            if tick is None or buf is None:
+                continue
+
+            # 讀輸入（seqlock：複製完 stamp 沒變才算數）
+            offset = in_offsets[tick % 2]
+            stamp, _, version, width, height, n, px, py, pdx, pdy = _IN_HEAD.unpack_from(buf, offset)
+            if stamp != tick:
+                continue
+            pos = offset + _IN_HEAD.size
+            rows = list(_GHOST_IN.iter_unpack(buf[pos:pos + n * _GHOST_IN.size]))
+            # 導覽格只有版本變了才複製
+            rebuild = grid is None or version != nav_version or (grid.width, grid.height) != (width, height)
+            if rebuild:
+                pos = offset + nav_offset
+                nav = bytes(buf[pos:pos + width * height])
+            if _STAMP.unpack_from(buf, offset)[0] != tick:
+                continue
+
+            if rebuild:
+                grid = GridMap(width, height)
+                grid.nav[:] = nav
+                grid.exits[:] = compute_exits(grid.nav, width, height)
+                nav_version = version
+                pathfinder.prepare(grid.nav_rows, width, height)
+                for g in shadows.values():
+                    g.nav_grid = grid.nav_rows
+                    g.grid_width, g.grid_height = width, height
+                    g._planned_key = None
+
+            # 同步影子鬼
+            alive = {}
+            for gid, x, y, dx, dy, color, state in rows:
+                g = shadows.get(gid)
+                if g is None:
+                    g = Ghost(x - HALF_TILE, y - HALF_TILE, GHOST_COLORS[color])
+                    g.nav_grid = grid.nav_rows
+                    g.grid_width, g.grid_height = width, height
+                    g.pathfinder = pathfinder
+                    g._planned_key = None
+                    g._planned = None
+                g.center_x, g.center_y = x, y
+                g.change_x, g.change_y = dx, dy
+                g.state = GHOST_STATES[state]
+                alive[gid] = g
+            shadows = alive
+            group = list(shadows.values())
+
+            # 決策並寫回
+            offset = out_offsets[tick % 2]
+            _STAMP.pack_into(buf, offset, WRITING)
+            pos = offset + _OUT_HEAD.size
+            for gid, g in shadows.items():
+                g._all_ghosts = group
+                target = g.current_target(px, py, pdx, pdy)
+                d = _plan(g, grid, target, planner)
+                if d is None:
+                    _DECISION.pack_into(buf, pos, gid, -1, 0, 0)
+                else:
+                    _DECISION.pack_into(buf, pos, gid, *d)
+                pos += _DECISION.size
+            _OUT_HEAD.pack_into(buf, offset, WRITING, session, len(shadows),
+                                planner.planned, sum(planner.fallbacks.values()))
+            _STAMP.pack_into(buf, offset, tick)
+            pathfinder.warm(HPA_WARM_PER_TICK)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        buf = None
+        if shm is not None:
+            shm.close()
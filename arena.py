@@ -0,0 +1,151 @@
+"""
+多場遊戲同畫面（attract mode / 展示機台）：一個 GameWindow 裡同時跑 N 個 BaseMode
+
+- 共用：貼圖（arcade.load_texture 依路徑快取）與 texture atlas（所有 SpriteList 用 context 預設的同一張），
+  地圖庫（同一個 MapLibrary / mmap）—— 多開一場不會再載入一次；載入同一張地圖的場次共用唯讀的 tiles / exits 平面
+- 各自的狀態：模式物件（GridMap 的 nav / pellets 平面、sprite、計時器、AI 排程）、自動駕駛、分數
+- 更新：每幀從上一幀沒輪到的那場開始 round-robin，在 budget 內盡量讓每場走一個 tick；
+  超出預算的場次這一幀跳過、下一幀優先（每幀至少更新一場）
+- 繪圖：畫面切成格子，每場設定自己的 viewport 與投影後呼叫 mode.draw()
+
+    arena = Arena([ClassicMode, EndlessMode, WaveMode, DynamicWallsMode], autopilot="safe")
+    arena.update()          # on_update
+    arena.draw(window)      # on_draw
+
+注意：events / heatmap / checksum 是行程內的全域紀錄，只適合單場；多場時不要開啟。
+metrics 可以開：每場的 mode.metrics_session 是場次編號，gauge 依此分開，計數器跨場次累加。
+"""
+import math
+import time
+
+import arcade
+
+from autopilot import make_autopilot
+from constants import ARENA_FRAME_BUDGET_US, TILE_SIZE
+
+HUD_HEIGHT = TILE_SIZE     # 每格上方顯示分數的高度（世界座標）
+GAP = 4                    # 格子之間的間距（像素）
+
+
+class ArenaSession:
+    """一場遊戲：模式物件 + 自動駕駛；結束後自動開新的一場"""
+
+    def __init__(self, mode_cls, map_library=None, autopilot="safe", seed=None, index=0):
+        self.mode_cls = mode_cls
+        self.index = index        # 場次編號（metrics 的 session 標籤）
+        self.map_library = map_library
+        self.autopilot = make_autopilot(autopilot, seed) if autopilot else None
+        self.games = 0
+        self.best = 0
+        self.ticks = 0
+        self.text = None          # 第一次繪圖時才建立（建立 Text 需要 GL context）
+        self.mode = None
+        self.restart()
+
+    def restart(self):
+        self.mode = self.mode_cls(self.map_library)
+        self.mode.metrics_session = self.index
+        self.games += 1
+
+    def step(self):
+        mode = self.mode
+        if mode.finished:
+            self.best = max(self.best, mode.score)
+            self.restart()
+            mode = self.mode
+        if self.autopilot is not None:
+            self.autopilot.update(mode)
+        mode.update(1 / 60)
+        self.ticks += 1
+
+
+class Arena:
+    def __init__(self, mode_classes, map_library=None, autopilot="safe",
+                 budget_us=ARENA_FRAME_BUDGET_US, seed=None):
+        self.sessions = [
+            ArenaSession(cls, map_library, autopilot, None if seed is None else seed + i, i)
+            for i, cls in enumerate(mode_classes)
+        ]
+        self.budget_ns = None if budget_us is None else int(budget_us * 1000)
+        self._cursor = 0          # 下一幀第一個更新的場次
+
+        # 調校用統計
+        self.frames = 0
+        self.updates = 0          # 實際更新的場次 tick 數
+        self.skipped = 0          # 因預算不足跳過的場次 tick 數
+        self.last_frame_ns = 0
+        self.max_frame_ns = 0
+
+    # ---------------- 更新 ----------------
+
+    def update(self):
+        """每幀呼叫一次：round-robin 更新各場，超過預算就停（每幀至少一場）"""
+        sessions = self.sessions
+        n = len(sessions)
+        start = time.perf_counter_ns()
+        done = 0
+        while done < n:
+            if done and self.budget_ns is not None and time.perf_counter_ns() - start >= self.budget_ns:
+                break
+            sessions[(self._cursor + done) % n].step()
+            done += 1
+        self._cursor = (self._cursor + done) % n
+
+        elapsed = time.perf_counter_ns() - start
+        self.frames += 1
+        self.updates += done
+        self.skipped += n - done
+        self.last_frame_ns = elapsed
+        if elapsed > self.max_frame_ns:
+            self.max_frame_ns = elapsed
+
+    # ---------------- 繪圖 ----------------
+
+    def layout(self, width, height):
+        """每場的 viewport (x, y, w, h)：接近正方形的格子，維持地圖長寬比、置中"""
+        n = len(self.sessions)
+        cols = math.ceil(math.sqrt(n * width / height / 1.2)) or 1
+        cols = min(cols, n)
+        rows = math.ceil(n / cols)
+        cell_w = width // cols
+        cell_h = height // rows
+        rects = []
+        for i, s in enumerate(self.sessions):
+            world_w = s.mode.grid_width * TILE_SIZE
+            world_h = s.mode.grid_height * TILE_SIZE + HUD_HEIGHT
+            scale = min((cell_w - GAP) / world_w, (cell_h - GAP) / world_h)
+            w, h = int(world_w * scale), int(world_h * scale)
+            col, row = i % cols, i // cols
+            x = col * cell_w + (cell_w - w) // 2
+            y = height - (row + 1) * cell_h + (cell_h - h) // 2
+            rects.append((x, y, w, h))
+        return rects
+
+    def draw(self, window):
+        ctx = window.ctx
+        for s, rect in zip(self.sessions, self.layout(window.width, window.height)):
+            mode = s.mode
+            world_w = mode.grid_width * TILE_SIZE
+            world_h = mode.grid_height * TILE_SIZE
+            ctx.viewport = rect
+            ctx.projection_2d = (0, world_w, 0, world_h + HUD_HEIGHT)
+            mode.draw()
+            if s.text is None:
+                s.text = arcade.Text("", 4, 0, arcade.color.WHITE, 18)
+            s.text.value = f"{type(mode).__name__[:-4]}  {mode.score}  best {s.best}  #{s.games}"
+            s.text.y = world_h + 6
+            s.text.draw()
+        arcade.set_viewport(0, window.width, 0, window.height)
+
+    # ---------------- 統計 ----------------
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "frames": self.frames,
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "update_share": self.updates / max(self.updates + self.skipped, 1),
+            "last_frame_us": self.last_frame_ns / 1000,
+            "max_frame_us": self.max_frame_ns / 1000,
+        }
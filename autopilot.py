@@ -0,0 +1,184 @@
+"""
+自動駕駛玩家（無人值守的壓力 / 浸泡測試用）
+
+Autopilot 只透過 mode.set_player_direction() 操作玩家，和鍵盤、網路輸入走同一條路。
+每個 tick 呼叫 update(mode)；只有玩家進入新的格子（或卡住）時才做一次決策，
+決策是在導覽格上的一次 BFS（19x21 約 400 格），其餘 tick 幾乎沒有成本。
+
+- RandomAutopilot ：每次進入新格子隨機選一個可走方向（對照組）
+- GreedyAutopilot ：走向最近的豆子 / Power Pellet，不理會鬼
+- SafeAutopilot   ：避開鬼附近 danger_radius 步內的格子，走向最近的豆子或受驚的鬼；
+                    沒有安全路線時往離鬼最遠的方向逃
+
+    pilot = make_autopilot("safe")
+    while not mode.finished:
+        pilot.update(mode)
+        mode.update(1 / 60)
+"""
+import random
+import time
+from collections import deque
+
+# (drow, dcol) → 玩家方向 (dx, dy)；row 0 在最上方，所以往上是 dy = +1
+_STEPS = (((-1, 0), (0, 1)), ((1, 0), (0, -1)), ((0, -1), (-1, 0)), ((0, 1), (1, 0)))
+
+
+def build_adjacency(mode):
+    """每格可走的鄰格：[[(鄰格索引, (dx, dy)), ...], ...]；導覽格不變時可重複使用"""
+    nav, w, h = mode.nav_grid, mode.grid_width, mode.grid_height
+    adj = []
+    for r in range(h):
+        for c in range(w):
+            links = []
+            for (dr, dc), direction in _STEPS:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < h and 0 <= nc < w and nav[nr][nc]:
+                    links.append((nr * w + nc, direction))
+            adj.append(links)
+    return adj
+
+
+def _ghost_cells(mode, frightened):
+    return [mode.cell_index(g.center_x, g.center_y) for g in mode.ghosts
+            if (g.state == "frightened") == frightened and g.state != "eaten"]
+
+
+def ghost_distance(mode, adj, max_depth):
+    """從所有危險的鬼同時出發的 BFS：{格子: 步數}，只算到 max_depth 步"""
+    dist = {}
+    q = deque()
+    for cell in _ghost_cells(mode, frightened=False):
+        if cell not in dist:
+            dist[cell] = 0
+            q.append(cell)
+    while q:
+        cell = q.popleft()
+        d = dist[cell] + 1
+        if d > max_depth:
+            continue
+        for nxt, _ in adj[cell]:
+            if nxt not in dist:
+                dist[nxt] = d
+                q.append(nxt)
+    return dist
+
+
+def first_step_to(adj, start, is_target, blocked=()):
+    """BFS 找最近的目標格，回傳第一步的方向 (dx, dy)；找不到回傳 None"""
+    first = {start: None}
+    q = deque()
+    for nxt, direction in adj[start]:
+        if nxt not in blocked:
+            first[nxt] = direction
+            q.append(nxt)
+    while q:
+        cell = q.popleft()
+        if is_target(cell):
+            return first[cell]
+        direction = first[cell]
+        for nxt, _ in adj[cell]:
+            if nxt not in first and nxt not in blocked:
+                first[nxt] = direction
+                q.append(nxt)
+    return None
+
+
+class Autopilot:
+    name = ""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.decisions = 0     # 實際做決策（跑 BFS）的次數
+        self.decide_ns = 0     # 決策累計耗時
+        self._last_cell = None
+        self._last_pos = None
+        self._adj = None
+        self._adj_key = None   # (mode, nav_version)：換模式 / 換地圖 / 開關牆時重建鄰格表
+
+    def update(self, mode):
+        """每個 tick（mode.update 之前）呼叫"""
+        if mode.finished or mode.nav_grid is None:
+            return
+        p = mode.player
+        pos = (p.center_x, p.center_y)
+        cell = mode.cell_index(*pos)   # 與 pellet_grid 相同的攤平索引
+        stuck = pos == self._last_pos
+        self._last_pos = pos
+        if cell == self._last_cell and not stuck:
+            return
+        self._last_cell = cell
+
+        start = time.perf_counter_ns()
+        key = (mode, mode.nav_version)
+        if self._adj_key is None or key[0] is not self._adj_key[0] or key[1] != self._adj_key[1]:
+            self._adj = build_adjacency(mode)
+            self._adj_key = key
+        direction = self.decide(mode, self._adj, cell)
+        self.decide_ns += time.perf_counter_ns() - start
+        self.decisions += 1
+
+        if direction is not None and (stuck or direction != (p.change_x, p.change_y)):
+            mode.set_player_direction(*direction)
+
+    def decide(self, mode, adj, cell):
+        """回傳要走的方向 (dx, dy)，None = 維持原方向"""
+        raise NotImplementedError
+
+    def stats(self):
+        return {
+            "decisions": self.decisions,
+            "mean_decide_us": self.decide_ns / max(self.decisions, 1) / 1000,
+        }
+
+
+class RandomAutopilot(Autopilot):
+    name = "random"
+
+    def decide(self, mode, adj, cell):
+        return self.rng.choice(adj[cell])[1] if adj[cell] else None
+
+
+class GreedyAutopilot(Autopilot):
+    name = "greedy"
+
+    def decide(self, mode, adj, cell):
+        direction = first_step_to(adj, cell, mode.pellet_grid.__getitem__)
+        if direction is None and adj[cell]:
+            # 豆子吃完（Endless 等重生）：隨便走
+            return self.rng.choice(adj[cell])[1]
+        return direction
+
+
+class SafeAutopilot(Autopilot):
+    name = "safe"
+
+    def __init__(self, seed=None, danger_radius=3):
+        super().__init__(seed)
+        self.danger_radius = danger_radius
+
+    def decide(self, mode, adj, cell):
+        pellets = mode.pellet_grid
+        ghost_dist = ghost_distance(mode, adj, self.danger_radius + 4)
+        danger = {c for c, d in ghost_dist.items() if d <= self.danger_radius}
+        prey = set(_ghost_cells(mode, frightened=True))
+
+        def is_target(c):
+            return pellets[c] or c in prey
+
+        direction = first_step_to(adj, cell, is_target, danger)
+        if direction is not None:
+            return direction
+
+        # 沒有安全路線：往離鬼最遠（BFS 範圍外視為最遠）的鄰格逃
+        far = self.danger_radius + 5
+        options = [(ghost_dist.get(nxt, far), self.rng.random(), d) for nxt, d in adj[cell]]
+        return max(options)[2] if options else None
+
+
+AUTOPILOTS = {
+    cls.name: cls for cls in (RandomAutopilot, GreedyAutopilot, SafeAutopilot)
+}
+
+
+def make_autopilot(name, seed=None):
+    return AUTOPILOTS[name](seed)
@@ -0,0 +1,79 @@
+"""
+鬼目標解析：目標落在牆上 / 地圖外時，只接受剛好可走的目標（舊行為）vs 查最近可走格表，
+比較規劃後退回四方向測試的次數（依顏色）、每 tick 耗時，以及建表成本。
+
+    python -m benchmarks.bench_ai_fallback [--ticks 3600] [--seeds 10]
+"""
+import argparse
+import random
+import time
+
+from autopilot import make_autopilot
+from grid_map import GridMap
+from map_generator import generate_map
+from models import ClassicMode, DynamicWallsMode, EndlessMode, WaveMode
+
+MODE_CLASSES = (ClassicMode, EndlessMode, WaveMode, DynamicWallsMode)
+COLORS = ("red", "blue", "pink", "orange")
+
+
+def _exact_only(self, col, row):
+    """舊行為：目標在地圖內且可走才接受"""
+    if 0 <= col < self.width and 0 <= row < self.height and self.nav[row * self.width + col]:
+        return row * self.width + col
+    return -1
+
+
+def run(mode_cls, ticks, seed):
+    random.seed(seed)
+    mode = mode_cls()
+    mode.ai_scheduler.budget_ns = None
+    pilot = make_autopilot("safe", seed)
+    start = time.perf_counter()
+    while mode.tick < ticks:
+        pilot.update(mode)
+        mode.update(1 / 60)
+        if mode.finished:
+            mode.finished = False
+            mode.result = None
+    elapsed = time.perf_counter() - start
+    return mode.ai_scheduler, mode.tick, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--seeds", type=int, default=10)
+    args = parser.parse_args()
+
+    table_lookup = GridMap.nearest_walkable
+    for label, resolver in (("exact", _exact_only), ("nearest", table_lookup)):
+        GridMap.nearest_walkable = resolver
+        print(f"-- {label}")
+        for mode_cls in MODE_CLASSES:
+            planned = ticks = 0
+            elapsed = 0.0
+            fallbacks = dict.fromkeys(COLORS, 0)
+            for seed in range(args.seeds):
+                sched, t, e = run(mode_cls, args.ticks, seed)
+                planned += sched.planned
+                ticks += t
+                elapsed += e
+                for color, n in sched.fallbacks.items():
+                    fallbacks[color] += n
+            total = sum(fallbacks.values())
+            per_color = " ".join(f"{c[0]}={fallbacks[c]}" for c in COLORS)
+            print(f"{mode_cls.__name__:17s} planned {planned:6d}  fallbacks {total:5d} "
+                  f"({total / max(planned, 1):6.1%}; {per_color})  {elapsed / max(ticks, 1) * 1e6:6.1f} us/tick")
+    GridMap.nearest_walkable = table_lookup
+
+    grid = generate_map(19, 21)
+    n = 2000
+    start = time.perf_counter()
+    for _ in range(n):
+        grid._build_nearest()
+    print(f"nearest table build {((time.perf_counter() - start) / n) * 1e6:.1f} us (19x21)")
+
+
+if __name__ == "__main__":
+    main()
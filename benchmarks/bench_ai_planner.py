@@ -0,0 +1,54 @@
+"""
+鬼 AI 每幀預算排程的調校工具：比較不同預算下的幀時間與延後 / 超支次數。
+
+    python -m benchmarks.bench_ai_planner [--ticks 3000] [--budgets none 2000 500 100]
+"""
+import argparse
+import random
+import time
+
+from ai_scheduler import AIScheduler
+from models import EndlessMode
+
+
+def run(budget_us, ticks, seed):
+    random.seed(seed)
+    mode = EndlessMode()
+    mode.ai_scheduler = AIScheduler(budget_us)
+
+    keys = [(1, 0), (0, -1), (-1, 0), (0, 1)]
+    frame_ns = []
+    for t in range(ticks):
+        if t % 45 == 0:
+            mode.player.next_change_x, mode.player.next_change_y = random.choice(keys)
+        start = time.perf_counter_ns()
+        mode.update(1 / 60)
+        frame_ns.append(time.perf_counter_ns() - start)
+        if mode.finished:
+            mode.finished = False
+            mode.result = None
+
+    frame_ns.sort()
+    p50 = frame_ns[len(frame_ns) // 2] / 1000
+    p99 = frame_ns[int(len(frame_ns) * 0.99)] / 1000
+    worst = frame_ns[-1] / 1000
+    stats = mode.ai_scheduler.stats()
+    label = "none" if budget_us is None else f"{budget_us}us"
+    print(f"budget {label:>7s} | frame p50 {p50:7.1f} us  p99 {p99:7.1f} us  max {worst:8.1f} us | "
+          f"planned {stats['planned']:5d}  deferred {stats['deferred']:5d}  overruns {stats['overruns']:4d}  "
+          f"max plan/frame {stats['max_frame_us']:7.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budgets", nargs="+", default=["none", "2000", "500", "100"])
+    args = parser.parse_args()
+
+    for budget in args.budgets:
+        run(None if budget == "none" else int(budget), args.ticks, args.seed)
+
+
+if __name__ == "__main__":
+    main()
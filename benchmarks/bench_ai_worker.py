@@ -0,0 +1,89 @@
+"""
+鬼 AI 在主行程 vs 另一個行程（ai_worker.AIWorker）：鬼數增加時主迴圈每 tick 的耗時（平均 / p95），
+以及 worker 模式下決策落後的 tick 數與鬼停下來等決策的比例。
+
+玩家放在地圖外（不會被抓，場次不會結束），鬼數固定；每 tick 照 60 FPS 節奏睡到下一幀，
+讓 worker 有一整幀的時間決策（和實際遊戲相同）。耗時用主行程的 CPU 時間（thread_time）量，
+單核心機器上 worker 搶走的時間不算進去。
+
+--library 指定地圖庫時用它的第一張地圖（例如 1001x1001 的超大地圖，看導覽格大小的影響）；
+大地圖的豆子多到 arcade 改用 GPU 做碰撞，會開一個隱藏視窗（無畫面環境用 ARCADE_HEADLESS=1）。
+
+    python -m benchmarks.bench_ai_worker [--ticks 600] [--ghosts 4,16,64]
+    ARCADE_HEADLESS=1 python -m benchmarks.bench_ai_worker --library big.pmlb
+"""
+import argparse
+import random
+import time
+
+import arcade
+
+from ai_worker import AIWorker
+from map_library import MapLibrary
+from models import ClassicMode
+
+FRAME = 1 / 60
+COLORS = ("red", "pink", "blue", "orange")
+
+
+def build(n_ghosts, seed, library=None):
+    random.seed(seed)
+    mode = ClassicMode(library)
+    mode.ai_scheduler.budget_ns = None
+    mode.player.center_x = mode.player.center_y = -10 * 32
+    cells = [(c, r) for r in range(mode.grid_height) for c in range(mode.grid_width) if mode.nav_grid[r][c]]
+    while len(mode.ghosts) < n_ghosts:
+        c, r = random.choice(cells)
+        mode.spawn_ghost(c * 32, (mode.grid_height - 1 - r) * 32, COLORS[len(mode.ghosts) % 4])
+    return mode
+
+
+def run(n_ghosts, ticks, worker, seed=0, library=None):
+    mode = build(n_ghosts, seed, library)
+    if worker is not None:
+        worker.attach(mode)
+        worker.stalls = 0
+        # 等 worker 交出第一批決策
+        mode.update(FRAME)
+        while worker.poll(mode.tick) == {} and worker.received == 0:
+            time.sleep(0.001)
+    samples = []
+    next_frame = time.perf_counter()
+    for _ in range(ticks):
+        start = time.thread_time()
+        mode.update(FRAME)
+        samples.append((time.thread_time() - start) * 1e6)
+        next_frame += FRAME
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+    samples.sort()
+    return sum(samples) / len(samples), samples[int(len(samples) * 0.95)], mode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--ghosts", default="4,16,64")
+    parser.add_argument("--library", help="地圖庫路徑（用第一張地圖）")
+    args = parser.parse_args()
+    library = MapLibrary(args.library) if args.library else None
+    window = arcade.Window(64, 64, "bench_ai_worker", visible=False) if library is not None else None
+
+    worker = AIWorker(seed=0)
+    try:
+        print(f"{'ghosts':>6} | {'in-process us/tick':>18} {'p95':>7} | {'worker us/tick':>14} {'p95':>7} "
+              f"{'lag':>5} {'stalls':>7}")
+        for n in (int(v) for v in args.ghosts.split(",")):
+            mean_in, p95_in, _ = run(n, args.ticks, None, library=library)
+            mean_w, p95_w, mode = run(n, args.ticks, worker, library=library)
+            s = worker.stats()
+            stall_share = worker.stalls / max(args.ticks * len(mode.ghosts), 1)
+            print(f"{n:6d} | {mean_in:18.1f} {p95_in:7.1f} | {mean_w:14.1f} {p95_w:7.1f} "
+                  f"{s['mean_lag_ticks']:5.2f} {stall_share:7.2%}")
+    finally:
+        worker.close()
+        if window is not None:
+            window.close()
+
+
+if __name__ == "__main__":
+    main()
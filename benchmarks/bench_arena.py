@@ -0,0 +1,99 @@
+"""
+多場同畫面（Arena）的成本：N 場 safe 自動駕駛（四種模式輪流）時
+每幀更新耗時（平均 / p95）、在預算內實際更新的比例，以及每多一場的記憶體。
+
+    python -m benchmarks.bench_arena [--frames 600] [--sizes 1,2,4,8,16] [--budget-us 10000]
+    ARCADE_HEADLESS=1 python -m benchmarks.bench_arena --draw     # 加上繪圖（含 GPU，ctx.finish()）
+
+記憶體用 tracemalloc 量 Python 端配置（GPU 端的 sprite buffer 不算在內）。
+--library 指定地圖庫時各場從它挑地圖（只有一張地圖的庫 = 每場載入同一筆 record，看 tiles / exits 共用省下多少）；
+大地圖的豆子多到 arcade 改用 GPU 做碰撞，沒有 --draw 時也會開一個隱藏視窗。
+
+    python map_library.py /tmp/one.pmlb --count 1 --width 301 --height 301
+    ARCADE_HEADLESS=1 python -m benchmarks.bench_arena --library /tmp/one.pmlb --sizes 4,8 --frames 60
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+import arcade
+
+from arena import Arena
+from map_library import MapLibrary
+from models import ClassicMode, DynamicWallsMode, EndlessMode, WaveMode
+
+MODE_CLASSES = (ClassicMode, EndlessMode, WaveMode, DynamicWallsMode)
+
+
+def build(n, budget_us, library=None):
+    return Arena([MODE_CLASSES[i % len(MODE_CLASSES)] for i in range(n)], library, budget_us=budget_us, seed=0)
+
+
+def memory_per_session(n, library=None):
+    """先建一場暖好快取（貼圖、字型），再量 n 場總配置"""
+    build(1, None, library)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    arena = build(n, None, library)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del arena
+    return used / n
+
+
+def run(n, frames, budget_us, window, library=None):
+    random.seed(0)
+    arena = build(n, budget_us, library)
+    update_ms, draw_ms = [], []
+    for _ in range(frames):
+        start = time.perf_counter()
+        arena.update()
+        update_ms.append((time.perf_counter() - start) * 1000)
+        if window is not None:
+            start = time.perf_counter()
+            window.clear()
+            arena.draw(window)
+            window.ctx.finish()
+            draw_ms.append((time.perf_counter() - start) * 1000)
+    return arena, update_ms, draw_ms
+
+
+def p95(values):
+    return sorted(values)[int(len(values) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--sizes", default="1,2,4,8,16")
+    parser.add_argument("--budget-us", type=int, default=10000)
+    parser.add_argument("--draw", action="store_true", help="開視窗一起量繪圖（無畫面環境用 ARCADE_HEADLESS=1）")
+    parser.add_argument("--library", help="地圖庫路徑")
+    args = parser.parse_args()
+    library = MapLibrary(args.library) if args.library else None
+
+    window = arcade.Window(1280, 720, "bench_arena") if args.draw else None
+    hidden = arcade.Window(64, 64, "bench_arena", visible=False) if library is not None and window is None else None
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    print(f"{'N':>3} {'KiB/session':>12} {'update ms':>10} {'p95':>7} {'updated':>8}"
+          + (f" {'draw ms':>8} {'p95':>7}" if window else ""))
+    for n in sizes:
+        kib = memory_per_session(n, library) / 1024
+        arena, update_ms, draw_ms = run(n, args.frames, args.budget_us, window, library)
+        share = arena.stats()["update_share"]
+        line = (f"{n:3d} {kib:12.1f} {sum(update_ms) / len(update_ms):10.2f} {p95(update_ms):7.2f}"
+                f" {share:8.1%}")
+        if window:
+            line += f" {sum(draw_ms) / len(draw_ms):8.2f} {p95(draw_ms):7.2f}"
+        print(line)
+    if hidden is not None:
+        hidden.close()
+
+
+if __name__ == "__main__":
+    main()
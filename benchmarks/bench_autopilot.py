@@ -0,0 +1,72 @@
+"""
+自動駕駛策略比較：各模式下的存活時間、吃豆數、決策成本，以及產生的鬼 AI 負載。
+
+    python -m benchmarks.bench_autopilot [--seconds 180] [--runs 3] [--modes classic endless wave]
+
+每場最多跑 --seconds 模擬秒數（60 tick = 1 秒），被抓到或勝利就結束。
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+
+from autopilot import AUTOPILOTS, make_autopilot
+from models import ClassicMode, EndlessMode, WaveMode
+
+MODES = {
+    "classic": ClassicMode,
+    "endless": EndlessMode,
+    "wave": WaveMode,
+}
+
+
+def run(mode_cls, pilot_name, seconds, seed):
+    random.seed(seed)
+    mode = mode_cls()
+    pilot = make_autopilot(pilot_name, seed)
+    max_ticks = seconds * 60
+    start = time.perf_counter()
+    while not mode.finished and mode.tick < max_ticks:
+        pilot.update(mode)
+        mode.update(1 / 60)
+    wall = time.perf_counter() - start
+    return {
+        "ticks": mode.tick,
+        "result": mode.result or "timeout",
+        "pellets": mode.pellets_eaten,
+        "wave": getattr(mode, "wave", None),
+        "decide_us": pilot.stats()["mean_decide_us"],
+        "pilot_share": pilot.decide_ns / 1e9 / max(wall, 1e-9),
+        "planned": mode.ai_scheduler.planned,
+        "tick_us": wall / max(mode.tick, 1) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, default=180)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="*", choices=sorted(MODES), default=["classic", "endless", "wave"])
+    parser.add_argument("--autopilots", nargs="*", choices=sorted(AUTOPILOTS), default=["random", "greedy", "safe"])
+    args = parser.parse_args()
+
+    print(f"{'mode':8s} {'autopilot':9s} {'survived s':>10s} {'pellets':>8s} {'results':30s} "
+          f"{'us/decide':>9s} {'pilot %':>7s} {'AI plans':>8s} {'us/tick':>8s}")
+    for mode_name in args.modes:
+        for pilot_name in args.autopilots:
+            runs = [run(MODES[mode_name], pilot_name, args.seconds, seed) for seed in range(args.runs)]
+            results = " ".join(f"{name}x{n}" for name, n in Counter(r["result"] for r in runs).items())
+            if runs[0]["wave"] is not None:
+                results += f" (wave {max(r['wave'] for r in runs)})"
+            print(f"{mode_name:8s} {pilot_name:9s} "
+                  f"{statistics.mean(r['ticks'] for r in runs) / 60:10.1f} "
+                  f"{statistics.mean(r['pellets'] for r in runs):8.0f} {results:30s} "
+                  f"{statistics.mean(r['decide_us'] for r in runs):9.0f} "
+                  f"{statistics.mean(r['pilot_share'] for r in runs) * 100:6.1f}% "
+                  f"{statistics.mean(r['planned'] for r in runs):8.0f} "
+                  f"{statistics.mean(r['tick_us'] for r in runs):8.0f}")
+
+
+if __name__ == "__main__":
+    main()
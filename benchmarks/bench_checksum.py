@@ -0,0 +1,67 @@
+"""
+狀態雜湊串流的成本：同一場 Classic（safe 自動駕駛、AI 預算停用）分別在停用 / 啟用雜湊時的每 tick 耗時，
+state_hash() 各部分的耗時，以及串流大小。
+
+    python -m benchmarks.bench_checksum [--ticks 3600] [--out /tmp/run.pmck]
+"""
+import argparse
+import os
+import random
+import time
+import zlib
+
+import checksum
+from autopilot import make_autopilot
+from models import ClassicMode
+
+
+def run(ticks, seed=0):
+    random.seed(seed)
+    mode = ClassicMode()
+    mode.ai_scheduler.budget_ns = None
+    pilot = make_autopilot("safe", seed)
+    start = time.perf_counter()
+    while not mode.finished and mode.tick < ticks:
+        pilot.update(mode)
+        mode.update(1 / 60)
+    return (time.perf_counter() - start) / max(mode.tick, 1) * 1e6, mode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--out", default="/tmp/run.pmck")
+    args = parser.parse_args()
+
+    off_us, _ = run(args.ticks)
+    stream = checksum.enable(args.out)
+    on_us, mode = run(args.ticks)
+    checksum.disable()
+
+    n = 20_000
+    start = time.perf_counter()
+    for _ in range(n):
+        checksum.state_hash(mode)
+    hash_us = (time.perf_counter() - start) / n * 1e6
+
+    # 各部分：產生 bytes + CRC32
+    parts = {}
+    for _ in range(2000):
+        last = time.perf_counter()
+        for name, data in checksum._parts(mode):
+            zlib.crc32(data)
+            now = time.perf_counter()
+            key = "ghosts" if name.startswith("ghost") else name
+            parts[key] = parts.get(key, 0.0) + now - last
+            last = now
+
+    print(f"tick without checksum {off_us:.1f} us, with checksum {on_us:.1f} us")
+    print(f"state_hash() {hash_us:.2f} us/tick")
+    for name, total in parts.items():
+        print(f"  {name:8s} {total / 2000 * 1e6:6.2f} us")
+    size = os.path.getsize(args.out)
+    print(f"stream {size} bytes for {stream.ticks} ticks ({size / max(stream.ticks, 1) * 3600 / 1024:.1f} KiB/min)")
+
+
+if __name__ == "__main__":
+    main()
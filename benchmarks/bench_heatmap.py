@@ -0,0 +1,62 @@
+"""
+熱圖記錄的成本：同一場 Endless（safe 自動駕駛）分別在停用 / 啟用熱圖時的每 tick 耗時，
+以及 sample() 本身與批次加總 / 寫檔的耗時。
+
+    python -m benchmarks.bench_heatmap [--ticks 18000] [--out /tmp/heat.npz]
+"""
+import argparse
+import os
+import random
+import time
+
+import heatmap
+from autopilot import make_autopilot
+from models import EndlessMode
+
+
+def run(ticks, seed=0):
+    random.seed(seed)
+    mode = EndlessMode()
+    pilot = make_autopilot("safe", seed)
+    deaths = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        pilot.update(mode)
+        mode.update(1 / 60)
+        if mode.finished:
+            deaths += 1
+            mode.finished = False
+            mode.result = None
+            mode.player.reset()
+    return (time.perf_counter() - start) / ticks * 1e6, mode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=18000)
+    parser.add_argument("--out", default="/tmp/heat.npz")
+    args = parser.parse_args()
+
+    off_us, _ = run(args.ticks)
+    recorder = heatmap.enable(args.out)
+    on_us, mode = run(args.ticks)
+
+    # sample() 單獨計時（不含遊戲邏輯）
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        recorder.sample(mode)
+    sample_us = (time.perf_counter() - start) / n * 1e6
+
+    start = time.perf_counter()
+    heatmap.disable()
+    close_ms = (time.perf_counter() - start) * 1e3
+
+    print(f"tick without heatmap {off_us:.1f} us, with heatmap {on_us:.1f} us")
+    print(f"sample() {sample_us:.2f} us/tick (incl. amortized bincount every {recorder.flush_ticks} ticks)")
+    print(f"close + savez_compressed {close_ms:.1f} ms, {os.path.getsize(args.out) / 1024:.1f} KiB")
+    heatmap.info(args.out)
+
+
+if __name__ == "__main__":
+    main()
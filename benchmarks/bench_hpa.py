@@ -0,0 +1,137 @@
+"""
+超大地圖（預設 1001x1001）上 A* vs HPA* 的單次決策耗時與路線品質：
+- A*：每次查詢都在整張格子上搜尋
+- HPA* walk：鬼從起點照 next_step 一路走到目標，記錄每一次決策的耗時（平均 / p99 / 最大）
+  與實際步數 / 最短距離；cold = 剛換地圖（prepare 只排佇列，cluster 邊走邊建），
+  warm = warm() 把 cluster 都建好之後
+- HPA* moving：目標每 8 步往隨機方向移動一格（追玩家）
+- prepare / 全部 warm 的耗時
+決策途中碰上 GC 第 2 代回收（整個行程的暫停，和尋路無關）的另外統計，「no-GC max」不含這些決策。
+
+    python -m benchmarks.bench_hpa [--size 1001] [--queries 10] [--cluster 16] [--step-nodes 50]
+"""
+import argparse
+import gc
+import random
+import time
+
+from map_generator import generate_map
+from map_library import compute_distances
+from pathfinding import AStarPathfinder, HPAPathfinder
+
+_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_gen2 = [0]    # 已發生的第 2 代回收次數
+
+
+def _count_gen2(phase, info):
+    if phase == "stop" and info["generation"] == 2:
+        _gen2[0] += 1
+
+
+def walk(finder, nav, n, s, t, limit, move_target=None):
+    """
+    照 next_step 走到目標（或做了 limit 次決策）→ ([(決策耗時 ms, 途中有沒有 GC)], 步數, 有沒有走到)；
+    回傳 None（搜尋還沒展開到，先等一次）時原地不動
+    """
+    times = []
+    steps = 0
+    while s != t and len(times) < limit:
+        collections = _gen2[0]
+        begin = time.perf_counter()
+        step = finder.next_step(nav, n, n, s, t)
+        times.append(((time.perf_counter() - begin) * 1000, _gen2[0] != collections))
+        if step is not None:
+            s = step
+            steps += 1
+        if move_target is not None and len(times) % 8 == 0:
+            t = move_target(t)
+    return times, steps, s == t
+
+
+def report(label, samples, extra=""):
+    times = sorted(t for t, _ in samples)
+    clean = [t for t, hit in samples if not hit]
+    p99 = times[min(int(len(times) * 0.99), len(times) - 1)]
+    print(f"{label:14s} mean {sum(times) / len(times):7.3f} ms  p99 {p99:7.3f} ms  max {times[-1]:7.3f} ms  "
+          f"no-GC max {max(clean, default=0):7.3f} ms  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1001)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--cluster", type=int, default=16)
+    parser.add_argument("--step-nodes", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    gc.callbacks.append(_count_gen2)
+
+    n = args.size
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    grid = generate_map(n, n, seed=args.seed)
+    print(f"{n}x{n} map generated in {time.perf_counter() - start:.1f} s")
+    nav = grid.nav_rows
+    cells = [(r, c) for r in range(n) for c in range(n) if nav[r][c]]
+    pairs = []
+    while len(pairs) < args.queries:
+        s, t = rng.choice(cells), rng.choice(cells)
+        d = compute_distances(grid.exits, n, (t[1], t[0]))[s[0] * n + s[1]]
+        if d > 0:
+            pairs.append((s, t, d))
+
+    astar = AStarPathfinder()
+    times = []
+    for s, t, _ in pairs:
+        collections = _gen2[0]
+        begin = time.perf_counter()
+        astar.next_step(nav, n, n, s, t)
+        times.append(((time.perf_counter() - begin) * 1000, _gen2[0] != collections))
+    report("A*", times, f"{astar.expanded / len(pairs):9.0f} nodes/query")
+
+    def make():
+        finder = HPAPathfinder(cluster_size=args.cluster, step_nodes=args.step_nodes)
+        begin = time.perf_counter()
+        finder.prepare(nav, n, n)
+        return finder, time.perf_counter() - begin
+
+    for label in ("cold", "warm"):
+        finder, prep = make()
+        if label == "warm":
+            begin = time.perf_counter()
+            finder.warm(len(finder._pending))
+            prep = time.perf_counter() - begin
+        times = []
+        ratio = []
+        arrived = 0
+        for s, t, d in pairs:
+            ts, steps, ok = walk(finder, nav, n, s, t, 3 * d)
+            times += ts
+            arrived += ok
+            if ok:
+                ratio.append(steps / d)
+        prep_label = "prepare" if label == "cold" else "warm all"
+        report(f"HPA* walk {label}", times,
+               f"arrived {arrived}/{len(pairs)}, steps/shortest {sum(ratio) / max(len(ratio), 1):.3f}, "
+               f"{prep_label} {prep:.2f} s")
+
+    def move_target(t):
+        for dr, dc in rng.sample(_DIRS, 4):
+            r, c = t[0] + dr, t[1] + dc
+            if 0 <= r < n and 0 <= c < n and nav[r][c]:
+                return r, c
+        return t
+
+    finder, _ = make()
+    finder.warm(len(finder._pending))
+    times = []
+    arrived = 0
+    for s, t, d in pairs:
+        ts, _, ok = walk(finder, nav, n, s, t, 4 * d, move_target)
+        times += ts
+        arrived += ok
+    report("HPA* moving", times, f"caught {arrived}/{len(pairs)}, cache hits {finder.cache_hits}/{len(times)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+轉向緩衝的反應度：模擬「按鍵時間有誤差」的玩家，比較原本的轉向規則與 look-ahead 緩衝。
+
+    python -m benchmarks.bench_input_latency [--ticks 36000] [--jitter-early 10] [--jitter-late 6]
+
+無畫面跑 Classic 地圖（移除鬼，只測移動）。玩家每次接近路口時決定要轉向哪個垂直方向，
+在抵達路口中心前後 [-jitter-early, +jitter-late] 個 tick 內隨機時間按下。
+回報：
+- on target：在預定的那個路口轉成功的比例
+- elsewhere：轉向被保留到之後其他路口才生效（玩家感覺「轉錯地方」）
+- 輸入延遲直方圖（InputLatency）
+"""
+import argparse
+import random
+
+from constants import TILE_SIZE, TURN_BUFFER_TICKS, TURN_GRACE_PX
+from models import ClassicMode
+
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+def _cell(mode, x, y):
+    return int(x // TILE_SIZE), mode.grid_height - 1 - int(y // TILE_SIZE)
+
+
+def _open(mode, col, row, dx, dy):
+    c, r = col + dx, row - dy
+    return 0 <= r < mode.grid_height and 0 <= c < mode.grid_width and mode.nav_grid[r][c]
+
+
+def _next_junction(mode, player):
+    """玩家前方下一個有垂直出口的格子：((col, row), 還要幾個 tick 到中心, 可轉的方向)"""
+    dx, dy = int(player.change_x), int(player.change_y)
+    col, row = _cell(mode, player.center_x, player.center_y)
+    cx = col * TILE_SIZE + TILE_SIZE / 2
+    cy = (mode.grid_height - 1 - row) * TILE_SIZE + TILE_SIZE / 2
+    along = (player.center_x - cx) * dx + (player.center_y - cy) * dy
+    dist = -along
+    if along >= 0:
+        col, row, dist = col + dx, row - dy, TILE_SIZE - along
+    while 0 <= row < mode.grid_height and 0 <= col < mode.grid_width and mode.nav_grid[row][col]:
+        turns = [t for t in ((-dy, dx), (dy, -dx)) if _open(mode, col, row, *t)]
+        if turns:
+            return (col, row), dist / player.speed, turns
+        col, row, dist = col + dx, row - dy, dist + TILE_SIZE
+    return None
+
+
+def bench(ticks, window, grace, jitter_early, jitter_late, seed=0):
+    rng = random.Random(seed)
+    random.seed(seed)
+    mode = ClassicMode()
+    for g in list(mode.ghosts):
+        mode.despawn_ghost(g)
+    while len(mode.ghosts):
+        mode.ghosts.pop()
+    player = mode.player
+    player.turn_window = window
+    player.turn_grace = grace
+
+    plan = None          # (按下的 tick, 方向, 預定路口)
+    intent = None        # 已按下、等待生效的 (方向, 預定路口)
+    on_target = elsewhere = dropped = 0
+    last_pos = None
+    for _ in range(ticks):
+        pos = (player.center_x, player.center_y)
+        stuck, last_pos = pos == last_pos, pos
+        if stuck:
+            # 停在牆前：換個方向重新出發（不算在轉向統計裡）
+            if mode.tick % 8 == 0:
+                mode.set_player_direction(*rng.choice(DIRECTIONS))
+                plan = intent = None
+        elif intent is None and plan is None:
+            found = _next_junction(mode, player)
+            if found:
+                cell, eta, turns = found
+                at = mode.tick + round(eta) + rng.randint(-jitter_early, jitter_late)
+                plan = (max(at, mode.tick), rng.choice(turns), cell)
+
+        if plan is not None and mode.tick >= plan[0]:
+            _, direction, cell = plan
+            mode.set_player_direction(*direction)
+            intent = (direction, cell)
+            plan = None
+
+        mode.update(1 / 60)
+        if mode.finished:
+            mode.finished = False
+            mode.result = None
+
+        if intent is not None:
+            direction, cell = intent
+            if (player.change_x, player.change_y) == direction:
+                if _cell(mode, player.center_x, player.center_y) == cell:
+                    on_target += 1
+                else:
+                    elsewhere += 1
+                intent = None
+            elif (player.next_change_x, player.next_change_y) != direction:
+                dropped += 1    # 緩衝時間到被丟掉
+                intent = None
+
+    return on_target, elsewhere, dropped, mode.input_latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=36000)
+    parser.add_argument("--jitter-early", type=int, default=10, help="最多提早幾個 tick 按")
+    parser.add_argument("--jitter-late", type=int, default=6, help="最多晚幾個 tick 按")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    configs = [
+        ("original (no expiry, no grace)", None, 0),
+        (f"buffer {TURN_BUFFER_TICKS} ticks, grace {TURN_GRACE_PX} px", TURN_BUFFER_TICKS, TURN_GRACE_PX),
+    ]
+    for label, window, grace in configs:
+        on_target, elsewhere, dropped, latency = bench(
+            args.ticks, window, grace, args.jitter_early, args.jitter_late, args.seed)
+        turns = on_target + elsewhere + dropped
+        print(f"\n== {label}")
+        print(f"turns {turns}: on target {on_target / max(turns, 1):.1%}, "
+              f"elsewhere {elsewhere / max(turns, 1):.1%}, dropped {dropped / max(turns, 1):.1%}")
+        print(latency.format())
+
+
+if __name__ == "__main__":
+    main()
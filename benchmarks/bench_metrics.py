@@ -0,0 +1,78 @@
+"""
+metrics 端點的成本：
+- 遊戲迴圈：停用 / 啟用（同時有背景執行緒每 --interval 秒抓一次 /metrics）時每 tick 的耗時
+- registry.tick() 本身的耗時
+- 一次抓取（render + HTTP）的耗時
+
+    python -m benchmarks.bench_metrics [--ticks 3600] [--interval 0.1]
+"""
+import argparse
+import random
+import threading
+import time
+import urllib.request
+
+import metrics
+from autopilot import make_autopilot
+from models import EndlessMode
+
+
+def run(ticks, seed=0):
+    random.seed(seed)
+    mode = EndlessMode()
+    mode.ai_scheduler.budget_ns = None
+    pilot = make_autopilot("safe", seed)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        pilot.update(mode)
+        mode.update(1 / 60)
+        if mode.finished:
+            mode.finished = False
+            mode.result = None
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"disabled   {run(args.ticks):8.1f} us/tick")
+
+    registry = metrics.enable(0)
+    url = f"http://127.0.0.1:{registry.port}/metrics"
+    stop = threading.Event()
+    scrape_times = []
+
+    def scrape():
+        while not stop.wait(args.interval):
+            begin = time.perf_counter()
+            with urllib.request.urlopen(url) as resp:
+                resp.read()
+            scrape_times.append((time.perf_counter() - begin) * 1000)
+
+    scraper = threading.Thread(target=scrape, daemon=True)
+    scraper.start()
+    try:
+        per_tick = run(args.ticks)
+    finally:
+        stop.set()
+        scraper.join()
+    print(f"enabled    {per_tick:8.1f} us/tick  ({len(scrape_times)} scrapes, "
+          f"mean {sum(scrape_times) / max(len(scrape_times), 1):.2f} ms)")
+
+    with urllib.request.urlopen(url) as resp:
+        print(resp.read().decode())
+
+    mode = registry.mode
+    n = 100000
+    start = time.perf_counter()
+    for _ in range(n):
+        registry.tick(mode, time.perf_counter_ns())
+    print(f"registry.tick() {(time.perf_counter() - start) / n * 1e9:6.0f} ns")
+    metrics.disable()
+
+
+if __name__ == "__main__":
+    main()
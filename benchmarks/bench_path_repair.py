@@ -0,0 +1,56 @@
+"""
+距離場增量修補 vs 整張重算：在不同地圖大小下隨機開關牆，比較處理格數與耗時。
+
+    python -m benchmarks.bench_path_repair [--sizes 19x21 41x41 61x61] [--changes 200]
+"""
+import argparse
+import random
+import time
+
+from map_generator import generate_map
+from nav_field import DistanceField
+
+
+def bench(width, height, changes, seed):
+    rng = random.Random(seed)
+    grid = generate_map(width, height, seed=seed)
+    nav = grid.nav_rows
+    cells = [(r, c) for r in range(height) for c in range(width) if nav[r][c]]
+    field = DistanceField(nav, width, height, rng.choice(cells))
+
+    repair_time = rebuild_time = 0.0
+    repair_cells = rebuild_cells = 0
+    for _ in range(changes):
+        r, c = rng.randrange(1, height - 1), rng.randrange(1, width - 1)
+        nav[r][c] ^= 1
+
+        t0 = time.perf_counter()
+        field.repair([(r, c)])
+        repair_time += time.perf_counter() - t0
+        repair_cells += field.last_visited
+
+        t0 = time.perf_counter()
+        reference = DistanceField(nav, width, height, field.source)
+        rebuild_time += time.perf_counter() - t0
+        rebuild_cells += reference.last_visited
+        assert reference.dist == field.dist
+
+    print(f"{width:4d}x{height:<4d} | repair {repair_time / changes * 1e6:9.1f} us "
+          f"({repair_cells / changes:8.1f} cells) | rebuild {rebuild_time / changes * 1e6:10.1f} us "
+          f"({rebuild_cells / changes:9.1f} cells)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["19x21", "41x41", "61x61"])
+    parser.add_argument("--changes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        width, height = (int(v) for v in size.split("x"))
+        bench(width, height, args.changes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+鬼尋路後端比較：BFS / A* / JPS / HPA* 在不同地圖大小下的展開節點數與耗時。
+
+    python -m benchmarks.bench_pathfinding [--sizes 19x21 41x41 81x81 161x161] [--queries 200]
+
+起點與目標從可走格隨機挑選（同一組 query 給所有後端），
+並檢查每個後端回傳的下一格都在最短路上（HPA* 是近似最短路，改成列出在最短路上的比例）。
+"""
+import argparse
+import random
+import time
+
+from map_generator import generate_map
+from map_library import compute_distances
+from pathfinding import PATHFINDERS, make_pathfinder
+
+
+def bench(width, height, queries, seed):
+    rng = random.Random(seed)
+    grid = generate_map(width, height, seed=seed)
+    nav = grid.nav_rows
+    cells = [(r, c) for r in range(height) for c in range(width) if nav[r][c]]
+    pairs = [(rng.choice(cells), rng.choice(cells)) for _ in range(queries)]
+
+    # 參考答案：從目標出發的 BFS 步數
+    dist = {t: compute_distances(grid.exits, width, (t[1], t[0])) for _, t in pairs}
+
+    row = [f"{width:4d}x{height:<4d}"]
+    for name in PATHFINDERS:
+        finder = make_pathfinder(name)
+        t0 = time.perf_counter()
+        steps = [finder.next_step(nav, width, height, s, t) for s, t in pairs]
+        elapsed = time.perf_counter() - t0
+
+        on_path = 0
+        for (s, t), step in zip(pairs, steps):
+            if step is not None:
+                d = dist[t]
+                ok = d[step[0] * width + step[1]] == d[s[0] * width + s[1]] - 1
+                assert ok or not finder.exact, name
+                on_path += ok
+
+        cell = f"{name} {elapsed / queries * 1e6:8.1f} us ({finder.expanded / queries:7.1f} nodes)"
+        if not finder.exact:
+            cell += f" {on_path / max(sum(step is not None for step in steps), 1):.0%} optimal"
+        row.append(cell)
+    print(" | ".join(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["19x21", "41x41", "81x81", "161x161"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        width, height = (int(v) for v in size.split("x"))
+        bench(width, height, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
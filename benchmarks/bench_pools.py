@@ -0,0 +1,89 @@
+"""
+物件池效果：長時間 Endless（頻繁吃鬼 / 吃豆重生）與連續換 Wave 時的記憶體與幀耗時。
+
+    python -m benchmarks.bench_pools [--ticks 6000] [--no-pool]
+
+每隔一段時間記錄 tracemalloc 的目前用量，最後回報 GC 次數、幀耗時 p50 / p99 / max，
+以及物件池建立 / 重用的 sprite 數。--no-pool 換成不保留 sprite 的池子作對照。
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from models import EndlessMode, WaveMode
+from pools import SpritePool
+
+
+class _NoPool(SpritePool):
+    """對照組：release 後直接丟掉，每次 acquire 都重新建立"""
+
+    def release(self, key, sprite):
+        sprite.remove_from_sprite_lists()
+
+
+def _endless_step(mode, t, rng):
+    if t % 30 == 0 and len(mode.ghosts):
+        mode.handle_ghost_eaten(rng.choice(mode.ghosts))
+    if t % 5 == 0 and len(mode.pellets):
+        mode.handle_pellet_eaten(rng.choice(mode.pellets))
+
+
+def _wave_step(mode, t, rng):
+    if t % 120 == 119:
+        mode.next_wave()
+
+
+SCENARIOS = {
+    "endless": (EndlessMode, _endless_step),
+    "wave": (WaveMode, _wave_step),
+}
+
+
+def _gc_collections():
+    return sum(s["collections"] for s in gc.get_stats())
+
+
+def bench(name, ticks, no_pool, seed=0):
+    cls, step = SCENARIOS[name]
+    rng = random.Random(seed)
+    random.seed(seed)
+    mode = cls()
+    if no_pool:
+        mode.pool = _NoPool()
+
+    tracemalloc.start()
+    gc_before = _gc_collections()
+    frame_times = []
+    samples = []
+    for t in range(ticks):
+        start = time.perf_counter()
+        step(mode, t, rng)
+        mode.update(1 / 60)
+        frame_times.append(time.perf_counter() - start)
+        mode.finished = False
+        mode.result = None
+        if t % (ticks // 6) == 0:
+            samples.append(tracemalloc.get_traced_memory()[0] / 1024)
+    tracemalloc.stop()
+
+    frame_times.sort()
+    p = lambda q: frame_times[int(q * (len(frame_times) - 1))] * 1e3
+    mem = " ".join(f"{kb:7.0f}" for kb in samples)
+    print(f"{name:8s} {'no-pool' if no_pool else 'pool':7s} | mem KiB {mem} | gc {_gc_collections() - gc_before:5d} "
+          f"| frame p50 {p(0.5):5.2f} p99 {p(0.99):5.2f} max {p(1.0):6.2f} ms "
+          f"| created {mode.pool.created} reused {mode.pool.reused}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=6000)
+    parser.add_argument("--no-pool", action="store_true")
+    args = parser.parse_args()
+    for name in SCENARIOS:
+        bench(name, args.ticks, args.no_pool)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+重播串流的編碼成本與大小基準測試。
+
+    python -m benchmarks.bench_replay [--ticks 3600]
+
+每個模式跑一段時間，每 tick 寫一則重播訊息，比較編碼與 mode.update 的耗時，
+並回報每分鐘遊戲的串流大小。
+"""
+import argparse
+import io
+import time
+
+from benchmarks.bench_snapshot import MODES, _drive
+from replay import ReplayWriter
+
+
+def bench(name, ticks):
+    mode = MODES[name]()
+    writer = ReplayWriter(io.BytesIO())
+
+    update_ns = 0
+    for _ in range(ticks):
+        start = time.perf_counter_ns()
+        _drive(mode, 1)
+        update_ns += time.perf_counter_ns() - start
+        writer.record(mode)
+
+    stats = writer.stats()
+    update_us = update_ns / ticks / 1000
+    print(f"{name:8s} update {update_us:7.1f} us/tick | encode {stats['encode_us_per_tick']:6.1f} us/tick "
+          f"({stats['encode_us_per_tick'] / update_us:5.1%}) | {stats['bytes_per_minute'] / 1024:6.1f} KiB/min")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=3600)
+    args = parser.parse_args()
+    for name in MODES:
+        bench(name, args.ticks)
+
+
+if __name__ == "__main__":
+    main()
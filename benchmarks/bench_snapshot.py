@@ -0,0 +1,71 @@
+"""
+快照大小與 snapshot() / restore() 耗時基準測試。
+
+    python -m benchmarks.bench_snapshot [--ticks 600] [--repeat 2000]
+
+每個模式先跑一段時間（讓豆子被吃、respawn 佇列有資料），
+再量測快照大小、打包與還原的平均 / 最差耗時（微秒）。
+"""
+import argparse
+import time
+
+from models import ClassicMode, EndlessMode, WaveMode
+
+MODES = {
+    "classic": ClassicMode,
+    "endless": EndlessMode,
+    "wave": WaveMode,
+}
+
+
+def _drive(mode, ticks):
+    """讓玩家每 30 tick 換一次方向，製造吃豆子 / 鬼移動的狀態"""
+    keys = [(1, 0), (0, -1), (-1, 0), (0, 1)]
+    for t in range(ticks):
+        if t % 30 == 0:
+            mode.player.next_change_x, mode.player.next_change_y = keys[(t // 30) % 4]
+        mode.update(1 / 60)
+        if mode.finished:
+            mode.finished = False
+            mode.result = None
+
+
+def bench(name, ticks, repeat):
+    mode = MODES[name]()
+    _drive(mode, ticks)
+
+    blob = mode.snapshot()
+    pack_times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        mode.snapshot()
+        pack_times.append(time.perf_counter() - t0)
+
+    # rewind 情境：還原到幾 tick 前的快照（只有少量差異）
+    restore_times = []
+    for _ in range(repeat):
+        mode.update(1 / 60)
+        t0 = time.perf_counter()
+        mode.restore(blob)
+        restore_times.append(time.perf_counter() - t0)
+
+    def fmt(samples):
+        avg = sum(samples) / len(samples) * 1e6
+        worst = max(samples) * 1e6
+        return f"avg {avg:7.1f} us  max {worst:7.1f} us"
+
+    print(f"{name:8s} size {len(blob):5d} B | snapshot {fmt(pack_times)} | restore {fmt(restore_times)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name in MODES:
+        bench(name, args.ticks, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
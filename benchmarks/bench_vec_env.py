@@ -0,0 +1,48 @@
+"""
+VecEnv 吞吐量基準測試（game-ticks / 秒 = 場次數 × step 數 / 秒）。
+
+    python -m benchmarks.bench_vec_env [--envs 4096] [--steps 500] [--mode endless] [--no-grid] [--no-copy]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from vec_env import MODES, VecEnv
+
+
+def bench(mode, envs, steps, grid_obs, copy_obs):
+    env = VecEnv(envs, mode=mode, grid_obs=grid_obs, copy_obs=copy_obs, max_ticks=5000)
+    env.reset()
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 5, size=(steps, envs), dtype=np.int8)
+
+    done_count = 0
+    total_reward = 0.0
+    t0 = time.perf_counter()
+    for t in range(steps):
+        _, reward, done, _ = env.step(actions[t])
+        done_count += int(done.sum())
+        total_reward += float(reward.sum())
+    elapsed = time.perf_counter() - t0
+
+    rate = envs * steps / elapsed
+    print(f"{mode:8s} envs {envs:6d} grid {str(grid_obs):5s} copy {str(copy_obs):5s} | "
+          f"{rate:12,.0f} ticks/s | episodes done {done_count:6d} | reward {total_reward:12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--envs", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--mode", choices=MODES)
+    parser.add_argument("--no-grid", action="store_true", help="只輸出位置，不組觀察格")
+    parser.add_argument("--no-copy", action="store_true", help="觀察直接回傳內部緩衝（copy_obs=False）")
+    args = parser.parse_args()
+
+    for mode in [args.mode] if args.mode else MODES:
+        bench(mode, args.envs, args.steps, not args.no_grid, not args.no_copy)
+
+
+if __name__ == "__main__":
+    main()
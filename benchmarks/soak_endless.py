@@ -0,0 +1,173 @@
+"""
+Endless 模式長時間浸泡測試（soak test）：確認記憶體在長時間遊玩後維持平穩。
+
+    python -m benchmarks.soak_endless [--hours 1] [--sample-seconds 60] [--max-growth-kib 512] [--autopilot safe]
+
+以無畫面方式跑數小時的模擬時間（60 tick = 1 秒），玩家由自動駕駛（autopilot.py）操作，
+被抓到時回到出生點繼續。每隔一段模擬時間取樣：
+- RSS（/proc/self/statm）、tracemalloc 目前用量、存活物件數
+- GC 暫停時間（gc.callbacks 量測 start → stop）
+
+暖機後的第一次取樣當作基準，結束時回報各型別物件數與各行配置的成長量；
+tracemalloc 或 RSS 成長超過門檻時以 exit code 1 結束。
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from autopilot import AUTOPILOTS, make_autopilot
+from models import EndlessMode
+
+TICKS_PER_SECOND = 60
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        # 沒有 /proc 時退而求其次用峰值（Linux 單位是 KiB）
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _type_counts():
+    return Counter(type(o).__name__ for o in gc.get_objects())
+
+
+class GCTimer:
+    """用 gc.callbacks 記錄每次回收的暫停時間（取樣時手動 gc.collect 的不算）"""
+
+    def __init__(self):
+        self.pauses = []
+        self.enabled = True
+        self._start = 0.0
+
+    def __call__(self, phase, info):
+        if not self.enabled:
+            return
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.pauses.append(time.perf_counter() - self._start)
+
+    def __enter__(self):
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self)
+
+
+def run(hours, sample_seconds, warmup_seconds, seed, autopilot):
+    random.seed(seed)
+    mode = EndlessMode()
+    pilot = make_autopilot(autopilot, seed)
+    spawn = (mode.player.center_x, mode.player.center_y)
+
+    total_ticks = int(hours * 3600 * TICKS_PER_SECOND)
+    sample_ticks = sample_seconds * TICKS_PER_SECOND
+    warmup_ticks = warmup_seconds * TICKS_PER_SECOND
+
+    tracemalloc.start()
+    samples = []
+    baseline = None
+    deaths = 0
+    wall_start = time.perf_counter()
+
+    print(f"{'sim min':>8s} {'RSS MiB':>8s} {'traced KiB':>11s} {'objects':>8s} {'gc':>5s} {'gc max ms':>9s}")
+    with GCTimer() as gc_timer:
+        for t in range(1, total_ticks + 1):
+            pilot.update(mode)
+            mode.update(1 / TICKS_PER_SECOND)
+            if mode.finished:
+                # 被抓到：回到出生點繼續（Endless 沒有勝利條件，只測長時間狀態）
+                deaths += 1
+                mode.finished = False
+                mode.result = None
+                mode.player.reset()
+                mode.player.center_x, mode.player.center_y = spawn
+
+            if t % sample_ticks and t != warmup_ticks:
+                continue
+            gc_timer.enabled = False
+            gc.collect()
+            gc_timer.enabled = True
+            counts = _type_counts()
+            sample = {
+                "tick": t,
+                "rss": _rss_bytes(),
+                "traced": tracemalloc.get_traced_memory()[0],
+                "objects": sum(counts.values()),
+                "gc": len(gc_timer.pauses),
+                "gc_max": max(gc_timer.pauses, default=0.0),
+            }
+            samples.append(sample)
+            print(f"{t / TICKS_PER_SECOND / 60:8.1f} {sample['rss'] / 2**20:8.1f} {sample['traced'] / 1024:11.1f} "
+                  f"{sample['objects']:8d} {sample['gc']:5d} {sample['gc_max'] * 1e3:9.2f}")
+            if t == warmup_ticks:
+                baseline = (sample, counts, tracemalloc.take_snapshot())
+
+    wall = time.perf_counter() - wall_start
+    final_counts = _type_counts()
+    final_snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    print(f"\n{total_ticks} ticks ({hours:.2f} h simulated) in {wall:.1f} s, {deaths} deaths, "
+          f"pool created {mode.pool.created} reused {mode.pool.reused}, "
+          f"{mode.pellets_eaten} pellets eaten, autopilot {pilot.stats()['mean_decide_us']:.0f} us/decision")
+    pauses = sorted(gc_timer.pauses)
+    if pauses:
+        print(f"GC pauses: {len(pauses)}, p50 {pauses[len(pauses) // 2] * 1e3:.2f} ms, "
+              f"max {pauses[-1] * 1e3:.2f} ms")
+    if baseline is None:
+        print("run shorter than warmup, no growth report")
+        return 0, 0
+
+    base_sample, base_counts, base_snapshot = baseline
+    growth = Counter(final_counts)
+    growth.subtract(base_counts)
+    print("\nobject count growth by type since warmup:")
+    for name, delta in growth.most_common(10):
+        if delta <= 0:
+            break
+        print(f"  {name:30s} +{delta}")
+
+    print("\ntop allocation growth by line since warmup:")
+    for stat in final_snapshot.compare_to(base_snapshot, "lineno")[:10]:
+        if stat.size_diff <= 0:
+            break
+        print(f"  {stat}")
+
+    last = samples[-1]
+    return last["traced"] - base_sample["traced"], last["rss"] - base_sample["rss"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=1.0, help="模擬時間（小時）")
+    parser.add_argument("--sample-seconds", type=int, default=60, help="取樣間隔（模擬秒數）")
+    parser.add_argument("--warmup-seconds", type=int, default=300, help="暖機時間，之後的第一次取樣當作基準")
+    parser.add_argument("--max-growth-kib", type=float, default=512, help="tracemalloc 成長上限")
+    parser.add_argument("--max-rss-growth-mib", type=float, default=32, help="RSS 成長上限")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--autopilot", choices=sorted(AUTOPILOTS), default="safe")
+    args = parser.parse_args()
+
+    traced_growth, rss_growth = run(args.hours, args.sample_seconds, args.warmup_seconds, args.seed,
+                                    args.autopilot)
+    print(f"\ntraced growth {traced_growth / 1024:.1f} KiB (limit {args.max_growth_kib}), "
+          f"RSS growth {rss_growth / 2**20:.1f} MiB (limit {args.max_rss_growth_mib})")
+    if traced_growth > args.max_growth_kib * 1024 or rss_growth > args.max_rss_growth_mib * 2**20:
+        print("FAIL: memory growth over threshold")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,23 @@
 import os
 import arcade
-from constants import PLAYER_SPEED, TILE_SIZE
+from constants import PLAYER_SPEED, TILE_SIZE, TURN_BUFFER_TICKS, TURN_GRACE_PX
+
+
+# 速度的定點小數：1/256 像素（與 vec_env 相同）。位置一律是整數像素，
+# 每個 tick 累加 round(speed * 256)，滿 256 走一個像素 → 1.15 這類速度是固定的步數序列
+SUBPIXEL = 256
+HALF_TILE = TILE_SIZE // 2
+
+
+def take_steps(sprite):
+    """依 sprite.speed 累加定點小數，回傳這個 tick 要走幾個像素"""
+    acc = sprite.move_acc + int(round(sprite.speed * SUBPIXEL))
+    sprite.move_acc = acc % SUBPIXEL
+    return acc // SUBPIXEL
+
+
+def at_tile_centre(sprite):
+    return sprite.center_x % TILE_SIZE == HALF_TILE and sprite.center_y % TILE_SIZE == HALF_TILE
 
 
 def autoscale(img_path, target_size):
@@ -17,98 +34,88 @@ class Player(arcade.Sprite):
 
         scale = autoscale(img, TILE_SIZE)
         super().__init__(img, scale)
+        # 轉向緩衝設定（None / 0 = 原本的行為：一直保留、只在路口中心轉）
+        self.turn_window = TURN_BUFFER_TICKS
+        self.turn_grace = TURN_GRACE_PX
+        self.reset()
 
+    def reset(self):
+        """回到剛生成的狀態（換地圖時重用同一個 Player）"""
         self.change_x = 0
         self.change_y = 0
         self.next_change_x = 0
         self.next_change_y = 0
+        self.turn_ticks_left = None
         
         # Start position at grid (1, 1) - top left walkable area
         # Y is inverted: row 1 in the array = (height - 1 - 1) in pixels
         self.center_x = 1 * TILE_SIZE + TILE_SIZE / 2
         self.center_y = (21 - 1 - 1) * TILE_SIZE + TILE_SIZE / 2
         self.speed = PLAYER_SPEED
+        self.move_acc = 0
+
+    def queue_turn(self, dx, dy):
+        """排入下一步方向，turn_window 個 tick 內沒遇到能轉的路口就丟掉"""
+        self.next_change_x = dx
+        self.next_change_y = dy
+        self.turn_ticks_left = self.turn_window
+
+    def _late_turn(self):
+        """剛走過路口中心不到 turn_grace 像素，且排入的是垂直方向的轉向"""
+        if self.next_change_x * self.change_x + self.next_change_y * self.change_y:
+            return False
+        along = ((self.center_x % TILE_SIZE - HALF_TILE) * self.change_x +
+                 (self.center_y % TILE_SIZE - HALF_TILE) * self.change_y)
+        return 0 < along <= self.turn_grace
+
+    def _blocked(self, grid, dx, dy):
+        """目前所在格往 (dx, dy) 的鄰格是不是牆（查 GridMap 的導覽平面）"""
+        col = int(self.center_x // TILE_SIZE) + dx
+        row = grid.height - 1 - int(self.center_y // TILE_SIZE) - dy
+        return not grid.walkable(col, row)
+
+    def _commit_turn(self):
+        self.change_x = self.next_change_x
+        self.change_y = self.next_change_y
+        self.next_change_x = 0
+        self.next_change_y = 0
+
+    def update_movement(self, grid):
+        """
+        整數像素移動：每個 tick 走 take_steps() 個像素，轉向與撞牆只在格子正中心判斷
+        （位置不會累積誤差，不需要 snap 回中心）
+        """
+        queued = self.next_change_x or self.next_change_y
+
+        # 停著的時候：排入的方向能走就立刻出發
+        if queued and self.change_x == 0 and self.change_y == 0:
+            if not self._blocked(grid, self.next_change_x, self.next_change_y):
+                self._commit_turn()
+
+        # 剛過路口中心才按：退回中心補轉
+        elif queued and self._late_turn():
+            x, y = self.center_x, self.center_y
+            self.center_x = x - x % TILE_SIZE + HALF_TILE
+            self.center_y = y - y % TILE_SIZE + HALF_TILE
+            if self._blocked(grid, self.next_change_x, self.next_change_y):
+                self.center_x, self.center_y = x, y
+            else:
+                self._commit_turn()
+
+        for _ in range(take_steps(self)):
+            if at_tile_centre(self):
+                if (self.next_change_x or self.next_change_y) and \
+                        not self._blocked(grid, self.next_change_x, self.next_change_y):
+                    self._commit_turn()
+                # 前方是牆：停在中心（方向保留，繼續「頂著」牆直到轉向）
+                if self._blocked(grid, self.change_x, self.change_y):
+                    break
+            self.center_x += self.change_x
+            self.center_y += self.change_y
 
-    def update_movement(self, walls):
-        # 1. Try to apply the queued turn if we are close to the center of a tile
-        if self.next_change_x != 0 or self.next_change_y != 0:
-            # Calculate distance to center of current tile
-            pixel_x = self.center_x
-            pixel_y = self.center_y
-            
-            # Find the center of the grid tile we are currently "in"
-            # (using integer division to find grid col/row, then back to pixels)
-            grid_x = int(pixel_x // TILE_SIZE) * TILE_SIZE + TILE_SIZE / 2
-            grid_y = int(pixel_y // TILE_SIZE) * TILE_SIZE + TILE_SIZE / 2
-            
-            dist = ((pixel_x - grid_x) ** 2 + (pixel_y - grid_y) ** 2) ** 0.5
-            
-            # If we are currently not moving, immediately apply the next direction
-            if self.change_x == 0 and self.change_y == 0:
-                # Check if this direction is valid
-                self.center_x += self.next_change_x * TILE_SIZE
-                self.center_y += self.next_change_y * TILE_SIZE
-                
-                if not arcade.check_for_collision_with_list(self, walls):
-                    # Valid move, reset position and set direction
-                    self.center_x -= self.next_change_x * TILE_SIZE
-                    self.center_y -= self.next_change_y * TILE_SIZE
-                    self.change_x = self.next_change_x
-                    self.change_y = self.next_change_y
-                    self.next_change_x = 0
-                    self.next_change_y = 0
-                else:
-                    # Blocked, just reset position
-                    self.center_x -= self.next_change_x * TILE_SIZE
-                    self.center_y -= self.next_change_y * TILE_SIZE
-
-            # If we are close enough to the center, try to turn
-            elif dist < self.speed:
-                # Check if the new direction is blocked
-                self.center_x = grid_x
-                self.center_y = grid_y
-                
-                original_x = self.change_x
-                original_y = self.change_y
-                
-                self.change_x = self.next_change_x
-                self.change_y = self.next_change_y
-                
-                # Temporarily move to check collision
-                self.center_x += self.change_x * TILE_SIZE
-                self.center_y += self.change_y * TILE_SIZE
-                
-                if arcade.check_for_collision_with_list(self, walls):
-                    # Blocked, revert direction
-                    self.change_x = original_x
-                    self.change_y = original_y
-                else:
-                    # Success, clear queued turn
-                    self.next_change_x = 0
-                    self.next_change_y = 0
-                
-                # Reset position for actual movement step
-                self.center_x = grid_x
-                self.center_y = grid_y
-
-        # 2. Move in current direction
-        self.center_x += self.change_x * self.speed
-        self.center_y += self.change_y * self.speed
-
-        # 3. Check for wall collision in current direction
-        if arcade.check_for_collision_with_list(self, walls):
-            # Hit a wall, stop and snap to previous valid position (center of tile)
-            self.center_x -= self.change_x * self.speed
-            self.center_y -= self.change_y * self.speed
-            
-            # Optional: Snap to exact center to look clean
-            grid_x = int(self.center_x // TILE_SIZE) * TILE_SIZE + TILE_SIZE / 2
-            grid_y = int(self.center_y // TILE_SIZE) * TILE_SIZE + TILE_SIZE / 2
-            self.center_x = grid_x
-            self.center_y = grid_y
-            
-            # Stop moving
-            # self.change_x = 0
-            # self.change_y = 0
-            # Note: In Pacman, you usually keep "pushing" against the wall until you turn, 
-            # but setting speed to 0 is also fine. Let's keep pushing but not move.
+        # 緩衝時間到還沒轉成：丟掉這個轉向
+        if (self.next_change_x or self.next_change_y) and self.turn_ticks_left is not None:
+            self.turn_ticks_left -= 1
+            if self.turn_ticks_left <= 0:
+                self.next_change_x = 0
+                self.next_change_y = 0
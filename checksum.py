@@ -0,0 +1,249 @@
+"""
+每 tick 的模擬狀態雜湊串流（lockstep / 回歸驗證用）
+
+BaseMode 每個 tick 結束時把完整狀態（分數、tick、豆子、玩家、每隻鬼的位置 / 方向 / 狀態 / 計時器、
+random 模組的位置、模式自訂資料）串接進 CRC32，與上一個 tick 的值連鎖（rolling），
+寫成每 tick 8 bytes 的 (tick u32, crc u32) 串流。兩份串流第一個不同的紀錄就是開始分歧的 tick。
+停用時 record() 是 no-op。
+
+    import checksum
+    checksum.enable("run.pmck")
+    ...
+    checksum.disable()
+
+    python checksum.py record base.pmck --mode classic --seed 0 --ticks 3600
+    python checksum.py diff base.pmck new.pmck            # 第一個分歧的 tick（有分歧時 exit code 1）
+    python checksum.py record a.pmck --dump 1234          # 印出該 tick 各部分的雜湊，找出是哪一塊不同
+
+檔案格式（little-endian）：header magic "PMCK"、version u8，之後是 (tick u32, crc u32) 紀錄。
+新的一場遊戲 tick 從 1 重新開始，雜湊鏈則延續。
+注意：AIScheduler 的每幀預算依牆鐘時間決定鬼能不能規劃，要比對的執行必須停用預算（budget_us=None）。
+"""
+import argparse
+import random
+import struct
+import sys
+import zlib
+from array import array
+
+import snapshot
+
+MAGIC = b"PMCK"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sB")
+_STATE = struct.Struct("<iIBB")
+# 鬼：位置、方向、速度 / 累加器、狀態、計時器、AI 模式、巡邏點、隨機度、困住計數，
+# recent_positions 只取長度與最後一筆（內容由位置推得，位置一分歧就會被抓到）
+_GHOST = struct.Struct("<ddbbdBBiiBiddddBHhh")
+_STATE_IDS = {name: i for i, name in enumerate(snapshot.GHOST_STATES)}
+_AI_MODE_IDS = {name: i for i, name in enumerate(snapshot.AI_MODES)}
+# Mersenne Twister 的位置與頭尾兩個字：抽取次數不同或 twist 過的次數不同都會改變
+_RNG = struct.Struct("<III")
+
+
+def _noop(*args):
+    return
+
+
+def _pack_ghost(g):
+    patrol = g.patrol_target or (0.0, 0.0)
+    recent = g.recent_positions
+    last = recent[-1] if recent else (0, 0)
+    return _GHOST.pack(
+        g.center_x, g.center_y, g.change_x, g.change_y, g.speed, g.move_acc,
+        _STATE_IDS[g.state], g.frightened_timer, g.frightened_duration,
+        _AI_MODE_IDS[g.ai_mode], g.mode_change_timer,
+        patrol[0], patrol[1], g.current_randomness, g.noise_offset,
+        g.stuck_counter, len(recent), last[0], last[1],
+    )
+
+
+def _parts(mode):
+    """(名稱, bytes)：組成雜湊的各部分"""
+    yield "state", _STATE.pack(mode.score, mode.tick, mode.finished, snapshot.RESULTS.index(mode.result))
+    yield "pellets", bytes(mode.pellet_grid)
+    yield "player", snapshot.pack_player(mode.player)
+    for i, g in enumerate(mode.ghosts):
+        yield f"ghost{i}", _pack_ghost(g)
+    mt = random.getstate()[1]
+    yield "rng", _RNG.pack(mt[624], mt[0], mt[623])
+    yield "extra", mode._pack_extra()
+
+
+def state_hash(mode, crc=0):
+    """把目前狀態接在 crc 後面算 CRC32"""
+    crc32 = zlib.crc32
+    for _, data in _parts(mode):
+        crc = crc32(data, crc)
+    return crc
+
+
+def components(mode):
+    """各部分各自的 CRC32（找出分歧的是哪一塊）"""
+    return {name: zlib.crc32(data) for name, data in _parts(mode)}
+
+
+class ChecksumStream:
+    def __init__(self, target=None, flush_ticks=1024, enabled=True):
+        # target：檔案路徑或已開啟的 binary 檔案物件
+        self.enabled = enabled and target is not None
+        self.flush_ticks = flush_ticks
+        self.crc = 0
+        self.ticks = 0
+        self._buf = array("I")
+
+        if not self.enabled:
+            self.record = _noop
+            return
+        self._owns_file = isinstance(target, str)
+        self._file = open(target, "wb") if self._owns_file else target
+        self._file.write(_HEADER.pack(MAGIC, VERSION))
+
+    def record(self, mode):
+        """每個 tick 結束時呼叫"""
+        self.crc = state_hash(mode, self.crc)
+        buf = self._buf
+        buf.append(mode.tick)
+        buf.append(self.crc)
+        self.ticks += 1
+        if len(buf) >= 2 * self.flush_ticks:
+            self._flush()
+
+    def _flush(self):
+        if sys.byteorder != "little":
+            self._buf.byteswap()
+        self._file.write(self._buf.tobytes())
+        self._buf = array("I")
+
+    def close(self):
+        if not self.enabled:
+            return
+        self._flush()
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+        self.enabled = False
+
+
+# 全域雜湊串流：預設停用（record 為 no-op）
+stream = ChecksumStream(enabled=False)
+
+
+def enable(target, flush_ticks=1024):
+    """開始把每 tick 的狀態雜湊寫到 target"""
+    global stream
+    stream.close()
+    stream = ChecksumStream(target, flush_ticks=flush_ticks)
+    return stream
+
+
+def disable():
+    global stream
+    stream.close()
+    stream = ChecksumStream(enabled=False)
+
+
+# ---------------- 讀取 / 比對 ----------------
+
+def read(path):
+    """回傳 (ticks, crcs) 兩個 array"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a checksum stream")
+    if version != VERSION:
+        raise ValueError(f"unsupported checksum stream version: {version}")
+    body = data[_HEADER.size:]
+    records = array("I")
+    records.frombytes(body[:len(body) // 8 * 8])
+    if sys.byteorder != "little":
+        records.byteswap()
+    return records[0::2], records[1::2]
+
+
+def first_divergence(a, b):
+    """
+    兩份 (ticks, crcs) 第一個不同的紀錄：(索引, a 的 tick, b 的 tick)；完全相同回傳 None。
+    其中一份比較短時，分歧點就是短的那份結束的地方（tick 為 None 表示那份已經沒有紀錄）。
+    """
+    ticks_a, crcs_a = a
+    ticks_b, crcs_b = b
+    n = min(len(crcs_a), len(crcs_b))
+    # 雜湊裡含 tick，連鎖後一旦不同之後都不同；逐筆找第一個不同的
+    for i in range(n):
+        if crcs_a[i] != crcs_b[i]:
+            return i, ticks_a[i], ticks_b[i]
+    if len(crcs_a) == len(crcs_b):
+        return None
+    return (n,
+            ticks_a[n] if n < len(ticks_a) else None,
+            ticks_b[n] if n < len(ticks_b) else None)
+
+
+# ---------------- CLI ----------------
+
+def record_headless(out, mode_name, seed, ticks, autopilot="safe", dump=None):
+    """無畫面跑一場並寫出雜湊串流；dump = tick 時印出該 tick 各部分的雜湊"""
+    from autopilot import make_autopilot
+    from models import ClassicMode, DynamicWallsMode, EndlessMode, WaveMode
+
+    modes = {"classic": ClassicMode, "endless": EndlessMode, "wave": WaveMode, "dynamic": DynamicWallsMode}
+    random.seed(seed)
+    mode = modes[mode_name]()
+    mode.ai_scheduler.budget_ns = None
+    pilot = make_autopilot(autopilot, seed)
+    # 直接當 script 執行時這個模組是 __main__，BaseMode 看到的是另一份 checksum.stream，
+    # 所以自己在每次 update 後記錄（和 BaseMode 的掛鉤記錄的是同一個時間點）
+    out_stream = ChecksumStream(out)
+    try:
+        while not mode.finished and mode.tick < ticks:
+            pilot.update(mode)
+            mode.update(1 / 60)
+            out_stream.record(mode)
+            if mode.tick == dump:
+                for name, crc in components(mode).items():
+                    print(f"  {name:8s} {crc:08x}")
+        print(f"{out}: {out_stream.ticks} ticks, final {out_stream.crc:08x}, result {mode.result or 'timeout'}")
+    finally:
+        out_stream.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="每 tick 狀態雜湊串流工具")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("record", help="無畫面跑一場並寫出雜湊串流")
+    p.add_argument("out")
+    p.add_argument("--mode", choices=("classic", "endless", "wave", "dynamic"), default="classic")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--ticks", type=int, default=3600)
+    p.add_argument("--autopilot", default="safe")
+    p.add_argument("--dump", type=int, help="印出這個 tick 各部分的雜湊")
+    p = sub.add_parser("diff", help="找出兩份串流第一個分歧的 tick")
+    p.add_argument("a")
+    p.add_argument("b")
+    p = sub.add_parser("info", help="紀錄數與場數")
+    p.add_argument("path")
+    args = parser.parse_args()
+
+    if args.cmd == "record":
+        record_headless(args.out, args.mode, args.seed, args.ticks, args.autopilot, args.dump)
+    elif args.cmd == "diff":
+        found = first_divergence(read(args.a), read(args.b))
+        if found is None:
+            print("identical")
+            return
+        index, tick_a, tick_b = found
+        print(f"diverged at record {index}: tick {tick_a} ({args.a}) / tick {tick_b} ({args.b})")
+        sys.exit(1)
+    else:
+        ticks, crcs = read(args.path)
+        sessions = sum(1 for i, t in enumerate(ticks) if i == 0 or t <= ticks[i - 1])
+        final = f"{crcs[-1]:08x}" if crcs else "-"
+        print(f"{args.path}: {len(ticks)} ticks, {sessions} sessions, final {final}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,5 +5,13 @@ SCREEN_HEIGHT = 21 * TILE_SIZE
 PLAYER_SPEED = 2.0
 GHOST_SPEED = 1.0
 
+TURN_BUFFER_TICKS = 32     # 預先按下的轉向保留幾個 tick，在下一個能轉的路口生效（None = 一直保留）
+TURN_GRACE_PX = 6          # 剛過路口中心幾個像素內按下的轉向，退回中心補轉（0 = 關閉）
+
+AI_FRAME_BUDGET_US = 2000  # 每幀鬼路徑規劃的時間預算（微秒），None = 不限制
+ARENA_FRAME_BUDGET_US = 10000  # 多場同畫面時每幀更新所有場次的時間預算（微秒），超過的場次下一幀優先
+HPA_MIN_CELLS = 100_000     # 地圖格數達到這個值時鬼改用 HPA*，None = 一律用模式的 PATHFINDER
+HPA_WARM_PER_TICK = 1       # HPA* 每 tick 預先建立幾個 cluster（每個約 1 ms；查詢碰到還沒建的會當場建）
+
 COLOR_BG = (0, 0, 0)
 
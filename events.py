@@ -0,0 +1,188 @@
+"""
+結構化事件紀錄（ring buffer + 背景 NDJSON writer）
+
+遊戲迴圈裡只做 record()：把幾個整數寫進預先配置好的陣列，
+真正的格式化與寫檔由背景執行緒負責。預設為停用狀態，
+此時 record() 是空函式，幾乎沒有成本。
+
+    import events
+    events.enable("events.ndjson")      # 開啟紀錄
+    events.log.record(events.STUCK, ghost, col, row)
+    events.disable()                    # 停止並把剩下的事件寫完
+"""
+import json
+import threading
+from array import array
+
+from snapshot import AI_MODES, GHOST_COLORS
+
+# ---------------- 事件種類 ----------------
+
+MODE_CHANGE = 1     # ghost, mode, reason
+STUCK = 2           # ghost, col, row
+PELLET_EATEN = 3    # cell, kind（2 = 豆子 / 3 = Power Pellet）
+GHOST_EATEN = 4     # ghost, col, row
+WAVE_START = 5      # wave
+DEATH = 6           # ghost, col, row
+MAP_GENERATED = 7   # width, height, walls
+
+# MODE_CHANGE 的 reason
+REASON_TIMER = 0
+REASON_ANTI_GROUPING = 1
+REASON_STUCK = 2
+
+EVENT_NAMES = {
+    MODE_CHANGE: "mode_change",
+    STUCK: "stuck",
+    PELLET_EATEN: "pellet_eaten",
+    GHOST_EATEN: "ghost_eaten",
+    WAVE_START: "wave_start",
+    DEATH: "death",
+    MAP_GENERATED: "map_generated",
+}
+
+EVENT_FIELDS = {
+    MODE_CHANGE: ("ghost", "mode", "reason"),
+    STUCK: ("ghost", "col", "row"),
+    PELLET_EATEN: ("cell", "kind"),
+    GHOST_EATEN: ("ghost", "col", "row"),
+    WAVE_START: ("wave",),
+    DEATH: ("ghost", "col", "row"),
+    MAP_GENERATED: ("width", "height", "walls"),
+}
+
+_REASONS = ("timer", "anti_grouping", "stuck")
+
+# 寫檔時把整數代碼轉回可讀字串
+_DECODERS = {
+    "ghost": GHOST_COLORS.__getitem__,
+    "mode": AI_MODES.__getitem__,
+    "reason": _REASONS.__getitem__,
+}
+
+
+def _noop(kind, a=0, b=0, c=0):
+    return
+
+
+class EventLog:
+    """
+    固定容量的事件 ring buffer。
+
+    - 主執行緒只呼叫 record()，寫入預先配置的 array，不建立任何物件
+    - 背景執行緒每 flush_interval 秒把新事件轉成 NDJSON 寫入檔案
+    - writer 追不上時最舊的事件會被覆蓋，並以 "dropped" 事件記錄數量
+    """
+
+    def __init__(self, path=None, capacity=4096, flush_interval=0.5, enabled=True):
+        # 容量取 2 的次方，索引用 & mask 取代 %
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.capacity = size
+        self._mask = size - 1
+
+        self._kind = array("B", bytes(size))
+        self._tick = array("I", bytes(4 * size))
+        self._a = array("i", bytes(4 * size))
+        self._b = array("i", bytes(4 * size))
+        self._c = array("i", bytes(4 * size))
+
+        self._head = 0       # 已寫入的事件總數
+        self._flushed = 0    # 已交給 writer 的事件總數
+        self.dropped = 0
+        self.tick = 0        # 由 BaseMode 每 tick 更新
+
+        self.path = path
+        self.enabled = enabled and path is not None
+        self._flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+        if not self.enabled:
+            self.record = _noop
+            return
+
+        self._file = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, kind, a=0, b=0, c=0):
+        i = self._head & self._mask
+        self._kind[i] = kind
+        self._tick[i] = self.tick
+        self._a[i] = a
+        self._b[i] = b
+        self._c[i] = c
+        self._head += 1
+
+    # ---------------- 背景寫檔 ----------------
+
+    def _drain(self):
+        head = self._head
+        start = self._flushed
+        if head - start > self.capacity:
+            self.dropped += head - start - self.capacity
+            start = head - self.capacity
+
+        lines = []
+        for n in range(start, head):
+            i = n & self._mask
+            kind = self._kind[i]
+            values = (self._a[i], self._b[i], self._c[i])
+            tick = self._tick[i]
+            # 讀取途中被主執行緒覆蓋 → 丟棄這筆
+            if self._head - n > self.capacity:
+                self.dropped += 1
+                continue
+
+            event = {"tick": tick, "event": EVENT_NAMES.get(kind, kind)}
+            for name, value in zip(EVENT_FIELDS.get(kind, ()), values):
+                decode = _DECODERS.get(name)
+                event[name] = decode(value) if decode else value
+            lines.append(json.dumps(event, separators=(",", ":")))
+
+        self._flushed = head
+        return lines
+
+    def _write(self):
+        lines = self._drain()
+        if self.dropped:
+            lines.append(json.dumps({"event": "dropped", "count": self.dropped}))
+            self.dropped = 0
+        if lines:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+
+    def _run(self):
+        while not self._stop.wait(self._flush_interval):
+            self._write()
+
+    def close(self):
+        """停止背景執行緒並把剩下的事件寫完"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._write()
+        self._file.close()
+
+
+# 全域事件紀錄：預設停用（record 為 no-op）
+log = EventLog(enabled=False)
+
+
+def enable(path, capacity=4096, flush_interval=0.5):
+    """開始把事件寫到 path（NDJSON）"""
+    global log
+    log.close()
+    log = EventLog(path, capacity=capacity, flush_interval=flush_interval)
+    return log
+
+
+def disable():
+    """停止紀錄，之後的 record() 都是 no-op"""
+    global log
+    log.close()
+    log = EventLog(enabled=False)
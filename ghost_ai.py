@@ -2,10 +2,15 @@ import arcade
 import random
 import os
 import time
-from collections import deque
 
+import events
 from constants import GHOST_SPEED, TILE_SIZE
-from character import autoscale
+from pathfinding import BFSPathfinder
+from character import at_tile_centre, autoscale, take_steps
+from snapshot import AI_MODES, GHOST_COLORS
+
+# 沒有由模式指定尋路後端時使用
+_DEFAULT_PATHFINDER = BFSPathfinder()
 
 
 class Ghost(arcade.Sprite):
@@ -25,6 +30,11 @@ class Ghost(arcade.Sprite):
 
         scale = autoscale(img, TILE_SIZE)
         super().__init__(img, scale)
+        self.reset(x, y, color)
+
+    def reset(self, x, y, color: str = "red"):
+        """回到剛生成的狀態（物件池重用時呼叫，貼圖沿用不重新載入）"""
+        self.alpha = 255
 
         # 放在格子中心
         self.center_x = x + TILE_SIZE / 2
@@ -36,7 +46,9 @@ class Ghost(arcade.Sprite):
         self.change_y = direction[1]
 
         self.speed = GHOST_SPEED
+        self.move_acc = 0
         self.ghost_color = color
+        self._color_id = GHOST_COLORS.index(color) if color in GHOST_COLORS else 0
 
         # 狀態
         self.state = "chase"  # chase / frightened / eaten
@@ -75,10 +87,15 @@ class Ghost(arcade.Sprite):
         self.stuck_counter = 0
         self.position_check_interval = 15
 
-        # BFS 用的導覽格
+        # 尋路用的導覽格與後端（pathfinding.Pathfinder，由 BaseMode 依模式指定）
         self.nav_grid = None
         self.grid_width = 0
         self.grid_height = 0
+        self.pathfinder = _DEFAULT_PATHFINDER
+
+        # 預先維護好的距離場：目標格 (row, col) → nav_field.DistanceField
+        # 目標剛好有距離場時直接查 next hop，不跑 BFS
+        self.nav_fields = None
 
         # 由 BaseMode 塞進來的鬼群列表（團隊戰術 / anti-grouping 用）
         self._all_ghosts = None
@@ -105,69 +122,38 @@ class Ghost(arcade.Sprite):
         y = (self.grid_height - 1 - row) * TILE_SIZE + TILE_SIZE / 2
         return x, y
 
-    def _bfs_next_world(self, start_x: float, start_y: float,
+    def _bfs_next_world(self, grid, start_x: float, start_y: float,
                         target_x: float, target_y: float):
-        """標準 BFS，回傳從起點到目標路徑中的下一步世界座標。"""
+        """
+        回傳從起點到目標最短路徑中的下一步世界座標（由 self.pathfinder 計算）。
+        目標落在牆上或地圖外時，查表換成最近的可走格。
+        """
         if self.nav_grid is None:
             return None
 
         start_rc = self._world_to_grid(start_x, start_y)
-        target_rc = self._world_to_grid(target_x, target_y)
-        if start_rc is None or target_rc is None:
+        if start_rc is None:
             return None
-
         sr, sc = start_rc
-        tr, tc = target_rc
-
-        # 目標如果是牆就放棄
-        if not self.nav_grid[tr][tc]:
-            return None
-
-        q = deque()
-        q.append((sr, sc))
-        visited = {(sr, sc)}
-        parent = {}
-
-        dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # 上下左右
-
-        found = False
-        while q:
-            r, c = q.popleft()
-            if (r, c) == (tr, tc):
-                found = True
-                break
-
-            for dr, dc in dirs:
-                nr, nc = r + dr, c + dc
-                if not (0 <= nr < self.grid_height and 0 <= nc < self.grid_width):
-                    continue
-                if not self.nav_grid[nr][nc]:
-                    continue
-                if (nr, nc) in visited:
-                    continue
-                visited.add((nr, nc))
-                parent[(nr, nc)] = (r, c)
-                q.append((nr, nc))
 
-        if not found:
+        target = grid.nearest_walkable(int(target_x // TILE_SIZE),
+                                       grid.height - 1 - int(target_y // TILE_SIZE))
+        if target < 0:
             return None
+        tr, tc = divmod(target, grid.width)
 
-        # 回溯路徑
-        path = []
-        cur = (tr, tc)
-        while cur != (sr, sc):
-            path.append(cur)
-            cur = parent[cur]
-        path.append((sr, sc))
-        path.reverse()
+        if self.nav_fields:
+            field = self.nav_fields.get((tr, tc))
+            if field is not None:
+                hop = field.next_hop(sr, sc)
+                return self._grid_to_world(*hop) if hop else None
 
-        if len(path) < 2:
-            return None
-
-        nr, nc = path[1]
-        return self._grid_to_world(nr, nc)
+        step = self.pathfinder.next_step(
+            self.nav_grid, self.grid_width, self.grid_height, (sr, sc), (tr, tc)
+        )
+        return self._grid_to_world(*step) if step else None
 
-    def _choose_path_variant(self, sx: float, sy: float,
+    def _choose_path_variant(self, grid, sx: float, sy: float,
                              tx: float, ty: float):
         """
         Strategic Diversity：
@@ -175,7 +161,7 @@ class Ghost(arcade.Sprite):
         避免大家都走完全一樣的 BFS path。
         """
         # baseline：最短路徑
-        base_next = self._bfs_next_world(sx, sy, tx, ty)
+        base_next = self._bfs_next_world(grid, sx, sy, tx, ty)
 
         # 紅鬼：永遠使用最短路
         if self.ghost_color == "red":
@@ -192,7 +178,7 @@ class Ghost(arcade.Sprite):
                 (0, -TILE_SIZE),
             ])
             tx2, ty2 = tx + offset[0], ty + offset[1]
-            alt_next = self._bfs_next_world(sx, sy, tx2, ty2)
+            alt_next = self._bfs_next_world(grid, sx, sy, tx2, ty2)
             return alt_next or base_next
 
         # 粉鬼：偏好弧線路徑，部份時間使用「斜向目標」
@@ -205,7 +191,7 @@ class Ghost(arcade.Sprite):
                     (-TILE_SIZE, -TILE_SIZE),
                 ])
                 tx2, ty2 = tx + alt[0], ty + alt[1]
-                alt_next = self._bfs_next_world(sx, sy, tx2, ty2)
+                alt_next = self._bfs_next_world(grid, sx, sy, tx2, ty2)
                 return alt_next or base_next
             return base_next
 
@@ -220,35 +206,19 @@ class Ghost(arcade.Sprite):
     # ------------------------------------------------------------------
     # 其他工具
     # ------------------------------------------------------------------
-    def validate_and_set_direction(self, walls):
+    def validate_and_set_direction(self, grid):
         """Validate initial direction and pick a valid one if needed"""
-        old_x, old_y = self.center_x, self.center_y
-        test_x = self.center_x + self.change_x * TILE_SIZE
-        test_y = self.center_y + self.change_y * TILE_SIZE
-
-        self.center_x = test_x
-        self.center_y = test_y
-
-        if not arcade.check_for_collision_with_list(self, walls):
-            self.center_x, self.center_y = old_x, old_y
+        if not self._blocked(grid, self.change_x, self.change_y):
             return
 
-        self.center_x, self.center_y = old_x, old_y
         directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
         random.shuffle(directions)
 
         for dx, dy in directions:
-            test_x = old_x + dx * TILE_SIZE
-            test_y = old_y + dy * TILE_SIZE
-            self.center_x = test_x
-            self.center_y = test_y
-
-            if not arcade.check_for_collision_with_list(self, walls):
-                self.center_x, self.center_y = old_x, old_y
+            if not self._blocked(grid, dx, dy):
                 self.change_x, self.change_y = dx, dy
                 return
 
-        self.center_x, self.center_y = old_x, old_y
         self.change_x, self.change_y = 0, 0
 
     def set_frightened(self):
@@ -303,6 +273,8 @@ class Ghost(arcade.Sprite):
             self.ai_mode = random.choices(modes, weights=weights)[0]
             self.mode_change_timer = random.randint(120, 300)
             self.patrol_target = None
+            events.log.record(events.MODE_CHANGE, self._color_id,
+                              AI_MODES.index(self.ai_mode), events.REASON_TIMER)
 
             # 偶爾改變隨機性
             if random.random() < 0.3:
@@ -323,7 +295,8 @@ class Ghost(arcade.Sprite):
             target_x, target_y = self.patrol_target
 
         elif self.ai_mode == "random_walk":
-            t = time.time() * 0.5
+            # 用模式計時器當時間軸（每 tick 走 1/60 秒），不用牆鐘，模擬才能重現
+            t = self.mode_change_timer * (0.5 / 60)
             noise_x = self.simple_noise(t, 0) * 10
             noise_y = self.simple_noise(0, t) * 10
             target_x = self.center_x + noise_x * TILE_SIZE
@@ -365,117 +338,159 @@ class Ghost(arcade.Sprite):
     # ------------------------------------------------------------------
     # 主 AI 更新
     # ------------------------------------------------------------------
-    def update_ai(self, walls, player_x, player_y, player_dx, player_dy):
-        """混合AI系統 - 結合多種行為模式 + BFS + 路線分化"""
-        # frightened 計時
+    def update_ai(self, grid, player_x, player_y, player_dx, player_dy, planner=None):
+        """
+        混合AI系統 - 結合多種行為模式 + BFS + 路線分化
+        planner（AIScheduler）不允許規劃時，保留目前方向，下一幀再決策
+        """
+        self.tick_frightened()
+        target_x, target_y = self.current_target(player_x, player_y, player_dx, player_dy)
+        self._advance(grid, self._choose_direction, target_x, target_y, planner)
+
+    def follow(self, grid, decision):
+        """
+        AI worker 模式：決策在另一個行程算好（ai_worker.AIWorker），這裡只移動。
+        decision = (格子索引, dx, dy)；回傳 False 表示這一 tick 停下來等決策
+        """
+        self.tick_frightened()
+        return self._advance(grid, self._apply_decision, decision)
+
+    def tick_frightened(self):
+        """frightened 計時"""
         if self.state == "frightened":
             self.frightened_timer -= 1
             if self.frightened_timer <= 0:
                 self.state = "chase"
                 self.alpha = 255
 
-        # 嘗試往目前方向前進
-        new_x = self.center_x + self.change_x * self.speed
-        new_y = self.center_y + self.change_y * self.speed
-
-        old_x, old_y = self.center_x, self.center_y
-        self.center_x = new_x
-        self.center_y = new_y
-
-        hit_wall = arcade.check_for_collision_with_list(self, walls)
-
-        # 先取得目標位置
+    def current_target(self, player_x, player_y, player_dx, player_dy):
+        """這一 tick 的目標位置（模式計時器每個 tick 都要走）"""
         if self.state == "frightened":
             # 驚嚇時完全隨機逃跑
-            target_x = self.center_x + random.randint(-5, 5) * TILE_SIZE
-            target_y = self.center_y + random.randint(-5, 5) * TILE_SIZE
-        else:
-            target_x, target_y = self.get_target_position(player_x, player_y, player_dx, player_dy)
-
-        if hit_wall:
-            # 碰牆 → 回到原點並重新決策方向
-            self.center_x, self.center_y = old_x, old_y
-
-            used_bfs = False
-            # 非驚嚇狀態且有 nav_grid → 優先使用路徑搜尋（含分化）
-            if self.state != "frightened" and self.nav_grid is not None:
-                next_world = self._choose_path_variant(old_x, old_y, target_x, target_y)
-                if next_world is not None:
-                    nx, ny = next_world
-                    dx = nx - old_x
-                    dy = ny - old_y
-                    if abs(dx) > abs(dy):
-                        self.change_x = 1 if dx > 0 else -1
-                        self.change_y = 0
-                    else:
-                        self.change_y = 1 if dy > 0 else -1
-                        self.change_x = 0
-                    used_bfs = True
-
-            # BFS 失敗 / 驚嚇狀態 → 回到原本四方向測試 + 加權隨機
-            if not used_bfs:
-                directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-                random.shuffle(directions)
-                valid_moves = []
-
-                for dx, dy in directions:
-                    if dx == -self.change_x and dy == -self.change_y:
-                        continue
-
-                    test_x = old_x + dx * self.speed * 2
-                    test_y = old_y + dy * self.speed * 2
-
-                    self.center_x = test_x
-                    self.center_y = test_y
-
-                    if not arcade.check_for_collision_with_list(self, walls):
-                        valid_moves.append((dx, dy))
+            return (self.center_x + random.randint(-5, 5) * TILE_SIZE,
+                    self.center_y + random.randint(-5, 5) * TILE_SIZE)
+        return self.get_target_position(player_x, player_y, player_dx, player_dy)
+
+    def _advance(self, grid, decide, *args):
+        """整數像素前進；只在格子正中心、前方是牆時呼叫 decide 重新決策方向"""
+        for _ in range(take_steps(self)):
+            if at_tile_centre(self) and self._blocked(grid, self.change_x, self.change_y):
+                if not decide(grid, *args):
+                    return False
+                if self._blocked(grid, self.change_x, self.change_y):
+                    return False
+            self.center_x += self.change_x
+            self.center_y += self.change_y
+        return True
+
+    def _apply_decision(self, grid, decision):
+        """worker 給的決策是這一格的才採用"""
+        if decision is None:
+            return False
+        idx, dx, dy = decision
+        col = int(self.center_x // TILE_SIZE)
+        row = grid.height - 1 - int(self.center_y // TILE_SIZE)
+        if idx != row * grid.width + col:
+            return False
+        self.change_x, self.change_y = dx, dy
+        return True
+
+    def _blocked(self, grid, dx, dy):
+        """從目前所在格往 (dx, dy) 的鄰格是不是牆（不動也算擋住，需要重新決策）"""
+        if dx == 0 and dy == 0:
+            return True
+        col = int(self.center_x // TILE_SIZE) + dx
+        row = grid.height - 1 - int(self.center_y // TILE_SIZE) - dy
+        return not grid.walkable(col, row)
+
+    def _choose_direction(self, grid, target_x, target_y, planner):
+        """
+        在格子中心碰牆時選新方向；planner 不允許規劃時回傳 False（停在原地，下一幀再決策）
+        """
+        old_x, old_y = self.center_x, self.center_y
 
-                    self.center_x, self.center_y = old_x, old_y
+        used_bfs = False
+        # 非驚嚇狀態且有 nav_grid → 優先使用路徑搜尋（含分化）
+        if self.state != "frightened" and self.nav_grid is not None:
+            if planner is not None and not planner.allow(self):
+                return False
+            start_ns = time.perf_counter_ns()
+            next_world = self._choose_path_variant(grid, old_x, old_y, target_x, target_y)
+            if planner is not None:
+                planner.charge(time.perf_counter_ns() - start_ns)
+            if next_world is not None:
+                nx, ny = next_world
+                dx = nx - old_x
+                dy = ny - old_y
+                if abs(dx) > abs(dy):
+                    self.change_x = 1 if dx > 0 else -1
+                    self.change_y = 0
+                else:
+                    self.change_y = 1 if dy > 0 else -1
+                    self.change_x = 0
+                used_bfs = True
+            elif planner is not None:
+                planner.fallback(self)
+
+        # BFS 失敗 / 驚嚇狀態 → 回到原本四方向測試 + 加權隨機
+        if not used_bfs:
+            directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+            random.shuffle(directions)
+            valid_moves = []
+
+            for dx, dy in directions:
+                if dx == -self.change_x and dy == -self.change_y:
+                    continue
+                if not self._blocked(grid, dx, dy):
+                    valid_moves.append((dx, dy))
 
-                if not valid_moves:
-                    valid_moves = [(-self.change_x, -self.change_y)]
+            if not valid_moves:
+                valid_moves = [(-self.change_x, -self.change_y)]
 
-                if valid_moves:
-                    rand = random.random()
-                    if self.state == "frightened" or rand < self.current_randomness:
-                        self.change_x, self.change_y = random.choice(valid_moves)
+            if valid_moves:
+                rand = random.random()
+                if self.state == "frightened" or rand < self.current_randomness:
+                    self.change_x, self.change_y = random.choice(valid_moves)
+                else:
+                    weights = []
+                    for dx, dy in valid_moves:
+                        next_x = old_x + dx * TILE_SIZE
+                        next_y = old_y + dy * TILE_SIZE
+                        dist = ((next_x - target_x) ** 2 + (next_y - target_y) ** 2) ** 0.5
+                        noise = self.simple_noise(next_x * 0.01, next_y * 0.01) * 0.5 + 0.5
+                        weight = (1.0 / (dist + 1)) * (0.5 + noise)
+                        weights.append(weight)
+
+                    total_weight = sum(weights)
+                    if total_weight > 0:
+                        rand_val = random.uniform(0, total_weight)
+                        cumulative = 0
+                        for i, weight in enumerate(weights):
+                            cumulative += weight
+                            if rand_val <= cumulative:
+                                self.change_x, self.change_y = valid_moves[i]
+                                break
                     else:
-                        weights = []
-                        for dx, dy in valid_moves:
-                            next_x = old_x + dx * TILE_SIZE
-                            next_y = old_y + dy * TILE_SIZE
-                            dist = ((next_x - target_x) ** 2 + (next_y - target_y) ** 2) ** 0.5
-                            noise = self.simple_noise(next_x * 0.01, next_y * 0.01) * 0.5 + 0.5
-                            weight = (1.0 / (dist + 1)) * (0.5 + noise)
-                            weights.append(weight)
-
-                        total_weight = sum(weights)
-                        if total_weight > 0:
-                            rand_val = random.uniform(0, total_weight)
-                            cumulative = 0
-                            for i, weight in enumerate(weights):
-                                cumulative += weight
-                                if rand_val <= cumulative:
-                                    self.change_x, self.change_y = valid_moves[i]
-                                    break
-                        else:
-                            self.change_x, self.change_y = random.choice(valid_moves)
-
-            # Anti-grouping：避免多隻鬼長時間重疊
-            if self._all_ghosts:
-                for other in self._all_ghosts:
-                    if other is self:
-                        continue
-                    dist = ((self.center_x - other.center_x) ** 2 +
-                            (self.center_y - other.center_y) ** 2) ** 0.5
-                    if dist < self.avoid_radius:
-                        if random.random() < 0.6:
-                            self.ai_mode = random.choice(["scatter", "patrol", "random_walk"])
-                            self.mode_change_timer = random.randint(60, 180)
-                        break
-
-            self._check_if_stuck(old_x, old_y)
+                        self.change_x, self.change_y = random.choice(valid_moves)
+
+        # Anti-grouping：避免多隻鬼長時間重疊
+        if self._all_ghosts:
+            for other in self._all_ghosts:
+                if other is self:
+                    continue
+                dist = ((self.center_x - other.center_x) ** 2 +
+                        (self.center_y - other.center_y) ** 2) ** 0.5
+                if dist < self.avoid_radius:
+                    if random.random() < 0.6:
+                        self.ai_mode = random.choice(["scatter", "patrol", "random_walk"])
+                        self.mode_change_timer = random.randint(60, 180)
+                        events.log.record(events.MODE_CHANGE, self._color_id,
+                                          AI_MODES.index(self.ai_mode),
+                                          events.REASON_ANTI_GROUPING)
+                    break
+
+        self._check_if_stuck(old_x, old_y)
+        return True
 
     # ------------------------------------------------------------------
     # 困住檢測
@@ -500,6 +515,9 @@ class Ghost(arcade.Sprite):
                     self.mode_change_timer = random.randint(60, 120)
                     self.stuck_counter = 0
                     self.recent_positions.clear()
-                    print(f"{self.ghost_color} ghost detected stuck! Forcing mode change.")
+                    events.log.record(events.STUCK, self._color_id, grid_pos[0],
+                                      self.grid_height - 1 - grid_pos[1])
+                    events.log.record(events.MODE_CHANGE, self._color_id,
+                                      AI_MODES.index(self.ai_mode), events.REASON_STUCK)
             else:
                 self.stuck_counter = max(0, self.stuck_counter - 1)
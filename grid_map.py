@@ -0,0 +1,189 @@
+"""
+扁平的共用地圖（GridMap）：生成器、導覽、碰撞、豆子狀態都讀同一塊 bytearray
+
+一張地圖只配置一次 4 * width * height bytes，切成四個平面（row 0 在最上方，索引 = row * width + col）：
+    tiles    原始 tile（0 路 / 1 牆 / 2 豆子 / 3 Power Pellet），生成後不變
+    nav      1 = 可走（動態牆壁開關牆時用 set_walkable 改）
+    exits    可走方向 bitmask（EXIT_UP / DOWN / LEFT / RIGHT），set_walkable 時一起維護
+    pellets  目前的豆子狀態（0 / 2 / 3），由 BaseMode 維護
+前三個平面的順序與地圖庫的 record 相同。從地圖庫載入時 tiles / exits 可以直接用 mmap 上的唯讀 view
+（from_record(record, share=True)），同一張地圖的多場遊戲共用一份，每場只配置 nav 與 pellets（2 * n bytes）。
+
+每個平面都是 memoryview（零複製）；nav_rows 是導覽平面各列的 memoryview，
+給沿用 nav_grid[r][c] 寫法的程式（尋路、鬼 AI、距離場），rows(plane) 依需要切出其他平面的列；
+array(plane) 回傳零複製的 (h, w) NumPy 陣列。
+GridMap 本身也可以當「tile 列的序列」用（len / grid[r][c] / for row in grid）。
+
+nearest_walkable(col, row) 把任意格（牆、地圖外）對應到最近的可走格（曼哈頓距離），
+鬼的目標點落在牆上或地圖外時一次查表就能解決；表第一次查詢時才建立，set_walkable 後重建。
+"""
+from array import array
+from collections import deque
+
+import numpy as np
+
+EXIT_UP = 1
+EXIT_DOWN = 2
+EXIT_LEFT = 4
+EXIT_RIGHT = 8
+
+TILES = 0
+NAV = 1
+EXITS = 2
+PELLETS = 3
+
+# tile → nav（牆 0，其餘 1）
+_NAV_TABLE = bytes.maketrans(b"\x00\x01\x02\x03", b"\x01\x00\x01\x01")
+
+
+def compute_exits(nav, width, height):
+    """每格可走方向的 bitmask（row 0 在最上方，UP = row - 1）"""
+    exits = bytearray(width * height)
+    for r in range(height):
+        for c in range(width):
+            idx = r * width + c
+            if not nav[idx]:
+                continue
+            mask = 0
+            if r > 0 and nav[idx - width]:
+                mask |= EXIT_UP
+            if r < height - 1 and nav[idx + width]:
+                mask |= EXIT_DOWN
+            if c > 0 and nav[idx - 1]:
+                mask |= EXIT_LEFT
+            if c < width - 1 and nav[idx + 1]:
+                mask |= EXIT_RIGHT
+            exits[idx] = mask
+    return bytes(exits)
+
+
+class GridMap:
+    def __init__(self, width, height, fill=0, shared=None):
+        self.width = width
+        self.height = height
+        n = width * height
+        if shared is None:
+            self.buf = bytearray([fill]) * n + bytearray(3 * n)
+            view = memoryview(self.buf)
+            self.tiles = view[0:n]
+            self.nav = view[n:2 * n]
+            self.exits = view[2 * n:3 * n]
+            self.pellets = view[3 * n:4 * n]
+        else:
+            # shared = (tiles, exits)：別人的唯讀 view，自己只配置 nav 與 pellets
+            self.buf = bytearray(2 * n)
+            view = memoryview(self.buf)
+            self.tiles, self.exits = shared
+            self.nav = view[0:n]
+            self.pellets = view[n:2 * n]
+        self.nav_rows = self.rows(NAV)
+        self._nearest = None      # 每格最近可走格的索引（-1 = 整張地圖沒有可走格）
+
+    @classmethod
+    def from_tiles(cls, tiles, width, height):
+        """從扁平的 tile bytes（snapshot / 網路等來源）建立，並算出 nav 與 exits"""
+        grid = cls(width, height)
+        grid.tiles[:] = tiles
+        grid.refresh()
+        return grid
+
+    @classmethod
+    def from_record(cls, record, share=False):
+        """
+        從地圖庫的 MapRecord 建立，不重算：
+        share=False 時 tiles / nav / exits 整段複製；share=True 時 tiles / exits 直接用 record 的唯讀 view
+        （之後不能 set_walkable），只複製 nav
+        """
+        if not share:
+            grid = cls(record.width, record.height)
+            grid.tiles[:] = record.tiles
+            grid.exits[:] = record.exits
+        else:
+            grid = cls(record.width, record.height, shared=(record.tiles, record.exits))
+        grid.nav[:] = record.nav
+        return grid
+
+    def refresh(self):
+        """tiles 改完之後（生成器）重算 nav 與 exits"""
+        self.nav[:] = self.tiles.tobytes().translate(_NAV_TABLE)
+        self.exits[:] = compute_exits(self.nav, self.width, self.height)
+        self._nearest = None
+
+    # ---------------- 查詢 ----------------
+
+    def walkable(self, col, row):
+        """(col, row) 在地圖內且可走"""
+        return 0 <= row < self.height and 0 <= col < self.width and bool(self.nav[row * self.width + col])
+
+    def nearest_walkable(self, col, row):
+        """離 (col, row) 最近的可走格索引；地圖外的座標先夾回邊界。整張地圖沒有可走格時回傳 -1"""
+        if self._nearest is None:
+            self._nearest = self._build_nearest()
+        col = 0 if col < 0 else self.width - 1 if col >= self.width else col
+        row = 0 if row < 0 else self.height - 1 if row >= self.height else row
+        return self._nearest[row * self.width + col]
+
+    def _build_nearest(self):
+        """從所有可走格同時 BFS（不管牆），每格記下最先抵達它的可走格"""
+        w, h = self.width, self.height
+        nav = self.nav
+        nearest = array("i", [-1]) * (w * h)
+        queue = deque()
+        for idx in range(w * h):
+            if nav[idx]:
+                nearest[idx] = idx
+                queue.append(idx)
+        while queue:
+            idx = queue.popleft()
+            src = nearest[idx]
+            r, c = divmod(idx, w)
+            for ok, n in ((r > 0, idx - w), (r < h - 1, idx + w), (c > 0, idx - 1), (c < w - 1, idx + 1)):
+                if ok and nearest[n] < 0:
+                    nearest[n] = src
+                    queue.append(n)
+        return nearest
+
+    def rows(self, plane):
+        """某個平面各列的 memoryview（可寫，改的就是地圖本身；共用的唯讀平面除外）"""
+        w = self.width
+        view = (self.tiles, self.nav, self.exits, self.pellets)[plane]
+        return [view[r * w:(r + 1) * w] for r in range(self.height)]
+
+    def array(self, plane):
+        """零複製的 (height, width) uint8 NumPy 陣列；寫入會直接改到地圖（共用的唯讀平面則不可寫）"""
+        view = (self.tiles, self.nav, self.exits, self.pellets)[plane]
+        return np.frombuffer(view, dtype=np.uint8).reshape(self.height, self.width)
+
+    # ---------------- 動態牆壁 ----------------
+
+    def set_walkable(self, idx, walkable):
+        """開 / 關一格，並更新這格與四個鄰格的出口 bitmask"""
+        w = self.width
+        nav, exits = self.nav, self.exits
+        nav[idx] = 1 if walkable else 0
+        r, c = divmod(idx, w)
+        mask = 0
+        for ok, n, bit, back in ((r > 0, idx - w, EXIT_UP, EXIT_DOWN),
+                                 (r < self.height - 1, idx + w, EXIT_DOWN, EXIT_UP),
+                                 (c > 0, idx - 1, EXIT_LEFT, EXIT_RIGHT),
+                                 (c < w - 1, idx + 1, EXIT_RIGHT, EXIT_LEFT)):
+            if not ok or not nav[n]:
+                continue
+            if walkable:
+                mask |= bit
+                exits[n] |= back
+            else:
+                exits[n] &= ~back
+        exits[idx] = mask
+        self._nearest = None
+
+    # ---------------- list of rows 相容 ----------------
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, row):
+        return self.tiles[row * self.width:(row + 1) * self.width]
+
+    def __iter__(self):
+        return iter(self.rows(TILES))
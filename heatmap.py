@@ -0,0 +1,281 @@
+"""
+佔據熱圖（玩家 / 各色鬼停留位置、死亡位置、最後被吃的豆子）
+
+遊戲迴圈裡每個 tick 只把玩家與鬼的座標 append 到 list（停用時 sample() 是 no-op）；
+累積滿 flush_ticks 個 tick 後一次換算成格子索引，用 np.bincount 加進 NumPy 計數格，
+close() 時把每張地圖（segment）與彙總一次寫成壓縮的 .npz。
+
+    import heatmap
+    heatmap.enable("heat.npz")
+    ...
+    heatmap.disable()                  # 寫檔
+
+    python heatmap.py info heat.npz    # segment 列表與鬼最常擠在一起的格子
+    python heatmap.py render heat.npz heat.png [--layer crowded]
+
+圖層（LAYERS 的順序即為 counts 第一維的索引）：
+    player, ghost_red, ghost_blue, ghost_pink, ghost_orange
+    crowded   同一 tick 有兩隻以上的鬼在同一格（每多一隻 +1）
+    death     玩家被抓到的位置
+    late      每張地圖最後被吃掉的 10% 豆子（segment 結束時計算）
+每個 segment 另外存 tiles（地圖）與 pellet_tick（每格豆子最後被吃的 tick，-1 = 沒被吃）。
+"""
+import argparse
+
+import numpy as np
+
+from constants import TILE_SIZE
+from snapshot import GHOST_COLORS
+
+LAYERS = ("player",) + tuple(f"ghost_{c}" for c in GHOST_COLORS) + ("crowded", "death", "late")
+PLAYER = 0
+GHOST = 1
+CROWDED = LAYERS.index("crowded")
+DEATH = LAYERS.index("death")
+LATE = LAYERS.index("late")
+LATE_FRACTION = 0.1
+
+
+def _noop(*args):
+    return
+
+
+class Segment:
+    """一張地圖的計數"""
+
+    def __init__(self, session, tiles, width, height):
+        self.session = session
+        self.width = width
+        self.height = height
+        self.tiles = np.frombuffer(tiles, dtype=np.uint8).reshape(height, width).copy()
+        self.counts = np.zeros((len(LAYERS), height, width), dtype=np.int64)
+        self.pellet_tick = np.full((height, width), -1, dtype=np.int64)
+        self.ticks = 0
+
+    def finish(self):
+        """把最後被吃的那一批豆子記到 late 圖層"""
+        eaten = self.pellet_tick[self.pellet_tick >= 0]
+        if eaten.size:
+            cutoff = np.quantile(eaten, 1 - LATE_FRACTION)
+            self.counts[LATE] += self.pellet_tick >= cutoff
+
+
+class HeatmapRecorder:
+    def __init__(self, path=None, flush_ticks=4096, max_segments=256, enabled=True):
+        self.path = path
+        self.enabled = enabled and path is not None
+        self.flush_ticks = flush_ticks
+        self.max_segments = max_segments   # 超過時只保留彙總，最舊的 segment 明細丟掉
+        self.segments = []
+        self.totals = {}          # (height, width) → counts 彙總
+        self.dropped_segments = 0
+        self._segment = None
+        self._mode = None
+        self._session = -1
+        # 待加總的樣本：座標、圖層、每個 tick 在 _positions 中的起點；死亡格另存
+        self._positions = []
+        self._layers = []
+        self._tick_starts = []
+        self._deaths = []
+
+        if not self.enabled:
+            self.begin_map = _noop
+            self.sample = _noop
+            self.death = _noop
+            self.pellet_eaten = _noop
+
+    # ---------------- 遊戲迴圈呼叫 ----------------
+
+    def begin_map(self, mode):
+        """BaseMode 建好新地圖時呼叫：結束上一個 segment，開始新的"""
+        self._end_segment()
+        if mode is not self._mode:
+            self._mode = mode
+            self._session += 1
+        self._segment = Segment(self._session, mode.map_bytes, mode.grid_width, mode.grid_height)
+
+    def sample(self, mode):
+        """每個 tick 呼叫一次：記錄玩家與每隻鬼所在的格子"""
+        if self._segment is None:
+            self.begin_map(mode)   # 遊戲進行中才開始記錄
+        positions = self._positions
+        layers = self._layers
+        self._tick_starts.append(len(positions))
+        positions.append(mode.player.position)
+        layers.append(PLAYER)
+        for g in mode.ghosts:
+            positions.append(g.position)
+            layers.append(GHOST + g._color_id)
+        if len(self._tick_starts) >= self.flush_ticks:
+            self._flush_cells()
+
+    def death(self, cell):
+        if self._segment is not None:
+            self._deaths.append(cell)
+
+    def pellet_eaten(self, cell, tick):
+        if self._segment is not None:
+            self._segment.pellet_tick.flat[cell] = tick
+
+    # ---------------- 批次加總 / 寫檔 ----------------
+
+    def _flush_cells(self):
+        seg = self._segment
+        if seg is None or not self._tick_starts:
+            return
+        w, h = seg.width, seg.height
+        n = w * h
+        counts = seg.counts.reshape(len(LAYERS), n)
+
+        # 座標 → 格子索引（與 BaseMode.cell_index 相同，row 0 在最上方）
+        xy = np.array(self._positions, dtype=np.float64)
+        cells = (h - 1 - (xy[:, 1] // TILE_SIZE).astype(np.int64)) * w + (xy[:, 0] // TILE_SIZE).astype(np.int64)
+        layers = np.array(self._layers, dtype=np.int64)
+        counts += np.bincount(layers * n + cells, minlength=counts.size).reshape(counts.shape)
+
+        # 同一 tick 同一格有 k 隻鬼 → crowded += k - 1
+        starts = np.array(self._tick_starts + [len(cells)], dtype=np.int64)
+        tick_of = np.repeat(np.arange(len(self._tick_starts)), np.diff(starts))
+        ghost = layers >= GHOST
+        keys, k = np.unique(tick_of[ghost] * n + cells[ghost], return_counts=True)
+        crowded = k > 1
+        counts[CROWDED] += np.bincount(keys[crowded] % n, weights=k[crowded] - 1, minlength=n).astype(np.int64)
+
+        if self._deaths:
+            counts[DEATH] += np.bincount(self._deaths, minlength=n)
+        seg.ticks += len(self._tick_starts)
+        self._positions = []
+        self._layers = []
+        self._tick_starts = []
+        self._deaths = []
+
+    def _end_segment(self):
+        seg = self._segment
+        if seg is None:
+            return
+        self._flush_cells()
+        seg.finish()
+        shape = seg.counts.shape
+        total = self.totals.get(shape[1:])
+        if total is None:
+            self.totals[shape[1:]] = seg.counts.copy()
+        else:
+            total += seg.counts
+        self.segments.append(seg)
+        if len(self.segments) > self.max_segments:
+            self.segments.pop(0)
+            self.dropped_segments += 1
+        self._segment = None
+
+    def arrays(self):
+        """要寫進 .npz 的所有陣列"""
+        out = {"layers": np.array(LAYERS)}
+        for i, seg in enumerate(self.segments):
+            out[f"s{i}_counts"] = seg.counts
+            out[f"s{i}_tiles"] = seg.tiles
+            out[f"s{i}_pellet_tick"] = seg.pellet_tick
+            out[f"s{i}_info"] = np.array([seg.session, seg.ticks])
+        for (h, w), counts in self.totals.items():
+            out[f"total_{w}x{h}"] = counts
+        out["dropped_segments"] = np.array(self.dropped_segments)
+        return out
+
+    def close(self):
+        """結束目前的 segment 並寫出 .npz"""
+        if not self.enabled:
+            return
+        self._end_segment()
+        np.savez_compressed(self.path, **self.arrays())
+        self.enabled = False
+
+
+# 全域熱圖紀錄：預設停用（所有呼叫都是 no-op）
+recorder = HeatmapRecorder(enabled=False)
+
+
+def enable(path, flush_ticks=4096):
+    """開始記錄熱圖，disable() 時寫到 path（.npz）"""
+    global recorder
+    recorder.close()
+    recorder = HeatmapRecorder(path, flush_ticks=flush_ticks)
+    return recorder
+
+
+def disable():
+    global recorder
+    recorder.close()
+    recorder = HeatmapRecorder(enabled=False)
+
+
+# ---------------- CLI ----------------
+
+def _totals(data):
+    return {k: data[k] for k in data.files if k.startswith("total_")}
+
+
+def info(path, top=5):
+    data = np.load(path)
+    segments = sorted({k.split("_")[0] for k in data.files if k.startswith("s") and k[1].isdigit()},
+                      key=lambda s: int(s[1:]))
+    print(f"{path}: {len(segments)} segments (dropped {int(data['dropped_segments'])})")
+    for s in segments:
+        session, ticks = data[f"{s}_info"]
+        counts = data[f"{s}_counts"]
+        print(f"  {s}: session {session}, {ticks} ticks, {counts.shape[2]}x{counts.shape[1]}, "
+              f"deaths {counts[DEATH].sum()}")
+    for name, counts in _totals(data).items():
+        crowded = counts[CROWDED]
+        print(f"{name}: {counts[PLAYER].sum()} ticks")
+        order = np.argsort(crowded, axis=None)[::-1][:top]
+        for idx in order:
+            if not crowded.flat[idx]:
+                break
+            row, col = divmod(int(idx), crowded.shape[1])
+            print(f"  crowded (col {col}, row {row}): {crowded.flat[idx]}")
+
+
+def render(path, out, layer="crowded", cell=16):
+    """把彙總的某個圖層畫成 PNG（黑 → 紅 → 黃，對數刻度）"""
+    from PIL import Image
+
+    nearest = getattr(Image, "Resampling", Image).NEAREST   # Pillow 9.1+ 搬到 Resampling
+    data = np.load(path)
+    index = LAYERS.index(layer)
+    images = []
+    for counts in _totals(data).values():
+        grid = np.log1p(counts[index].astype(np.float64))
+        grid /= grid.max() or 1.0
+        rgb = np.zeros(grid.shape + (3,), dtype=np.uint8)
+        rgb[..., 0] = np.clip(grid * 2, 0, 1) * 255
+        rgb[..., 1] = np.clip(grid * 2 - 1, 0, 1) * 255
+        images.append(Image.fromarray(rgb).resize((grid.shape[1] * cell, grid.shape[0] * cell), nearest))
+    if not images:
+        raise SystemExit("no aggregate heatmap in file")
+    width = sum(im.width for im in images)
+    canvas = Image.new("RGB", (width, max(im.height for im in images)))
+    x = 0
+    for im in images:
+        canvas.paste(im, (x, 0))
+        x += im.width
+    canvas.save(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="熱圖檔案工具")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("info", help="segment 列表與鬼最常擠在一起的格子")
+    p.add_argument("path")
+    p = sub.add_parser("render", help="把彙總圖層畫成 PNG")
+    p.add_argument("path")
+    p.add_argument("out")
+    p.add_argument("--layer", choices=LAYERS, default="crowded")
+    args = parser.parse_args()
+
+    if args.cmd == "info":
+        info(args.path)
+    else:
+        render(args.path, args.out, args.layer)
+
+
+if __name__ == "__main__":
+    main()
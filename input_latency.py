@@ -0,0 +1,92 @@
+"""
+玩家輸入延遲統計
+
+每次 set_player_direction 記下按下時的 tick 與時間，之後每個 tick 檢查玩家實際的移動方向：
+- 方向變成按下的方向 → committed，記錄經過幾個 tick（1 = 下一個 tick 就生效）與毫秒
+- 排入的轉向被丟掉（緩衝時間到）→ dropped
+- 還沒生效就又按了別的方向 → superseded（不算延遲）
+
+    mode.input_latency.stats()            # 次數 / 百分位數
+    print(mode.input_latency.format())    # 文字直方圖
+"""
+import time
+from collections import deque
+
+# 直方圖的 tick 上限（最後一格是「超過 64」）
+BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class InputLatency:
+    def __init__(self, max_samples=4096):
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.inputs = 0
+        self.committed = 0
+        self.dropped = 0
+        self.superseded = 0
+        # 最近的 (ticks, ms)，算百分位數用
+        self._samples = deque(maxlen=max_samples)
+        self._pending = None   # (tick, perf_counter, dx, dy)
+
+    def pressed(self, tick, dx, dy):
+        if self._pending is not None:
+            self.superseded += 1
+        self.inputs += 1
+        self._pending = (tick, time.perf_counter(), dx, dy)
+
+    def observe(self, tick, player):
+        """玩家移動完之後呼叫"""
+        if self._pending is None:
+            return
+        pressed_tick, pressed_at, dx, dy = self._pending
+        if (player.change_x, player.change_y) == (dx, dy):
+            ticks = tick - pressed_tick
+            self._samples.append((ticks, (time.perf_counter() - pressed_at) * 1000))
+            for i, limit in enumerate(BUCKETS):
+                if ticks <= limit:
+                    break
+            else:
+                i = len(BUCKETS)
+            self.histogram[i] += 1
+            self.committed += 1
+            self._pending = None
+        elif (player.next_change_x, player.next_change_y) != (dx, dy):
+            self.dropped += 1
+            self._pending = None
+
+    def stats(self):
+        ticks = sorted(t for t, _ in self._samples)
+        ms = sorted(m for _, m in self._samples)
+        return {
+            "inputs": self.inputs,
+            "committed": self.committed,
+            "dropped": self.dropped,
+            "superseded": self.superseded,
+            "p50_ticks": _percentile(ticks, 0.5),
+            "p95_ticks": _percentile(ticks, 0.95),
+            "max_ticks": ticks[-1] if ticks else 0,
+            "p50_ms": _percentile(ms, 0.5),
+            "p95_ms": _percentile(ms, 0.95),
+        }
+
+    def format(self):
+        s = self.stats()
+        lines = [
+            f"inputs {s['inputs']}, committed {s['committed']}, dropped {s['dropped']}, "
+            f"superseded {s['superseded']}",
+            f"latency p50 {s['p50_ticks']} ticks / {s['p50_ms']:.1f} ms, "
+            f"p95 {s['p95_ticks']} ticks / {s['p95_ms']:.1f} ms, max {s['max_ticks']} ticks",
+        ]
+        peak = max(self.histogram) or 1
+        lower = 1
+        for i, count in enumerate(self.histogram):
+            label = f"{lower}-{BUCKETS[i]}" if i < len(BUCKETS) else f">{BUCKETS[-1]}"
+            lines.append(f"  {label:>7s} ticks {count:7d} {'#' * round(40 * count / peak)}")
+            if i < len(BUCKETS):
+                lower = BUCKETS[i] + 1
+        return "\n".join(lines)
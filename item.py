@@ -1,6 +1,28 @@
+from array import array
+
 import arcade
 from constants import TILE_SIZE
 
+POWER_PELLET_SIZE = 16   # Power Pellet 貼圖邊長（像素）
+PULSE_STEP = 0.1         # 每 tick 前進的脈動相位（週期 2.0 → 20 tick）
+
+
+# 同一種豆子共用一張貼圖（也共用 arcade 依貼圖快取的 hit box）
+_TEXTURES = {}
+
+
+def _circle_texture(diameter, color):
+    key = (diameter, color)
+    if key not in _TEXTURES:
+        _TEXTURES[key] = arcade.make_soft_circle_texture(diameter, color)
+    return _TEXTURES[key]
+
+
+def pulse_scale(tick, base_scale=1.0):
+    """由全域 tick 算出 Power Pellet 目前的縮放（0.8 ~ 1.2 之間來回）"""
+    phase = tick * PULSE_STEP
+    return base_scale + 0.2 * abs((phase % 2.0) - 1.0)
+
 
 class Pellet(arcade.Sprite):
     def __init__(self, x, y):
@@ -8,7 +30,7 @@ class Pellet(arcade.Sprite):
         super().__init__()
         
         # Use a simple white circle texture
-        self.texture = arcade.make_soft_circle_texture(8, arcade.color.WHITE)
+        self.texture = _circle_texture(8, arcade.color.WHITE)
         
         self.center_x = x + TILE_SIZE / 2
         self.center_y = y + TILE_SIZE / 2
@@ -19,17 +41,32 @@ class PowerPellet(arcade.Sprite):
         super().__init__()
         
         # Large bright yellow circle for power pellet
-        self.texture = arcade.make_soft_circle_texture(16, arcade.color.YELLOW)
+        self.texture = _circle_texture(POWER_PELLET_SIZE, arcade.color.YELLOW)
         
         self.center_x = x + TILE_SIZE / 2
         self.center_y = y + TILE_SIZE / 2
-        
-        # Animation properties
-        self.pulse_timer = 0
-        self.base_scale = 1.0
-    
-    def update(self, delta_time=1/60):
-        """Make the power pellet pulse/blink"""
-        self.pulse_timer += 0.1
-        # Pulse between 0.8 and 1.2 scale
-        self.scale = self.base_scale + 0.2 * abs(((self.pulse_timer % 2.0) - 1.0))
+
+
+class PowerPelletList(arcade.SpriteList):
+    """
+    Power Pellet 專用的 SpriteList。
+
+    脈動動畫不再逐顆更新 sprite.scale，而是由全域 tick 算出一個縮放值，
+    一次整批寫進 GPU 的 size buffer；sprite 本身的 scale / hit box 維持不變。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pulse_scale = None
+
+    def set_pulse(self, tick):
+        scale = pulse_scale(tick)
+        if scale == self._pulse_scale and not self._sprite_size_changed:
+            return
+        self._pulse_scale = scale
+
+        # 空槽位也一起寫入：沒在 index buffer 裡的槽位不會被畫出來
+        size = POWER_PELLET_SIZE * scale
+        data = self._sprite_size_data
+        data[:] = array("f", (size, size)) * (len(data) // 2)
+        self._sprite_size_changed = True
@@ -1,39 +1,138 @@
+import os
+import random
+import time
+
 import arcade
+import checksum
+from ai_worker import AIWorker
+import events
+import heatmap
+import metrics
 from menu import GameMenu
 from models.classic_mode import ClassicMode
 from models.endless_mode import EndlessMode
 from models.wave_mode import WaveMode
+from models.dynamic_mode import DynamicWallsMode
+from stats_store import StatsStore
+from arena import Arena
+from autopilot import make_autopilot
+from map_library import MapLibrary
+from net_client import RemoteMode, parse_address
+from replay import ReplayWriter
 
 
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
 TITLE = "Pac-Man Arcade"
 
+MODES = {
+    "classic": ClassicMode,
+    "endless": EndlessMode,
+    "wave": WaveMode,
+    "dynamic": DynamicWallsMode,
+}
+
 
 class GameWindow(arcade.Window):
 
     def __init__(self):
         super().__init__(WINDOW_WIDTH, WINDOW_HEIGHT, TITLE)
 
-        self.state = "menu"  # menu / playing / paused / game_over
-        self.menu = GameMenu()
+        self.state = "menu"  # menu / playing / paused / game_over / arena
+        self.stats = StatsStore()
+        self.menu = GameMenu(self.stats)
 
         self.mode = None  # 遊戲模式實例
+        self.mode_name = None
+        self.update_time = 0.0  # 本場 mode.update 累計耗時（秒）
+
+        # 設定 PACMAN_MAP_LIBRARY=地圖庫路徑 時，從地圖庫挑地圖而非即時生成
+        library_path = os.environ.get("PACMAN_MAP_LIBRARY")
+        self.map_library = MapLibrary(library_path) if library_path else None
+        # 設定 PACMAN_SERVER=host:port 時只當用戶端，遊戲規則在 server.py 執行
+        server = os.environ.get("PACMAN_SERVER")
+        self.server = parse_address(server) if server else None
+        # 設定 PACMAN_REPLAY=路徑 時把每場遊戲寫成重播串流（觀戰 / 回放用）
+        self.replay_path = os.environ.get("PACMAN_REPLAY")
+        self.replay = None
+        # 設定 PACMAN_INPUT_LATENCY=1 時，每場結束印出輸入延遲直方圖
+        self.show_input_latency = bool(os.environ.get("PACMAN_INPUT_LATENCY"))
+        # 設定 PACMAN_AUTOPILOT=random / greedy / safe 時由自動駕駛操作玩家（僅本機模式）
+        self.autopilot_name = os.environ.get("PACMAN_AUTOPILOT")
+        self.autopilot = None
+        # 設定 PACMAN_SEED=整數 時每場開始前固定亂數種子（和無畫面執行比對雜湊串流用）
+        seed = os.environ.get("PACMAN_SEED")
+        self.seed = int(seed) if seed else None
+        # 設定 PACMAN_AI_WORKER=1 時鬼的決策在另一個行程算（多核心、鬼很多時減輕主迴圈負擔；僅本機模式）
+        self.use_ai_worker = bool(os.environ.get("PACMAN_AI_WORKER"))
+        self.ai_worker = None
         self.score_text = arcade.Text("Score: 0", 10, 600, arcade.color.WHITE, 18)
+        # 設定 PACMAN_ARENA=場數 或 模式名稱清單（classic,wave,...）時，同一個視窗並排跑多場自動駕駛
+        self.arena = None
+        arena = os.environ.get("PACMAN_ARENA")
+        if arena:
+            self.start_arena(arena)
+
+    def start_arena(self, spec):
+        if spec.isdigit():
+            names = list(MODES)
+            mode_classes = [MODES[names[i % len(names)]] for i in range(int(spec))]
+        else:
+            mode_classes = [MODES[name.strip()] for name in spec.split(",")]
+        self.arena = Arena(mode_classes, self.map_library, self.autopilot_name or "safe", seed=self.seed)
+        self.state = "arena"
 
     # --------------------------------------------------
     #  遊戲模式切換
     # --------------------------------------------------
     def start_mode(self, mode_name):
-        if mode_name == "classic":
-            self.mode = ClassicMode()
-        elif mode_name == "endless":
-            self.mode = EndlessMode()
-        elif mode_name == "wave":
-            self.mode = WaveMode()
+        mode_cls = MODES[mode_name]
+        if self.server:
+            self.mode = RemoteMode(self.server, mode_cls.MODE_ID)
+        else:
+            if self.seed is not None:
+                random.seed(self.seed)
+            self.mode = mode_cls(self.map_library)
+            if checksum.stream.enabled:
+                # 每幀 AI 預算依牆鐘時間決定，會讓雜湊串流無法重現（AI worker 同理，不啟用）
+                self.mode.ai_scheduler.budget_ns = None
+            elif self.use_ai_worker:
+                if self.ai_worker is None:
+                    self.ai_worker = AIWorker(self.seed)
+                self.ai_worker.attach(self.mode)
+            if self.autopilot_name:
+                self.autopilot = make_autopilot(self.autopilot_name, self.seed)
+            if self.replay_path:
+                self.close_replay()
+                self.replay = ReplayWriter(self.replay_path)
 
+        self.mode_name = mode_name
+        self.update_time = 0.0
         self.state = "playing"
 
+    def close_ai_worker(self):
+        if self.ai_worker is not None:
+            self.ai_worker.close()
+            self.ai_worker = None
+
+    def close_replay(self):
+        if self.replay is not None:
+            self.replay.close()
+            self.replay = None
+
+    def record_session(self):
+        """把本場結果交給 StatsStore（只排入 queue，不做磁碟 I/O）"""
+        mode = self.mode
+        self.stats.record_session(
+            self.mode_name,
+            mode.score,
+            mode.result,
+            getattr(mode, "wave", 1),
+            mode.pellets_eaten,
+            mode.tick / 60,
+            self.update_time / max(mode.tick, 1) * 1000,
+        )
+
     # --------------------------------------------------
     #  Keyboard Handling
     # --------------------------------------------------
@@ -64,10 +163,19 @@ class GameWindow(arcade.Window):
     #  Update Loop
     # --------------------------------------------------
     def on_update(self, delta_time):
+        if self.state == "arena":
+            self.arena.update()
+            return
         if self.state != "playing" or not self.mode:
             return
 
+        if self.autopilot is not None:
+            self.autopilot.update(self.mode)
+        start = time.perf_counter()
         self.mode.update(delta_time)
+        self.update_time += time.perf_counter() - start
+        if self.replay is not None:
+            self.replay.record(self.mode)
 
         # 更新分數
         self.score_text.value = f"Score: {self.mode.score}"
@@ -75,6 +183,11 @@ class GameWindow(arcade.Window):
         # 遊戲結束/勝利
         if self.mode.finished:
             self.state = "game_over"
+            self.record_session()
+            self.close_replay()
+            latency = getattr(self.mode, "input_latency", None)
+            if self.show_input_latency and latency is not None:
+                print(latency.format())
 
     # --------------------------------------------------
     #  Render
@@ -82,6 +195,11 @@ class GameWindow(arcade.Window):
     def on_draw(self):
         self.clear()
 
+        # ---------------- ARENA ----------------
+        if self.state == "arena":
+            self.arena.draw(self)
+            return
+
         # ---------------- MENU ----------------
         if self.state == "menu":
             self.menu.draw()
@@ -125,8 +243,36 @@ class GameWindow(arcade.Window):
 
 
 def main():
+    # 多場同畫面時，全域的事件 / 熱圖 / 雜湊紀錄會混在一起，不開啟（指標依 session 標籤分開，照開）
+    arena = bool(os.environ.get("PACMAN_ARENA"))
+    # 設定 PACMAN_EVENT_LOG=路徑 即可把遊戲事件寫成 NDJSON
+    event_log = os.environ.get("PACMAN_EVENT_LOG")
+    if event_log and not arena:
+        events.enable(event_log)
+    # 設定 PACMAN_HEATMAP=路徑 即可記錄玩家 / 鬼的佔據熱圖（結束時寫成 .npz）
+    heatmap_path = os.environ.get("PACMAN_HEATMAP")
+    if heatmap_path and not arena:
+        heatmap.enable(heatmap_path)
+    # 設定 PACMAN_CHECKSUM=路徑 即可把每 tick 的狀態雜湊寫成串流（python checksum.py diff 比對）
+    checksum_path = os.environ.get("PACMAN_CHECKSUM")
+    if checksum_path and not arena:
+        checksum.enable(checksum_path)
+    # 設定 PACMAN_METRICS=埠號 即可在 http://127.0.0.1:埠號/metrics 提供 Prometheus 指標（無人看管時看健康狀態）
+    metrics_port = os.environ.get("PACMAN_METRICS")
+    if metrics_port:
+        metrics.enable(int(metrics_port))
+
     window = GameWindow()
-    arcade.run()
+    try:
+        arcade.run()
+    finally:
+        window.close_replay()
+        window.close_ai_worker()
+        window.stats.close()
+        events.disable()
+        heatmap.disable()
+        checksum.disable()
+        metrics.disable()
 
 
 if __name__ == "__main__":
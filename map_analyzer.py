@@ -0,0 +1,234 @@
+"""
+地圖結構品質分析與平行搜尋
+
+analyze() 用 NumPy 位移運算算出每格的可走鄰格數，再用 union-find 合併連通塊，
+一次得到以下指標：
+    walkable         可走格數
+    components       連通塊數（1 = 所有可走格互相連通）
+    dead_ends        死路（只有一個可走鄰格）
+    junctions        岔路（三個以上可走鄰格）
+    loops            迴路數（圖的 cyclomatic number：邊 - 點 + 連通塊）
+    corridor_max     最長的直線走廊長度（水平或垂直連續可走格）
+    corridor_mean    平均直線走廊長度（長度 >= 2 的）
+    power_min_dist   玩家出生格走到最近 Power Pellet 的步數（到不了為 -1）
+    power_max_dist   走到最遠 Power Pellet 的步數
+
+search() 用 process pool 把 seed 切成批次平行產生 + 分析，只留下符合目標條件的 seed；
+搜尋結果可以直接建成地圖庫：
+
+    python map_analyzer.py --count 50 --require "components==1" "dead_ends<=2" "loops>=40" \\
+        --workers 8 --library good_maps.pmlb
+"""
+import argparse
+import operator
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from grid_map import NAV, TILES
+from map_generator import find_spawn_points, generate_map
+
+METRICS = (
+    "walkable", "components", "dead_ends", "junctions", "loops",
+    "corridor_max", "corridor_mean", "power_min_dist", "power_max_dist",
+)
+
+
+# ---------------- 分析 ----------------
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _runs(nav):
+    """每一列中連續 True 的長度（nav 為 2D bool array）"""
+    padded = np.zeros((nav.shape[0], nav.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = nav
+    edges = np.diff(padded, axis=1)
+    starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)
+    return ends[1] - starts[1]
+
+
+def _bfs(nav, width, height, source):
+    """從 source (row, col) 出發的步數表（-1 = 到不了）；逐格走訪用 list 比 ndarray 索引快"""
+    flat = nav.ravel().tolist()
+    dist = [-1] * (width * height)
+    start = source[0] * width + source[1]
+    dist[start] = 0
+    q = deque([start])
+    while q:
+        idx = q.popleft()
+        d = dist[idx] + 1
+        r, c = divmod(idx, width)
+        for n, ok in ((idx - width, r > 0), (idx + width, r < height - 1),
+                      (idx - 1, c > 0), (idx + 1, c < width - 1)):
+            if ok and flat[n] and dist[n] < 0:
+                dist[n] = d
+                q.append(n)
+    return dist
+
+
+def analyze(maze):
+    """maze：generate_map 的輸出（GridMap）。回傳 METRICS 的 dict"""
+    tiles = maze.array(TILES)
+    height, width = tiles.shape
+    nav = maze.array(NAV).astype(bool)
+
+    # 每格的可走鄰格數（上下左右位移後相加）
+    right = nav[:, :-1] & nav[:, 1:]       # (r, c) 與 (r, c+1) 之間的邊
+    down = nav[:-1, :] & nav[1:, :]        # (r, c) 與 (r+1, c) 之間的邊
+    degree = np.zeros(nav.shape, dtype=np.int8)
+    degree[:, :-1] += right
+    degree[:, 1:] += right
+    degree[:-1, :] += down
+    degree[1:, :] += down
+
+    # union-find：逐條邊合併
+    parent = list(range(width * height))
+    hr, hc = np.nonzero(right)
+    vr, vc = np.nonzero(down)
+    a = np.concatenate((hr * width + hc, vr * width + vc)).tolist()
+    b = np.concatenate((hr * width + hc + 1, (vr + 1) * width + vc)).tolist()
+    for i, j in zip(a, b):
+        ri, rj = _find(parent, i), _find(parent, j)
+        if ri != rj:
+            parent[ri] = rj
+    cells = np.flatnonzero(nav).tolist()
+    components = len({_find(parent, i) for i in cells})
+
+    walkable = len(cells)
+    edges = len(a)
+    runs = np.concatenate((_runs(nav), _runs(nav.T)))
+    corridors = runs[runs >= 2]
+
+    # Power Pellet 離玩家出生格的步數
+    player, _ = find_spawn_points(maze, 0)
+    power_dist = []
+    if player is not None:
+        dist = _bfs(nav, width, height, (player[1], player[0]))
+        power_dist = [dist[i] for i in np.flatnonzero(tiles == 3).tolist()]
+    reachable = [d for d in power_dist if d >= 0]
+
+    return {
+        "walkable": walkable,
+        "components": components,
+        "dead_ends": int(np.count_nonzero(nav & (degree == 1))),
+        "junctions": int(np.count_nonzero(nav & (degree >= 3))),
+        "loops": edges - walkable + components,
+        "corridor_max": int(corridors.max()) if corridors.size else 0,
+        "corridor_mean": float(corridors.mean()) if corridors.size else 0.0,
+        "power_min_dist": min(reachable) if len(reachable) == len(power_dist) and reachable else -1,
+        "power_max_dist": max(reachable) if len(reachable) == len(power_dist) and reachable else -1,
+    }
+
+
+# ---------------- 目標條件 ----------------
+
+_OPS = {"<=": operator.le, ">=": operator.ge, "==": operator.eq, "<": operator.lt, ">": operator.gt}
+_REQUIREMENT = re.compile(r"^\s*(\w+)\s*(<=|>=|==|<|>)\s*(-?[\d.]+)\s*$")
+
+
+def parse_profile(requirements):
+    """["dead_ends<=2", "loops>=40"] → [(metric, op, value), ...]"""
+    profile = []
+    for text in requirements:
+        m = _REQUIREMENT.match(text)
+        if not m or m.group(1) not in METRICS:
+            raise ValueError(f"bad requirement: {text!r} (metrics: {', '.join(METRICS)})")
+        profile.append((m.group(1), m.group(2), float(m.group(3))))
+    return profile
+
+
+def matches(metrics, profile):
+    return all(_OPS[op](metrics[name], value) for name, op, value in profile)
+
+
+# ---------------- 平行搜尋 ----------------
+
+def _search_batch(args):
+    seeds, width, height, profile = args
+    found = []
+    for seed in seeds:
+        metrics = analyze(generate_map(width, height, seed=seed))
+        if matches(metrics, profile):
+            found.append((seed, metrics))
+    return len(seeds), found
+
+
+def search(profile, count, width=19, height=21, start_seed=0, workers=None,
+           batch_size=256, max_seeds=1_000_000):
+    """
+    從 start_seed 往後找 count 張符合 profile 的地圖。
+    回傳 ([(seed, metrics), ...], 分析過的地圖數, 耗時秒數)。
+    """
+    workers = workers or os.cpu_count() or 1
+    found = []
+    analyzed = 0
+    start = time.perf_counter()
+    next_seed = start_seed
+
+    def batches():
+        nonlocal next_seed
+        while next_seed - start_seed < max_seeds:
+            seeds = range(next_seed, min(next_seed + batch_size, start_seed + max_seeds))
+            next_seed = seeds.stop
+            yield seeds, width, height, profile
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = batches()
+        # 同時維持 workers * 2 個批次在跑，找夠了就不再送新批次
+        pending = {pool.submit(_search_batch, job) for job, _ in zip(jobs, range(workers * 2))}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                n, batch_found = fut.result()
+                analyzed += n
+                found.extend(batch_found)
+            while len(found) < count and len(pending) < workers * 2:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                pending.add(pool.submit(_search_batch, job))
+
+    found.sort()
+    return found[:count], analyzed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="依結構指標平行搜尋 generate_map 的 seed")
+    parser.add_argument("--count", type=int, default=20, help="要找幾張符合條件的地圖")
+    parser.add_argument("--require", nargs="*", default=["components==1"],
+                        help='條件，例如 "dead_ends<=2" "loops>=40"')
+    parser.add_argument("--width", type=int, default=19)
+    parser.add_argument("--height", type=int, default=21)
+    parser.add_argument("--start-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--library", help="把找到的地圖寫成地圖庫（map_library 格式）")
+    args = parser.parse_args()
+
+    profile = parse_profile(args.require)
+    found, analyzed, elapsed = search(profile, args.count, args.width, args.height,
+                                      args.start_seed, args.workers)
+    for seed, metrics in found:
+        print(seed, " ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                             for k, v in metrics.items()))
+    print(f"analyzed {analyzed} maps in {elapsed:.2f} s ({analyzed / elapsed:.0f} maps/s), "
+          f"{len(found)} matched")
+
+    if args.library and found:
+        from map_library import build_library
+        build_library(args.library, [seed for seed, _ in found], args.width, args.height,
+                      workers=args.workers or os.cpu_count() or 1)
+        print(f"wrote {len(found)} maps to {args.library}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 import random
 
+from grid_map import TILES, GridMap
+
 # 0 = 道路, 1 = 牆, 2 = 豆子, 3 = Power Pellet
 
-def generate_map(width=19, height=21):
+def generate_map(width=19, height=21, seed=None):
     """
     Arcade-Pac-Man 友善版迷宮生成：
 
@@ -13,32 +15,44 @@ def generate_map(width=19, height=21):
 
     備註：
     - width / height 預設是 19x21，若改尺寸也能跑，只是結構不是完全對稱。
+    - 指定 seed 時使用獨立的 random.Random，同一個 seed 一定得到同一張地圖，
+      也不會動到全域 random 的狀態。
+    - 回傳 GridMap：直接在它的 tile 列上雕刻，最後算出 nav / exits，不另外複製。
     """
 
     width = int(width)
     height = int(height)
+    rng = random.Random(seed) if seed is not None else random
 
     # =============================
     # 0. 初始化全牆
     # =============================
-    maze = [[1 for _ in range(width)] for _ in range(height)]
+    grid = GridMap(width, height, fill=1)
+    maze = grid.rows(TILES)
 
     # =============================
     # 1. DFS 造出基本迷宮骨架
     # =============================
     def carve_path(x, y):
-        """遞迴雕刻路徑 (以 2 格為步長，確保牆的厚度)"""
-        maze[y][x] = 0
-
-        directions = [(0, -2), (0, 2), (-2, 0), (2, 0)]
-        random.shuffle(directions)
-
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 1 <= nx < width - 1 and 1 <= ny < height - 1:
-                if maze[ny][nx] == 1:
-                    maze[y + dy // 2][x + dx // 2] = 0
-                    carve_path(nx, ny)
+        """雕刻路徑 (以 2 格為步長，確保牆的厚度)；用堆疊取代遞迴，大地圖也不會超過遞迴上限"""
+        def visit(x, y):
+            maze[y][x] = 0
+            directions = [(0, -2), (0, 2), (-2, 0), (2, 0)]
+            rng.shuffle(directions)
+            return x, y, iter(directions)
+
+        stack = [visit(x, y)]
+        while stack:
+            x, y, directions = stack[-1]
+            for dx, dy in directions:
+                nx, ny = x + dx, y + dy
+                if 1 <= nx < width - 1 and 1 <= ny < height - 1:
+                    if maze[ny][nx] == 1:
+                        maze[y + dy // 2][x + dx // 2] = 0
+                        stack.append(visit(nx, ny))
+                        break
+            else:
+                stack.pop()
 
     carve_path(1, 1)
 
@@ -65,7 +79,7 @@ def generate_map(width=19, height=21):
                 path_count = sum(1 for n in neighbors if n == 0)
 
                 # 只處理「至少兩邊是路」的牆，並且有機率打通
-                if path_count >= 2 and random.random() < 0.28:
+                if path_count >= 2 and rng.random() < 0.28:
                     maze[y][x] = 0
                     removed += 1
                     if removed >= max_removals:
@@ -78,15 +92,15 @@ def generate_map(width=19, height=21):
     # =============================
     for _ in range(4):  # 原本是 3，讓主幹多一點
         # 水平主幹
-        y = random.randrange(3, height - 3)
+        y = rng.randrange(3, height - 3)
         for x in range(2, width - 2):
-            if random.random() < 0.7:  # 原本 0.6 → 多一點直線
+            if rng.random() < 0.7:  # 原本 0.6 → 多一點直線
                 maze[y][x] = 0
 
         # 垂直主幹
-        x = random.randrange(3, width - 3)
+        x = rng.randrange(3, width - 3)
         for y in range(2, height - 2):
-            if random.random() < 0.7:
+            if rng.random() < 0.7:
                 maze[y][x] = 0
 
     # =============================
@@ -104,7 +118,7 @@ def generate_map(width=19, height=21):
 
         # 垂直交叉（選 3~4 欄作為主幹）
         possible_cols = list(range(3, width - 3, 4))
-        random.shuffle(possible_cols)
+        rng.shuffle(possible_cols)
         for x in possible_cols[:4]:
             for y in range(2, height - 2):
                 maze[y][x] = 0
@@ -116,12 +130,12 @@ def generate_map(width=19, height=21):
     # =============================
     def create_open_areas():
         """在地圖中創建幾個中型開放區域（不會太多，避免全平地）"""
-        num_areas = random.randint(2, 3)
+        num_areas = rng.randint(2, 3)
         for _ in range(num_areas):
-            center_x = random.randint(4, width - 5)
-            center_y = random.randint(4, height - 5)
+            center_x = rng.randint(4, width - 5)
+            center_y = rng.randint(4, height - 5)
 
-            size = random.randint(2, 3)  # 半徑
+            size = rng.randint(2, 3)  # 半徑
             for dy in range(-size, size + 1):
                 for dx in range(-size, size + 1):
                     nx = center_x + dx
@@ -188,4 +202,33 @@ def generate_map(width=19, height=21):
     if maze[1][1] in (1, 2, 3):
         maze[1][1] = 0
 
-    return maze
+    grid.refresh()
+    return grid
+
+
+def find_spawn_points(maze, ghost_count=4):
+    """
+    依地圖（GridMap 或 list of rows）找出玩家與鬼的出生格（皆為 (col, row)，row 0 在最上方）：
+    - 玩家：優先左上角 (1, 1)，不可走時取所有可走格的中間那一格
+    - 鬼：離玩家最遠的 ghost_count 格
+    """
+    height = len(maze)
+    empty = [
+        (c, r)
+        for r, row in enumerate(maze)
+        for c, tile in enumerate(row)
+        if tile != 1
+    ]
+    if not empty:
+        return None, []
+
+    player = (1, 1) if maze[1][1] != 1 else empty[len(empty) // 2]
+
+    px, py = player
+    ranked = sorted(
+        (((c - px) ** 2 + (r - py) ** 2) ** 0.5, c, height - 1 - r)
+        for c, r in empty
+    )
+    ranked.reverse()
+    ghosts = [(c, height - 1 - y) for _, c, y in ranked[:ghost_count]]
+    return player, ghosts
@@ -0,0 +1,202 @@
+"""
+地圖庫：把大量地圖與預先算好的衍生資料存進同一個檔案，以 mmap 依 seed 載入。
+
+檔案格式（little-endian）：
+    header  : magic "PMLB"、version u16、width u16、height u16、ghosts u16、count u32
+    index   : count 個 seed（u64，遞增排序；第 i 個 seed 對應第 i 筆 record）
+    records : 每筆固定長度
+        tiles   w*h u8   原始 tile（0 路 / 1 牆 / 2 豆子 / 3 Power Pellet）
+        nav     w*h u8   1 = 可走
+        exits   w*h u8   可走方向 bitmask（EXIT_UP / DOWN / LEFT / RIGHT）
+        spawns  (1 + ghosts) * 2 u16   玩家與鬼的出生格 (col, row)
+        dist    (1 + ghosts) * w*h u16 從各出生格出發的 BFS 步數（UNREACHABLE = 不可達）
+
+載入時只切 memoryview，不做逐格的 Python 運算。
+
+建庫：
+    python map_library.py maps.pmlb --count 1000 --start-seed 0 --workers 4
+"""
+import argparse
+import bisect
+import mmap
+import random
+import struct
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from grid_map import EXIT_DOWN, EXIT_LEFT, EXIT_RIGHT, EXIT_UP
+from map_generator import find_spawn_points, generate_map
+
+MAGIC = b"PMLB"
+VERSION = 1
+
+UNREACHABLE = 0xFFFF
+
+_HEADER = struct.Struct("<4sHHHHI")
+
+
+def _record_layout(width, height, ghosts):
+    n = width * height
+    spawns = (1 + ghosts) * 2 * 2
+    dist = (1 + ghosts) * n * 2
+    return n, spawns, dist, 3 * n + spawns + dist
+
+
+# ---------------- 衍生資料 ----------------
+
+def compute_distances(exits, width, source):
+    """從 source 格 (col, row) 出發的 BFS 步數表（array('H')）"""
+    dist = array("H", [UNREACHABLE]) * len(exits)
+    start = source[1] * width + source[0]
+    dist[start] = 0
+    q = deque([start])
+    steps = ((EXIT_UP, -width), (EXIT_DOWN, width), (EXIT_LEFT, -1), (EXIT_RIGHT, 1))
+    while q:
+        idx = q.popleft()
+        d = dist[idx] + 1
+        mask = exits[idx]
+        for bit, delta in steps:
+            if mask & bit:
+                nxt = idx + delta
+                if dist[nxt] == UNREACHABLE:
+                    dist[nxt] = d
+                    q.append(nxt)
+    return dist
+
+
+def build_record(seed, width, height, ghosts=4):
+    """用 generate_map(seed) 產生地圖並算出整筆 record 的 bytes"""
+    grid = generate_map(width, height, seed=seed)
+    n = width * height
+
+    player, ghost_cells = find_spawn_points(grid, ghosts)
+    # 可走格不足時用玩家出生格補齊，保持 record 固定長度
+    spawns = [player] + (ghost_cells + [player] * ghosts)[:ghosts]
+
+    # GridMap 的 tiles / nav / exits 平面與 record 同順序，整段切出來
+    parts = [grid.buf[:3 * n]]
+    parts.append(struct.pack(f"<{2 * len(spawns)}H", *(v for cell in spawns for v in cell)))
+    for cell in spawns:
+        parts.append(compute_distances(grid.exits, width, cell).tobytes())
+    return b"".join(parts)
+
+
+# ---------------- 讀取 ----------------
+
+class MapRecord:
+    """地圖庫中的一張地圖；所有欄位都是指向 mmap 的 memoryview"""
+
+    def __init__(self, seed, width, height, ghosts, view):
+        n, spawn_size, _, _ = _record_layout(width, height, ghosts)
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.tiles = view[0:n]
+        self.nav = view[n:2 * n]
+        self.exits = view[2 * n:3 * n]
+
+        base = 3 * n
+        coords = view[base:base + spawn_size].cast("H")
+        self.player_spawn = (coords[0], coords[1])
+        self.ghost_spawns = [(coords[i], coords[i + 1]) for i in range(2, len(coords), 2)]
+
+        base += spawn_size
+        # distances[0] 從玩家出生格出發，distances[1:] 依序對應各鬼出生格
+        self.distances = [
+            view[base + k * 2 * n:base + (k + 1) * 2 * n].cast("H")
+            for k in range(1 + ghosts)
+        ]
+
+
+class MapLibrary:
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, version, width, height, ghosts, count = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a map library")
+        if version != VERSION:
+            raise ValueError(f"unsupported map library version: {version}")
+
+        self.width = width
+        self.height = height
+        self.ghosts = ghosts
+        self.count = count
+        self._record_size = _record_layout(width, height, ghosts)[3]
+        self._seeds = view[_HEADER.size:_HEADER.size + 8 * count].cast("Q")
+        self._records_offset = _HEADER.size + 8 * count
+        self._view = view
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        """依 id（0 ~ count-1）取得地圖"""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        start = self._records_offset + index * self._record_size
+        view = self._view[start:start + self._record_size]
+        return MapRecord(self._seeds[index], self.width, self.height, self.ghosts, view)
+
+    def by_seed(self, seed):
+        """依 seed 取得地圖（index 已排序，二分搜尋）"""
+        i = bisect.bisect_left(self._seeds, seed)
+        if i == self.count or self._seeds[i] != seed:
+            raise KeyError(seed)
+        return self.record(i)
+
+    def random_record(self, rng=random):
+        return self.record(rng.randrange(self.count))
+
+    def close(self):
+        self._seeds.release()
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+
+# ---------------- 建庫 ----------------
+
+def _build_one(args):
+    return build_record(*args)
+
+
+def build_library(path, seeds, width=19, height=21, ghosts=4, workers=1):
+    """把 seeds 對應的地圖（含衍生資料）寫成一個地圖庫檔案"""
+    seeds = sorted(set(seeds))
+    jobs = [(seed, width, height, ghosts) for seed in seeds]
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, width, height, ghosts, len(seeds)))
+        f.write(array("Q", seeds).tobytes())
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for record in pool.map(_build_one, jobs, chunksize=32):
+                    f.write(record)
+        else:
+            for job in jobs:
+                f.write(_build_one(job))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="從 generate_map 批次建立地圖庫")
+    parser.add_argument("path")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--start-seed", type=int, default=0)
+    parser.add_argument("--width", type=int, default=19)
+    parser.add_argument("--height", type=int, default=21)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    seeds = range(args.start_seed, args.start_seed + args.count)
+    build_library(args.path, seeds, args.width, args.height, workers=args.workers)
+    print(f"wrote {args.count} maps to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
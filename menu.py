@@ -3,14 +3,17 @@ import arcade
 
 class GameMenu:
 
-    def __init__(self):
+    def __init__(self, stats=None):
         # 選項清單
         self.options = [
             "Classic Mode",
             "Endless Survival Mode",
-            "Wave / Roguelike Mode"
+            "Wave / Roguelike Mode",
+            "Dynamic Walls Mode"
         ]
+        self.mode_names = ["classic", "endless", "wave", "dynamic"] # 與 options 對應的模式名稱
         self.index = 0 # 目前選定的選項索引
+        self.stats = stats # StatsStore，用於顯示排行榜（可為 None）
 
         # 標題文字
         self.title = arcade.Text(
@@ -26,6 +29,11 @@ class GameMenu:
             14, anchor_x="center"
         )
 
+        # 排行榜標題與內容；內容只在選定模式或 StatsStore 快取換掉時重建
+        self.board_title = arcade.Text("HIGH SCORES", 720, 480, arcade.color.YELLOW, 22)
+        self._board_texts = []
+        self._board_key = None   # 上次建立時的 (模式, 排行榜, 統計)；最多幾列，直接比對內容
+
     def draw(self):
         """繪製選單畫面"""
         self.title.draw()
@@ -44,6 +52,40 @@ class GameMenu:
                 color, 22
             )
 
+        if self.stats:
+            self.draw_leaderboard()
+
+    def draw_leaderboard(self):
+        """繪製目前選定模式的排行榜（只讀 StatsStore 的快取）"""
+        mode = self.mode_names[self.index]
+        rows = self.stats.top_scores(mode)
+        summary = self.stats.summary(mode)
+        key = (mode, rows, summary)
+        if key != self._board_key:
+            self._board_texts = self._build_leaderboard(rows, summary)
+            self._board_key = key
+
+        self.board_title.draw()
+        for text in self._board_texts:
+            text.draw()
+
+    def _build_leaderboard(self, rows, summary):
+        """依排行榜與統計建立 arcade.Text 清單"""
+        texts = []
+        if not rows:
+            texts.append(arcade.Text("尚無紀錄", 720, 440, arcade.color.GRAY, 16))
+        for i, (score, waves, survived) in enumerate(rows):
+            line = f"{i + 1}. {score:>6}   wave {waves}   {survived:5.0f}s"
+            texts.append(arcade.Text(line, 720, 440 - i * 30, arcade.color.WHITE, 16))
+
+        if summary:
+            texts.append(arcade.Text(
+                f"遊玩 {summary['games']} 場 | 平均 {summary['avg_score']:.0f} 分 | "
+                f"累計吃豆 {summary['pellets']}",
+                720, 440 - len(rows) * 30 - 20, arcade.color.LIGHT_GRAY, 12
+            ))
+        return texts
+
     def handle_input(self, key):
         """處理鍵盤輸入，回傳選擇的模式名稱 (字串) 或 None"""
         if key == arcade.key.UP:
@@ -54,11 +96,5 @@ class GameMenu:
             self.index = (self.index + 1) % len(self.options)
         elif key == arcade.key.ENTER:
             # 確認選擇，回傳模式名稱字串
-            selected_option = self.options[self.index]
-            if "Classic" in selected_option:
-                return "classic"
-            elif "Endless" in selected_option:
-                return "endless"
-            elif "Wave" in selected_option or "Roguelike" in selected_option:
-                return "wave"
+            return self.mode_names[self.index]
         return None # 沒有切換模式時回傳 None
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+本機 Prometheus 指標端點（kiosk / 浸泡測試 / 無畫面批次執行時看健康狀態）
+
+遊戲迴圈每個 tick 結束時只呼叫 registry.tick(mode, start_ns)：累加計數器、把這個 tick 的耗時與時間戳
+寫進預先配置好的 ring buffer、記下這個 session 最新的 mode，不加鎖（停用時 tick() 是 no-op）。
+背景執行緒的 HTTP server 被抓取時才從 ring buffer 算 tick 速率與耗時分位數，
+其他 gauge（鬼數、respawn 佇列長度、SpriteList 大小、波次）依 session 標籤讀各場最新的 mode；
+尋路次數 / 展開節點 / 規劃次數在抓取時把各場物件的增量累加進 registry，換新一場或換尋路後端也不會歸零。
+
+    import metrics
+    metrics.enable(9464)               # http://127.0.0.1:9464/metrics
+    ...
+    metrics.disable()
+
+只綁 127.0.0.1。多場同時跑（arena / 伺服器）時由 mode.metrics_session 區分：tick 相關的計數器是全部場次加總，
+gauge 帶 session 標籤；伺服器的連線結束時呼叫 registry.end_session(mode)。
+"""
+import os
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+RATE_WINDOW_NS = 10 * 10**9      # tick 速率取最近 10 秒
+QUANTILES = (0.5, 0.9, 0.99)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _noop(*args):
+    return
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        # 沒有 /proc 時退而求其次用峰值（Linux 單位是 KiB）
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return
+
+
+class MetricsRegistry:
+    def __init__(self, port=None, host="127.0.0.1", window=1024, enabled=True):
+        # window：分位數 / 速率用的最近 tick 數（取 2 的次方）
+        size = 1
+        while size < window:
+            size <<= 1
+        self.window = size
+        self._mask = size - 1
+        self._tick_ns = array("q", bytes(8 * size))
+        self._stamp_ns = array("q", bytes(8 * size))
+
+        self.ticks = 0           # 累計 tick 數（所有場次）
+        self.tick_ns_total = 0   # 累計 tick 耗時
+        self.mode = None         # 最近一個 tick 的 mode
+        self.scrapes = 0
+        self._sessions = {}      # session 標籤 → 最新的 mode（遊戲迴圈寫）
+        self._ended = []         # 已結束、待結算的 mode（遊戲迴圈 append）
+        # 以下只有 HTTP 執行緒碰
+        self._seen = {}          # session → (尋路物件, searches, expanded, 排程器, planned)：上次抓取時的值
+        self._searches = {}      # 尋路後端名稱 → 累計查詢次數
+        self._expanded = {}      # 尋路後端名稱 → 累計展開節點
+        self._planned = 0        # 累計鬼路徑規劃次數
+
+        self.enabled = enabled and port is not None
+        self._server = None
+        self._thread = None
+        if not self.enabled:
+            self.tick = _noop
+            self.end_session = _noop
+            return
+
+        self._server = HTTPServer((host, port), _Handler)
+        self._server.registry = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def tick(self, mode, start_ns):
+        """每個 tick 結束時呼叫（start_ns = tick 開始時的 time.perf_counter_ns()）"""
+        now = time.perf_counter_ns()
+        i = self.ticks & self._mask
+        self._tick_ns[i] = now - start_ns
+        self._stamp_ns[i] = now
+        self.tick_ns_total += now - start_ns
+        self.mode = mode
+        self._sessions[mode.metrics_session] = mode
+        self.ticks += 1
+
+    def end_session(self, mode):
+        """這一場不會再 tick 了（伺服器連線結束）：下次抓取時結算它的計數器並移除 gauge"""
+        self._ended.append(mode)
+
+    # ---------------- 背景執行緒端 ----------------
+
+    def _recent(self):
+        """ring buffer 的快照 → (耗時 ns 列表, 每秒 tick 數)"""
+        n = min(self.ticks, self.window)
+        times = self._tick_ns.tolist()[:n]
+        stamps = self._stamp_ns.tolist()[:n]
+        if not stamps:
+            return times, 0.0
+        now = time.perf_counter_ns()
+        recent = sum(1 for s in stamps if now - s <= RATE_WINDOW_NS)
+        # ring buffer 涵蓋不到整個速率視窗時（tick 很快或剛開始），以實際涵蓋的時間為分母
+        span = min(RATE_WINDOW_NS, now - min(stamps))
+        return times, recent / max(span, 1) * 1e9
+
+    def _account(self, label, mode):
+        """把這一場的尋路 / 規劃計數器自上次抓取以來的增量加進累計值（物件換過時舊物件的尾巴也算進去）"""
+        old_pf, s0, e0, old_sched, p0 = self._seen.get(label, (None, 0, 0, None, 0))
+        pf, sched = mode.pathfinder, mode.ai_scheduler
+        searches, expanded, planned = pf.searches, pf.expanded, sched.planned
+        if pf is not old_pf:
+            if old_pf is not None:
+                self._count_search(old_pf.name, old_pf.searches - s0, old_pf.expanded - e0)
+            s0 = e0 = 0
+        if sched is not old_sched:
+            if old_sched is not None:
+                self._planned += old_sched.planned - p0
+            p0 = 0
+        self._count_search(pf.name, searches - s0, expanded - e0)
+        self._planned += planned - p0
+        self._seen[label] = (pf, searches, expanded, sched, planned)
+
+    def _count_search(self, name, searches, expanded):
+        self._searches[name] = self._searches.get(name, 0) + searches
+        self._expanded[name] = self._expanded.get(name, 0) + expanded
+
+    def render(self):
+        self.scrapes += 1
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label = "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+                lines.append(f"{name}{suffix}{label} {value}")
+
+        ticks, total_ns = self.ticks, self.tick_ns_total
+        times, rate = self._recent()
+        times.sort()
+        metric("pacman_ticks_total", "counter", "Simulated ticks, all sessions.", [("", (), ticks)])
+        metric("pacman_tick_rate", "gauge", "Ticks per second over the last 10 seconds, all sessions.",
+               [("", (), rate)])
+        samples = [("", (("quantile", q),), times[min(int(q * len(times)), len(times) - 1)] / 1e9)
+                   for q in QUANTILES] if times else []
+        samples += [("_sum", (), total_ns / 1e9), ("_count", (), ticks)]
+        metric("pacman_tick_seconds", "summary",
+               f"Time spent in one tick (quantiles over the last {self.window} ticks).", samples)
+
+        # 結算已結束的場次，再累加還在跑的場次
+        ended = self._ended
+        while ended:
+            mode = ended.pop()
+            label = mode.metrics_session
+            self._account(label, mode)
+            self._seen.pop(label, None)
+            if self._sessions.get(label) is mode:
+                self._sessions.pop(label, None)
+        sessions = sorted(list(self._sessions.items()), key=lambda item: str(item[0]))
+        for label, mode in sessions:
+            self._account(label, mode)
+
+        metric("pacman_pathfinder_searches_total", "counter", "Ghost pathfinder queries.",
+               [("", (("pathfinder", name),), n) for name, n in sorted(self._searches.items())])
+        metric("pacman_pathfinder_nodes_expanded_total", "counter", "Nodes expanded by ghost pathfinders.",
+               [("", (("pathfinder", name),), n) for name, n in sorted(self._expanded.items())])
+        metric("pacman_ai_plans_total", "counter", "Ghost path plans.", [("", (), self._planned)])
+
+        info, ghosts, sprites, extra = [], [], [], {}
+        for label, mode in sessions:
+            session = (("session", label),)
+            info.append(("", session + (("mode", type(mode).__name__),), 1))
+            ghosts.append(("", session, len(mode.ghosts)))
+            for name, group in (("walls", mode.walls), ("pellets", mode.pellets),
+                                ("power_pellets", mode.power_pellets), ("ghosts", mode.ghosts),
+                                ("player", mode.player_list)):
+                sprites.append(("", session + (("list", name),), len(group)))
+            for name, value in mode.metric_gauges().items():
+                extra.setdefault(name, []).append(("", session, value))
+        if sessions:
+            metric("pacman_mode_info", "gauge", "Mode of each session.", info)
+            metric("pacman_ghosts_alive", "gauge", "Ghosts on the map.", ghosts)
+            metric("pacman_sprites", "gauge", "SpriteList sizes.", sprites)
+        for name, samples in extra.items():
+            metric(f"pacman_{name}", "gauge", "Mode-specific gauge.", samples)
+
+        metric("process_resident_memory_bytes", "gauge", "Resident set size.", [("", (), _rss_bytes())])
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def stats(self):
+        return {"ticks": self.ticks, "scrapes": self.scrapes}
+
+
+registry = MetricsRegistry(enabled=False)
+
+
+def enable(port, host="127.0.0.1", window=1024):
+    """開始在 host:port/metrics 提供指標（port=0 由系統挑，實際值見 registry.port）"""
+    global registry
+    registry.close()
+    registry = MetricsRegistry(port, host=host, window=window)
+    return registry
+
+
+def disable():
+    """關掉端點，之後的 tick() 都是 no-op"""
+    global registry
+    registry.close()
+    registry = MetricsRegistry(enabled=False)
@@ -1,5 +1,6 @@
 from .classic_mode import ClassicMode
 from .endless_mode import EndlessMode
 from .wave_mode import WaveMode
+from .dynamic_mode import DynamicWallsMode
 
-__all__ = ["ClassicMode", "EndlessMode", "WaveMode"]
+__all__ = ["ClassicMode", "EndlessMode", "WaveMode", "DynamicWallsMode"]
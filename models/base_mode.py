@@ -1,26 +1,56 @@
+import time
 from pathlib import Path
 import arcade
-import random
 
-from constants import TILE_SIZE
-from map_generator import generate_map
+import checksum
+import events
+import heatmap
+import metrics
+import snapshot
+from ai_scheduler import AIScheduler
+from constants import AI_FRAME_BUDGET_US, HPA_MIN_CELLS, HPA_WARM_PER_TICK, TILE_SIZE
+from grid_map import GridMap
+from map_generator import find_spawn_points, generate_map
+from pathfinding import make_pathfinder
 from character import Player, autoscale
 from ghost_ai import Ghost
-from item import Pellet, PowerPellet
+from input_latency import InputLatency
+from item import Pellet, PowerPellet, PowerPelletList
+from pools import SpritePool
 
 # 專案根目錄：.../pacman_arcade
 ROOT = Path(__file__).resolve().parents[1]
 ASSET_DIR = ROOT / "assets"
 
+# 方向鍵 / WASD → (dx, dy)
+KEY_DIRECTIONS = {
+    arcade.key.UP: (0, 1), arcade.key.W: (0, 1),
+    arcade.key.DOWN: (0, -1), arcade.key.S: (0, -1),
+    arcade.key.LEFT: (-1, 0), arcade.key.A: (-1, 0),
+    arcade.key.RIGHT: (1, 0), arcade.key.D: (1, 0),
+}
+
 
 class BaseMode:
-    def __init__(self):
+    # 快照中用來辨識模式的代號（子類覆寫）
+    MODE_ID = 0
+    # 鬼的尋路後端（pathfinding.PATHFINDERS 的名稱；
+    # benchmarks/bench_pathfinding.py 在一般地圖大小下 A* 最快；超大地圖見 HPA_MIN_CELLS）
+    PATHFINDER = "astar"
+    # 從地圖庫載入時 tiles / exits 直接共用 mmap 上的唯讀 view（會改牆的模式設成 False，改為複製）
+    SHARE_MAP_PLANES = True
+
+    def __init__(self, map_library=None):
         # 狀態
         self.score = 0
         self.finished = False
         self.result = None   # "GAME_OVER" / "VICTORY" / None
+        self.tick = 0
+        self.pellets_eaten = 0
 
-        # 物件
+        # 物件（SpriteList 與 Player 建立一次後重複使用；
+        # 牆 / 豆子 / 鬼用完放回物件池，重生與換地圖時取回）
+        self.pool = SpritePool()
         self.walls = None
         self.pellets = None
         self.power_pellets = None
@@ -28,49 +58,135 @@ class BaseMode:
         self.player = None
         self.player_list = None
 
-        # 地圖 / 導航格子
+        # 地圖（grid_map.GridMap）/ 導航格子
         self.map = None
         self.nav_grid = None
         self.grid_width = 0
         self.grid_height = 0
+        self.map_bytes = b""     # 目前地圖的 tiles（GridMap.tiles 的 view；換地圖時換成新的物件）
+        self.nav_version = 0     # 導覽格每次改變（換地圖 / 開關牆）就 +1
+
+        # 地圖庫（map_library.MapLibrary）；有設定時從地圖庫載入而非即時生成
+        self.map_library = map_library
+        self.map_seed = None
+        self.exit_mask = None        # 每格可走方向 bitmask（GridMap.exits）
+
+        # 每格目前的豆子狀態（0 = 無 / 2 = 豆子 / 3 = Power Pellet，GridMap.pellets），
+        # 以及每格曾經建立過的豆子 sprite（吃掉後保留，重生 / restore 時重用）
+        self.pellet_grid = bytearray()
+        self._pellet_sprites = {}
+        # 每格的牆 sprite（格子索引 → sprite），動態牆壁模式用來開關牆
+        self._wall_sprites = {}
 
         # 鬼出生點（Endless 用）
         self.ghost_spawn_points = []
+        # 每隻鬼的流水號（網路同步 / 重播用來辨識同一隻鬼）
+        self._next_ghost_id = 0
+        # metrics 的 session 標籤（arena / 伺服器多場同時跑時各場不同）
+        self.metrics_session = 0
+
+        # 鬼路徑規劃的每幀預算排程與尋路後端（同模式的鬼共用）
+        self.ai_scheduler = AIScheduler(AI_FRAME_BUDGET_US)
+        self.pathfinder = make_pathfinder(self.PATHFINDER)
+        # ai_worker.AIWorker；設定時鬼的決策在另一個行程算，這裡只照決策移動
+        self.ai_worker = None
+
+        # 玩家輸入 → 實際轉向的延遲統計
+        self.input_latency = InputLatency()
 
         self.setup_world()
 
     # ---------------- 世界建立 ----------------
 
     def setup_world(self):
-        """重新產生整張地圖和所有物件"""
-        self.map = generate_map()
-
-        # 建立 navigation grid：
-        # True = 可走 / False = 牆（tile==1）
-        self.grid_height = len(self.map)
-        self.grid_width = len(self.map[0]) if self.map else 0
-        self.nav_grid = [
-            [tile != 1 for tile in row]
-            for row in self.map
-        ]
-
-        self.walls = arcade.SpriteList(use_spatial_hash=True)
-        self.pellets = arcade.SpriteList()
-        self.power_pellets = arcade.SpriteList()
-        self.ghosts = arcade.SpriteList()
-        self.player = Player()
-        self.player_list = arcade.SpriteList()
-        self.player_list.append(self.player)
-
-        self.load_map()
+        """重新產生整張地圖和所有物件（有地圖庫時從地圖庫隨機挑一張）"""
+        if self.map_library is not None:
+            self.load_world(self.map_library.random_record())
+            return
 
-    def load_map(self):
-        """從 self.map 建立牆、豆子、鬼 & 玩家出生點"""
+        self.map = generate_map()
+        self.map_seed = None
+        self._build_world()
+
+    def load_world(self, record):
+        """
+        從地圖庫的 MapRecord 建立世界：
+        tiles / exits 共用 mmap 上的資料（SHARE_MAP_PLANES = False 時複製），nav 整段複製進 GridMap，
+        出生點直接沿用 mmap 上的資料
+        """
+        self.map = GridMap.from_record(record, share=self.SHARE_MAP_PLANES)
+        self.map_seed = record.seed
+        self._build_world((record.player_spawn, record.ghost_spawns))
+
+    def build_world(self, map_bytes, width, height):
+        """從扁平的 tile bytes（snapshot 等來源）重建整張地圖和所有物件"""
+        self.map = GridMap.from_tiles(map_bytes, width, height)
+        self.map_seed = None
+        self._build_world()
+
+    def _build_world(self, spawns=None):
+        grid = self.map
+        self.grid_width = grid.width
+        self.grid_height = grid.height
+        # 導覽格（nav_grid[r][c]）、出口 bitmask、豆子狀態都是 GridMap 平面的零複製 view
+        self.nav_grid = grid.nav_rows
+        self.exit_mask = grid.exits
+        self.pellet_grid = grid.pellets
+        self.nav_version += 1
+
+        # 超大地圖改用 HPA*；有前處理的後端在這裡排好要建的資料（之後每 tick warm() 一點）
+        name = self.PATHFINDER
+        if HPA_MIN_CELLS is not None and grid.width * grid.height >= HPA_MIN_CELLS:
+            name = "hpa"
+        if self.pathfinder.name != name:
+            self.pathfinder = make_pathfinder(name)
+            # 第一張地圖時鬼的 SpriteList 還沒建立；之後 spawn_ghost 會給新鬼 self.pathfinder
+            if self.ghosts is not None:
+                for g in self.ghosts:
+                    g.pathfinder = self.pathfinder
+        self.pathfinder.prepare(self.nav_grid, grid.width, grid.height)
+
+        # tiles 生成後不變，直接用 view（地圖庫載入時與其他場共用，不另外複製一份）
+        self.map_bytes = grid.tiles
+        events.log.record(events.MAP_GENERATED, self.grid_width, self.grid_height,
+                          grid.tiles.tobytes().count(1))
+        heatmap.recorder.begin_map(self)
+
+        if self.player is None:
+            # 牆的碰撞查 GridMap，這個 SpriteList 只負責繪圖，不需要 spatial hash
+            self.walls = arcade.SpriteList()
+            self.pellets = arcade.SpriteList()
+            self.power_pellets = PowerPelletList()
+            self.ghosts = arcade.SpriteList()
+            self.player = Player()
+            self.player_list = arcade.SpriteList()
+            self.player_list.append(self.player)
+        else:
+            self._release_world()
+            self.player.reset()
+
+        self.load_map(spawns)
+
+    def _release_world(self):
+        """換地圖前把上一張地圖的牆 / 豆子 / 鬼全部放回物件池"""
+        for sprite in self._wall_sprites.values():
+            self.pool.release("wall", sprite)
+        for sprite in self._pellet_sprites.values():
+            self.pool.release(type(sprite), sprite)
+        for g in list(self.ghosts):
+            self.despawn_ghost(g)
+        self._wall_sprites = {}
+        self._pellet_sprites = {}
+
+    def load_map(self, spawns=None):
+        """
+        從 self.map 建立牆（繪圖層）、豆子、鬼 & 玩家出生點。
+        spawns = (玩家格, [鬼出生格...])，皆為 (col, row)；None 時由地圖計算
+        """
         wall_img = ASSET_DIR / "wall.png"
         wall_scale = autoscale(str(wall_img), TILE_SIZE)
 
-        empty = []  # 所有可走路座標（給鬼 & 玩家用）
-        height = len(self.map)
+        height = self.grid_height
 
         for r, row in enumerate(self.map):
             for c, tile in enumerate(row):
@@ -79,99 +195,127 @@ class BaseMode:
 
                 if tile == 1:
                     # 牆
-                    w = arcade.Sprite(str(wall_img), wall_scale)
+                    w = self.pool.acquire("wall", lambda: arcade.Sprite(str(wall_img), wall_scale))
                     w.center_x = x + TILE_SIZE / 2
                     w.center_y = y + TILE_SIZE / 2
                     self.walls.append(w)
+                    self._wall_sprites[r * self.grid_width + c] = w
 
                 elif tile == 2:
                     # 一般豆子
-                    self.pellets.append(Pellet(x, y))
-                    empty.append((x, y))
+                    self.spawn_pellet(x, y, "pellet")
 
                 elif tile == 3:
                     # Power Pellet
-                    self.power_pellets.append(PowerPellet(x, y))
-                    empty.append((x, y))
-
-                elif tile == 0:
-                    # 純路面
-                    empty.append((x, y))
-
-        # ---------- 玩家出生點：找一個安全起點 ----------
-        if empty:
-            # 預設嘗試左上角附近
-            player_x = TILE_SIZE + TILE_SIZE / 2
-            player_y = (height - 2) * TILE_SIZE + TILE_SIZE / 2
-
-            start_pos_is_empty = False
-            for ex, ey in empty:
-                if abs(ex + TILE_SIZE / 2 - player_x) < 1 and abs(ey + TILE_SIZE / 2 - player_y) < 1:
-                    start_pos_is_empty = True
-                    break
-
-            if not start_pos_is_empty:
-                px, py = empty[len(empty) // 2]
-                player_x = px + TILE_SIZE / 2
-                player_y = py + TILE_SIZE / 2
-
-            self.player.center_x = player_x
-            self.player.center_y = player_y
-
-        # ---------- 鬼出生點 ----------
-        random.shuffle(empty)
-        ghost_colors = ["red", "blue", "pink", "orange"]
+                    self.spawn_pellet(x, y, "power")
 
-        ghost_positions = []
-        for ex, ey in empty:
-            dist = ((ex + TILE_SIZE / 2 - self.player.center_x) ** 2 +
-                    (ey + TILE_SIZE / 2 - self.player.center_y) ** 2) ** 0.5
-            ghost_positions.append((dist, ex, ey))
+        if spawns is None:
+            spawns = find_spawn_points(self.map)
+        player_cell, ghost_cells = spawns
 
-        ghost_positions.sort(reverse=True)
-        self.ghost_spawn_points = [(x, y) for _, x, y in ghost_positions[:len(ghost_colors)]]
+        # ---------- 玩家出生點：優先左上角，否則取中間的可走格 ----------
+        if player_cell is not None:
+            pc, pr = player_cell
+            self.player.center_x = pc * TILE_SIZE + TILE_SIZE / 2
+            self.player.center_y = (height - pr - 1) * TILE_SIZE + TILE_SIZE / 2
 
-        for color, (gx, gy) in zip(ghost_colors, self.ghost_spawn_points):
-            g = Ghost(gx, gy, color)
-            g.validate_and_set_direction(self.walls)
-
-            # 給鬼導覽格資料，用於 BFS 尋路與 AI
-            g.nav_grid = self.nav_grid
-            g.grid_width = self.grid_width
-            g.grid_height = self.grid_height
+        # ---------- 鬼出生點：離玩家最遠的幾格 ----------
+        ghost_colors = ["red", "blue", "pink", "orange"]
+        self.ghost_spawn_points = [
+            (c * TILE_SIZE, (height - r - 1) * TILE_SIZE)
+            for c, r in ghost_cells[:len(ghost_colors)]
+        ]
 
-            self.ghosts.append(g)
+        for color, (gx, gy) in zip(ghost_colors, self.ghost_spawn_points):
+            self.spawn_ghost(gx, gy, color)
+
+    # ---------------- 物件生成 ----------------
+
+    def cell_index(self, x, y):
+        """世界座標 → pellet_grid 的索引（row 0 在最上方）"""
+        col = int(x // TILE_SIZE)
+        row = self.grid_height - 1 - int(y // TILE_SIZE)
+        return row * self.grid_width + col
+
+    def spawn_pellet(self, x, y, kind):
+        """在格子左下角 (x, y) 放一顆豆子，kind = "pellet" / "power" """
+        idx = self.cell_index(x, y)
+        cls = Pellet if kind == "pellet" else PowerPellet
+        sprite = self._pellet_sprites.get(idx)
+        if type(sprite) is not cls:
+            if sprite is not None:
+                self.pool.release(type(sprite), sprite)
+            sprite = self.pool.acquire(cls, lambda: cls(x, y))
+            sprite.center_x = x + TILE_SIZE / 2
+            sprite.center_y = y + TILE_SIZE / 2
+            self._pellet_sprites[idx] = sprite
+
+        if kind == "pellet":
+            self.pellets.append(sprite)
+            self.pellet_grid[idx] = 2
+        else:
+            self.power_pellets.append(sprite)
+            self.pellet_grid[idx] = 3
+        return sprite
+
+    def spawn_ghost(self, x, y, color):
+        """在格子左下角 (x, y) 生成一隻鬼並接上導覽格（優先重用物件池裡同色的鬼）"""
+        g = self.pool.acquire(("ghost", color), lambda: Ghost(x, y, color))
+        g.reset(x, y, color)
+        g.entity_id = self._next_ghost_id
+        self._next_ghost_id += 1
+
+        # 給鬼導覽格資料，用於 BFS 尋路與 AI
+        g.nav_grid = self.nav_grid
+        g.grid_width = self.grid_width
+        g.grid_height = self.grid_height
+        g.pathfinder = self.pathfinder
+        g.validate_and_set_direction(self.map)
+
+        self.ghosts.append(g)
+        return g
+
+    def despawn_ghost(self, g):
+        """把鬼移出地圖並放回物件池"""
+        self.ai_scheduler.forget(g)
+        self.pool.release(("ghost", g.ghost_color), g)
 
     # ---------------- 鍵盤控制（給 main.py 呼叫） ----------------
 
     def on_key_press(self, key, modifiers):
         """把方向鍵 / WASD 轉換成 Player 的下一步方向"""
-        if key in (arcade.key.UP, arcade.key.W):
-            self.player.next_change_x = 0
-            self.player.next_change_y = 1
-        elif key in (arcade.key.DOWN, arcade.key.S):
-            self.player.next_change_x = 0
-            self.player.next_change_y = -1
-        elif key in (arcade.key.LEFT, arcade.key.A):
-            self.player.next_change_x = -1
-            self.player.next_change_y = 0
-        elif key in (arcade.key.RIGHT, arcade.key.D):
-            self.player.next_change_x = 1
-            self.player.next_change_y = 0
+        direction = KEY_DIRECTIONS.get(key)
+        if direction is not None:
+            self.set_player_direction(*direction)
+
+    def set_player_direction(self, dx, dy):
+        """排入玩家的下一步方向（鍵盤、網路輸入都走這裡）"""
+        self.player.queue_turn(dx, dy)
+        self.input_latency.pressed(self.tick, dx, dy)
 
     # ---------------- 可被子類覆寫的行為 ----------------
 
     def handle_ghost_eaten(self, ghost):
-        ghost.remove_from_sprite_lists()
+        self.despawn_ghost(ghost)
         self.score += 200
 
     def handle_pellet_eaten(self, p):
         p.remove_from_sprite_lists()
+        idx = self.cell_index(p.center_x, p.center_y)
+        self.pellet_grid[idx] = 0
         self.score += 10
+        self.pellets_eaten += 1
+        events.log.record(events.PELLET_EATEN, idx, 2)
+        heatmap.recorder.pellet_eaten(idx, self.tick)
 
     def handle_power_pellet_eaten(self, p):
         p.remove_from_sprite_lists()
+        idx = self.cell_index(p.center_x, p.center_y)
+        self.pellet_grid[idx] = 0
         self.score += 50
+        self.pellets_eaten += 1
+        events.log.record(events.PELLET_EATEN, idx, 3)
+        heatmap.recorder.pellet_eaten(idx, self.tick)
         for g in self.ghosts:
             g.set_frightened()
 
@@ -179,38 +323,119 @@ class BaseMode:
         """Classic / Endless / Wave 在這裡做自己的勝利條件"""
         return
 
+    def _pack_extra(self):
+        """模式自訂的快照資料（Wave 波次、Endless respawn 佇列…）"""
+        return b""
+
+    def _unpack_extra(self, data):
+        return
+
+    def metric_gauges(self):
+        """模式自訂的指標（名稱 → 數值；Wave 波次、Endless respawn 佇列長度…），metrics 端點被抓取時讀"""
+        return {}
+
+    # ---------------- 快照 ----------------
+
+    def snapshot(self):
+        """把目前整個遊戲狀態打包成精簡的二進位快照（bytes）"""
+        return snapshot.pack(self)
+
+    def restore(self, blob):
+        """從 snapshot() 的結果還原；地圖相同時只修正有差異的豆子 / 鬼"""
+        snapshot.unpack(self, blob)
+
+    def _apply_pellet_grid(self, target):
+        for idx in snapshot.diff_cells(bytes(self.pellet_grid), target):
+            sprite = self._pellet_sprites.get(idx)
+            if sprite is not None and self.pellet_grid[idx]:
+                sprite.remove_from_sprite_lists()
+            self.pellet_grid[idx] = 0
+
+            kind = target[idx]
+            if kind:
+                row, col = divmod(idx, self.grid_width)
+                x = col * TILE_SIZE
+                y = (self.grid_height - row - 1) * TILE_SIZE
+                self.spawn_pellet(x, y, "pellet" if kind == 2 else "power")
+
+    def _match_ghosts(self, colors):
+        """依快照中的顏色順序重用現有的鬼，不足才新建，多的移除"""
+        available = {}
+        for g in self.ghosts:
+            available.setdefault(g.ghost_color, []).append(g)
+
+        matched = []
+        for color in colors:
+            pool = available.get(color)
+            if pool:
+                matched.append(pool.pop(0))
+            else:
+                matched.append(self.spawn_ghost(0, 0, color))
+
+        if list(self.ghosts) != matched:
+            while len(self.ghosts):
+                self.ghosts.pop()
+            for g in matched:
+                self.ghosts.append(g)
+        for leftover in available.values():
+            for g in leftover:
+                self.despawn_ghost(g)
+        return matched
+
     # ---------------- 主更新迴圈 ----------------
 
     def update(self, dt):
         if self.finished:
             return
+        start_ns = time.perf_counter_ns()
+        self.tick += 1
+        events.log.tick = self.tick
 
         # 玩家移動
-        self.player.update_movement(self.walls)
-        # Power Pellet 動畫
-        self.power_pellets.update()
+        self.player.update_movement(self.map)
+        self.input_latency.observe(self.tick, self.player)
+        # Power Pellet 動畫：由全域 tick 驅動，整批寫入縮放
+        self.power_pellets.set_pulse(self.tick)
 
         # 鬼 AI & 碰撞
+        self.ai_scheduler.begin_frame()
+        decisions = self.ai_worker.poll(self.tick) if self.ai_worker is not None else None
         for g in self.ghosts:
-            # 把所有鬼的列表給 AI，做團隊戰術 + Anti-grouping 用
-            g._all_ghosts = self.ghosts
-
-            g.update_ai(
-                self.walls,
-                self.player.center_x,
-                self.player.center_y,
-                self.player.change_x,
-                self.player.change_y,
-            )
+            if decisions is not None:
+                if not g.follow(self.map, decisions.get(g.entity_id)):
+                    self.ai_worker.stalls += 1
+            else:
+                # 把所有鬼的列表給 AI，做團隊戰術 + Anti-grouping 用
+                g._all_ghosts = self.ghosts
+
+                g.update_ai(
+                    self.map,
+                    self.player.center_x,
+                    self.player.center_y,
+                    self.player.change_x,
+                    self.player.change_y,
+                    self.ai_scheduler,
+                )
 
             if arcade.check_for_collision(self.player, g):
+                col = int(g.center_x // TILE_SIZE)
+                row = self.grid_height - 1 - int(g.center_y // TILE_SIZE)
                 if g.state == "frightened":
+                    events.log.record(events.GHOST_EATEN, g._color_id, col, row)
                     self.handle_ghost_eaten(g)
                     continue
                 if g.state != "eaten":
+                    events.log.record(events.DEATH, g._color_id, col, row)
+                    heatmap.recorder.death(self.cell_index(self.player.center_x, self.player.center_y))
                     self.result = "GAME_OVER"
                     self.finished = True
+                    self.ai_scheduler.end_frame()
+                    checksum.stream.record(self)
+                    metrics.registry.tick(self, start_ns)
                     return
+        self.ai_scheduler.end_frame()
+        self.pathfinder.warm(HPA_WARM_PER_TICK)
+        heatmap.recorder.sample(self)
 
         # 吃豆子
         for p in arcade.check_for_collision_with_list(self.player, self.pellets):
@@ -222,6 +447,10 @@ class BaseMode:
 
         # 模式特化檢查（Victory / 換 Wave 等）
         self.check_post_update()
+        if self.ai_worker is not None:
+            self.ai_worker.submit(self)
+        checksum.stream.record(self)
+        metrics.registry.tick(self, start_ns)
 
     # ---------------- 繪圖 ----------------
 
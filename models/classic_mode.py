@@ -11,8 +11,10 @@ class ClassicMode(BaseMode):
     - 吃光所有豆子＋Power Pellet → 勝利
     """
 
-    def __init__(self) -> None:
-        super().__init__()
+    MODE_ID = 1
+
+    def __init__(self, map_library=None) -> None:
+        super().__init__(map_library)
 
     def check_post_update(self) -> None:
         # 沒有剩餘豆子 → 勝利
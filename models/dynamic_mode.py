@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import random
+import struct
+from typing import Dict, List, Tuple
+
+import arcade
+
+from .classic_mode import ClassicMode
+from character import HALF_TILE
+from constants import TILE_SIZE
+from nav_field import DistanceField
+
+_COUNT = struct.Struct("<H")
+_CELL = struct.Struct("<I")
+_DOOR = struct.Struct("<IB")
+_TIMERS = struct.Struct("<iI")
+
+
+class DynamicWallsMode(ClassicMode):
+    """
+    動態牆壁模式：
+    - 地圖上有幾扇「門」（連接兩條路的牆），每隔一段時間開 / 關
+    - 吃到 Power Pellet 後的一段時間內，Pac-Man 可以撞破前方的內牆
+    - 吃光所有豆子＋Power Pellet → 勝利（同 Classic）
+
+    牆壁改變時，GridMap 的導覽 / 出口平面、繪圖用的 wall SpriteList
+    以及鬼用的距離場都在同一幀更新；距離場只修補受影響的區域。
+    """
+
+    MODE_ID = 4
+    # 開關牆會改 exits 平面，不能共用地圖庫的唯讀 view
+    SHARE_MAP_PLANES = False
+
+    DOOR_COUNT = 6
+    DOOR_PERIOD_FRAMES = 5 * 60    # 每 5 秒切換一次門
+    BREAK_FRAMES = 10 * 60         # 吃到 Power Pellet 後可破牆的時間
+
+    def __init__(self, map_library=None) -> None:
+        self.doors: Dict[int, bool] = {}     # 格子索引 → 目前是否打開
+        self.broken: List[int] = []          # 被 Pac-Man 撞破的牆
+        self.door_timer = self.DOOR_PERIOD_FRAMES
+        self.break_frames = 0
+        self.nav_fields: Dict[Tuple[int, int], DistanceField] = {}
+        self.repaired_cells = 0              # 最近一次牆壁變動修補的格數
+        super().__init__(map_library)
+
+    # ---------- 世界建立 ----------
+
+    def _build_world(self, spawns=None) -> None:
+        super()._build_world(spawns)
+
+        self.doors = {idx: False for idx in self._pick_doors()}
+        self.broken = []
+        self.door_timer = self.DOOR_PERIOD_FRAMES
+        self.break_frames = 0
+        self._build_nav_fields()
+
+    def _pick_doors(self) -> List[int]:
+        """挑出左右或上下兩側都是路的內牆當作門"""
+        w, h = self.grid_width, self.grid_height
+        nav = self.nav_grid
+        candidates = []
+        for r in range(1, h - 1):
+            for c in range(1, w - 1):
+                if nav[r][c]:
+                    continue
+                if (nav[r][c - 1] and nav[r][c + 1]) or (nav[r - 1][c] and nav[r + 1][c]):
+                    candidates.append(r * w + c)
+        random.shuffle(candidates)
+        return sorted(candidates[:self.DOOR_COUNT])
+
+    def _build_nav_fields(self) -> None:
+        """為每隻鬼的散開目標建立距離場（散開時直接查 next hop）"""
+        self.nav_fields = {}
+        for g in self.ghosts:
+            tx, ty = g.get_scatter_target()
+            target = g._world_to_grid(tx + g.target_offset[0], ty + g.target_offset[1])
+            if target is None or not self.nav_grid[target[0]][target[1]]:
+                continue
+            if target not in self.nav_fields:
+                self.nav_fields[target] = DistanceField(
+                    self.nav_grid, self.grid_width, self.grid_height, target
+                )
+        for g in self.ghosts:
+            g.nav_fields = self.nav_fields
+
+    def spawn_ghost(self, x, y, color):
+        g = super().spawn_ghost(x, y, color)
+        g.nav_fields = self.nav_fields
+        return g
+
+    # ---------- 開關牆 ----------
+
+    def set_walls(self, opened=(), closed=()) -> None:
+        """一次套用多格牆壁變動：導覽 / 出口平面、繪圖層、距離場同步更新"""
+        w = self.grid_width
+        changed = []
+
+        for idx in opened:
+            r, c = divmod(idx, w)
+            if self.nav_grid[r][c]:
+                continue
+            self.map.set_walkable(idx, True)
+            self._wall_sprites[idx].remove_from_sprite_lists()
+            changed.append((r, c))
+
+        for idx in closed:
+            r, c = divmod(idx, w)
+            if not self.nav_grid[r][c]:
+                continue
+            self.map.set_walkable(idx, False)
+            self.walls.append(self._wall_sprites[idx])
+            changed.append((r, c))
+
+        if changed:
+            self.nav_version += 1
+            self.pathfinder.invalidate(changed)
+            self.repaired_cells = sum(f.repair(changed) for f in self.nav_fields.values())
+
+    def _cell_occupied(self, idx: int) -> bool:
+        """玩家或鬼和這格重疊時不能關門"""
+        sprite = self._wall_sprites[idx]
+        if arcade.check_for_collision(sprite, self.player):
+            return True
+        return bool(arcade.check_for_collision_with_list(sprite, self.ghosts))
+
+    def _update_doors(self) -> None:
+        self.door_timer -= 1
+        if self.door_timer > 0:
+            return
+        self.door_timer = self.DOOR_PERIOD_FRAMES
+
+        opened, closed = [], []
+        for idx, is_open in self.doors.items():
+            if is_open:
+                if self._cell_occupied(idx):
+                    continue
+                closed.append(idx)
+            else:
+                opened.append(idx)
+        for idx in opened:
+            self.doors[idx] = True
+        for idx in closed:
+            self.doors[idx] = False
+        self.set_walls(opened, closed)
+
+    def _try_break_wall(self) -> None:
+        """Power 期間，Pac-Man 在格子中心面向內牆時把牆撞破"""
+        player = self.player
+        dx = player.next_change_x or player.change_x
+        dy = player.next_change_y or player.change_y
+        if dx == 0 and dy == 0:
+            return
+
+        # 座標是整數像素：離格子中心不超過這個 tick 走的距離就算在中心
+        if (abs(player.center_x % TILE_SIZE - HALF_TILE) > player.speed or
+                abs(player.center_y % TILE_SIZE - HALF_TILE) > player.speed):
+            return
+
+        col = int(player.center_x // TILE_SIZE) + int(dx)
+        row = self.grid_height - 1 - (int(player.center_y // TILE_SIZE) + int(dy))
+        if not (1 <= row < self.grid_height - 1 and 1 <= col < self.grid_width - 1):
+            return
+        if self.nav_grid[row][col]:
+            return
+
+        idx = row * self.grid_width + col
+        self.doors.pop(idx, None)
+        self.broken.append(idx)
+        self.set_walls(opened=[idx])
+
+    # ---------- 覆寫掛鉤 ----------
+
+    def update(self, delta_time: float) -> None:
+        if self.finished:
+            return
+        self._update_doors()
+        if self.break_frames > 0:
+            self.break_frames -= 1
+            self._try_break_wall()
+        super().update(delta_time)
+
+    def handle_power_pellet_eaten(self, p) -> None:
+        super().handle_power_pellet_eaten(p)
+        self.break_frames = self.BREAK_FRAMES
+
+    # ---------- 快照 ----------
+
+    def _pack_extra(self) -> bytes:
+        parts = [_TIMERS.pack(self.break_frames, self.door_timer), _COUNT.pack(len(self.doors))]
+        parts.extend(_DOOR.pack(idx, is_open) for idx, is_open in self.doors.items())
+        parts.append(_COUNT.pack(len(self.broken)))
+        parts.extend(_CELL.pack(idx) for idx in self.broken)
+        return b"".join(parts)
+
+    def _unpack_extra(self, data: bytes) -> None:
+        self.break_frames, self.door_timer = _TIMERS.unpack_from(data, 0)
+        offset = _TIMERS.size
+
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        doors = {}
+        for _ in range(count):
+            idx, is_open = _DOOR.unpack_from(data, offset)
+            offset += _DOOR.size
+            doors[idx] = bool(is_open)
+
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        broken = [_CELL.unpack_from(data, offset + i * _CELL.size)[0] for i in range(count)]
+
+        # 目標牆壁狀態 = 原始地圖的牆 - 打開的門 - 撞破的牆
+        open_cells = {idx for idx, is_open in doors.items() if is_open} | set(broken)
+        w = self.grid_width
+        opened, closed = [], []
+        for idx in self._wall_sprites:
+            r, c = divmod(idx, w)
+            should_open = idx in open_cells
+            if should_open and not self.nav_grid[r][c]:
+                opened.append(idx)
+            elif not should_open and self.nav_grid[r][c]:
+                closed.append(idx)
+
+        self.doors = doors
+        self.broken = broken
+        self.set_walls(opened, closed)
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import random
+import struct
 from typing import List, Dict, Any
 
 from .base_mode import BaseMode
 from item import Pellet, PowerPellet
 from constants import TILE_SIZE
 from ghost_ai import Ghost
+from snapshot import GHOST_COLORS
+
+# 快照中 respawn 佇列的每筆資料
+_PELLET_ENTRY = struct.Struct("<ddBi")
+_GHOST_ENTRY = struct.Struct("<iB")
+_COUNT = struct.Struct("<H")
 
 
 class EndlessMode(BaseMode):
@@ -21,11 +28,13 @@ class EndlessMode(BaseMode):
     POWER_RESPAWN_FRAMES = 60 * 60   # 60 秒
     GHOST_RESPAWN_FRAMES = 2 * 60    # 2 秒
 
-    def __init__(self) -> None:
+    MODE_ID = 2
+
+    def __init__(self, map_library=None) -> None:
         # 豆子 / 鬼 respawn 佇列
         self._respawn_queue: List[Dict[str, Any]] = []
         self._ghost_respawn_queue: List[Dict[str, Any]] = []
-        super().__init__()
+        super().__init__(map_library)
 
     # ---------- respawn 管理 ----------
 
@@ -43,10 +52,7 @@ class EndlessMode(BaseMode):
         for entry in list(self._respawn_queue):
             entry["timer"] -= 1
             if entry["timer"] <= 0:
-                if entry["kind"] == "pellet":
-                    self.pellets.append(Pellet(entry["x"], entry["y"]))  # type: ignore[arg-type]
-                else:
-                    self.power_pellets.append(PowerPellet(entry["x"], entry["y"]))  # type: ignore[arg-type]
+                self.spawn_pellet(entry["x"], entry["y"], entry["kind"])
                 self._respawn_queue.remove(entry)
 
     def _queue_ghost_respawn(self, ghost: Ghost) -> None:
@@ -68,9 +74,7 @@ class EndlessMode(BaseMode):
                     # fallback：玩家附近
                     x = self.player.center_x - TILE_SIZE  # type: ignore[union-attr]
                     y = self.player.center_y             # type: ignore[union-attr]
-                ghost = Ghost(x, y, entry["color"])
-                ghost.validate_and_set_direction(self.walls)  # type: ignore[arg-type]
-                self.ghosts.append(ghost)  # type: ignore[arg-type]
+                self.spawn_ghost(x, y, entry["color"])
                 self._ghost_respawn_queue.remove(entry)
 
     # ---------- 覆寫掛鉤 ----------
@@ -98,10 +102,48 @@ class EndlessMode(BaseMode):
         """
         self.score += 200
         # 先移出地圖
-        ghost.remove_from_sprite_lists()
+        self.despawn_ghost(ghost)
         # 安排重生
         self._queue_ghost_respawn(ghost)
 
     def check_post_update(self) -> None:
         # Endless 模式沒有勝利條件
         return
+
+    def metric_gauges(self) -> Dict[str, int]:
+        return {
+            "pellet_respawn_queue": len(self._respawn_queue),
+            "ghost_respawn_queue": len(self._ghost_respawn_queue),
+        }
+
+    # ---------- 快照 ----------
+
+    def _pack_extra(self) -> bytes:
+        parts = [_COUNT.pack(len(self._respawn_queue))]
+        for entry in self._respawn_queue:
+            parts.append(_PELLET_ENTRY.pack(
+                entry["x"], entry["y"], entry["kind"] == "power", entry["timer"]
+            ))
+        parts.append(_COUNT.pack(len(self._ghost_respawn_queue)))
+        for entry in self._ghost_respawn_queue:
+            parts.append(_GHOST_ENTRY.pack(entry["timer"], GHOST_COLORS.index(entry["color"])))
+        return b"".join(parts)
+
+    def _unpack_extra(self, data: bytes) -> None:
+        offset = 0
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        self._respawn_queue = []
+        for _ in range(count):
+            x, y, is_power, timer = _PELLET_ENTRY.unpack_from(data, offset)
+            offset += _PELLET_ENTRY.size
+            kind = "power" if is_power else "pellet"
+            self._respawn_queue.append({"x": x, "y": y, "kind": kind, "timer": timer})
+
+        (count,) = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        self._ghost_respawn_queue = []
+        for _ in range(count):
+            timer, color = _GHOST_ENTRY.unpack_from(data, offset)
+            offset += _GHOST_ENTRY.size
+            self._ghost_respawn_queue.append({"timer": timer, "color": GHOST_COLORS[color]})
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import struct
+from typing import Dict
+
+import events
 from .base_mode import BaseMode
 from constants import GHOST_SPEED
 from ghost_ai import Ghost
@@ -13,9 +17,12 @@ class WaveMode(BaseMode):
     - 當層被吃掉的鬼不 respawn，但進入下一層時會重新生成
     """
 
-    def __init__(self) -> None:
+    MODE_ID = 3
+    _WAVE = struct.Struct("<H")
+
+    def __init__(self, map_library=None) -> None:
         self.wave: int = 1
-        super().__init__()
+        super().__init__(map_library)
         self._apply_wave_buff()
 
     def _apply_wave_buff(self) -> None:
@@ -39,13 +46,14 @@ class WaveMode(BaseMode):
         # 重建世界（會重設鬼／豆子／牆），但不重置分數
         self.setup_world()
         self._apply_wave_buff()
+        events.log.record(events.WAVE_START, self.wave)
 
     def handle_ghost_eaten(self, ghost: Ghost) -> None:
         """
         Wave 模式：當層內吃掉鬼後不 respawn，
         要到進入下一層 Wave 時才重新生出新鬼。
         """
-        ghost.remove_from_sprite_lists()
+        self.despawn_ghost(ghost)
         self.score += 200
 
     def check_post_update(self) -> None:
@@ -54,3 +62,12 @@ class WaveMode(BaseMode):
             # 小小過關獎勵
             self.score += 500 * self.wave
             self.next_wave()
+
+    def metric_gauges(self) -> Dict[str, int]:
+        return {"wave": self.wave}
+
+    def _pack_extra(self) -> bytes:
+        return self._WAVE.pack(self.wave)
+
+    def _unpack_extra(self, data: bytes) -> None:
+        (self.wave,) = self._WAVE.unpack_from(data, 0)
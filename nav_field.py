@@ -0,0 +1,160 @@
+"""
+可增量修補的距離場（distance field）
+
+DistanceField 保存「每一格走到 source 的最短步數」，可由此直接查 next hop
+（往步數少 1 的鄰格走）。牆壁開關時只修補受影響的區域：
+
+- 牆被打開：新格子取鄰格最小值 + 1，再往外放鬆（只會變短）
+- 格子被封起：先找出最短路依賴它的格子（orphan）設為不可達，
+  再從它們的邊界用 heap 重新展開
+
+修補的成本跟「距離有變動的格子數」成正比，不是整張地圖。
+"""
+import heapq
+from array import array
+from collections import deque
+
+INF = 0xFFFF
+
+
+class DistanceField:
+    def __init__(self, nav_grid, width, height, source):
+        # nav_grid：row 0 在最上方的可走格（nav_grid[r][c] 為真 = 可走）
+        self.nav_grid = nav_grid
+        self.width = width
+        self.height = height
+        self.source = source            # (row, col)
+        self.dist = array("H", [INF]) * (width * height)
+        self.last_visited = 0           # 最近一次 rebuild / repair 處理的格數
+        self.rebuild()
+
+    # ---------------- 工具 ----------------
+
+    def _walkable(self, idx):
+        r, c = divmod(idx, self.width)
+        return bool(self.nav_grid[r][c])
+
+    def _neighbors(self, idx):
+        w = self.width
+        r, c = divmod(idx, w)
+        if r > 0:
+            yield idx - w
+        if r < self.height - 1:
+            yield idx + w
+        if c > 0:
+            yield idx - 1
+        if c < w - 1:
+            yield idx + 1
+
+    def _source_index(self):
+        return self.source[0] * self.width + self.source[1]
+
+    # ---------------- 建立 / 查詢 ----------------
+
+    def rebuild(self):
+        """整張重算（只在建立時使用）"""
+        dist = self.dist
+        for i in range(len(dist)):
+            dist[i] = INF
+
+        src = self._source_index()
+        visited = 0
+        if self._walkable(src):
+            dist[src] = 0
+            q = deque([src])
+            while q:
+                idx = q.popleft()
+                visited += 1
+                d = dist[idx] + 1
+                for n in self._neighbors(idx):
+                    if dist[n] == INF and self._walkable(n):
+                        dist[n] = d
+                        q.append(n)
+        self.last_visited = visited
+
+    def distance(self, row, col):
+        return self.dist[row * self.width + col]
+
+    def next_hop(self, row, col):
+        """從 (row, col) 往 source 的下一格 (row, col)；不可達或已在 source 時回傳 None"""
+        idx = row * self.width + col
+        d = self.dist[idx]
+        if d == INF or d == 0:
+            return None
+        for n in self._neighbors(idx):
+            if self.dist[n] == d - 1:
+                return divmod(n, self.width)
+        return None
+
+    # ---------------- 增量修補 ----------------
+
+    def repair(self, changed):
+        """
+        changed：狀態改變的格子 (row, col) 列表（nav_grid 已經更新完畢）。
+        回傳這次修補處理的格數。
+        """
+        dist = self.dist
+        w = self.width
+        src = self._source_index()
+        heap = []
+        visited = 0
+
+        # 1. 被封起的格子 → 找出依賴它們的 orphan
+        closed = [r * w + c for r, c in changed if not self.nav_grid[r][c]]
+        orphans = set()
+        pending = []
+        for idx in closed:
+            if dist[idx] != INF:
+                heapq.heappush(pending, (dist[idx], idx))
+                dist[idx] = INF
+                orphans.add(idx)
+
+        while pending:
+            d, idx = heapq.heappop(pending)
+            visited += 1
+            for n in self._neighbors(idx):
+                if dist[n] != d + 1 or n in orphans:
+                    continue
+                # n 還有其他「步數少 1」的鄰格可依靠 → 不受影響
+                if any(dist[m] == d and m not in orphans for m in self._neighbors(n)):
+                    continue
+                orphans.add(n)
+                heapq.heappush(pending, (d + 1, n))
+
+        for idx in orphans:
+            dist[idx] = INF
+        for idx in orphans:
+            if not self._walkable(idx):
+                continue
+            best = min((dist[n] for n in self._neighbors(idx)), default=INF)
+            if best != INF:
+                dist[idx] = best + 1
+                heapq.heappush(heap, (best + 1, idx))
+
+        # 2. 被打開的格子 → 以鄰格最小值 + 1 作為起點
+        for r, c in changed:
+            idx = r * w + c
+            if not self.nav_grid[r][c]:
+                continue
+            if idx == src:
+                best = 0
+            else:
+                best = min((dist[n] for n in self._neighbors(idx)), default=INF)
+                best = INF if best == INF else best + 1
+            if best < dist[idx]:
+                dist[idx] = best
+                heapq.heappush(heap, (best, idx))
+
+        # 3. 從起點往外放鬆（只處理距離真的變短的格子）
+        while heap:
+            d, idx = heapq.heappop(heap)
+            if d != dist[idx]:
+                continue
+            visited += 1
+            for n in self._neighbors(idx):
+                if d + 1 < dist[n] and self._walkable(n):
+                    dist[n] = d + 1
+                    heapq.heappush(heap, (d + 1, n))
+
+        self.last_visited = visited
+        return visited
@@ -0,0 +1,228 @@
+"""
+遠端狀態的用戶端畫面
+
+StateSprites 把 netcode 的 KEYFRAME / DELTA 套用到 ClientState，並依變動
+增量更新 sprite；RemoteMode（連線 server.py）與重播檢視器（replay.py）共用。
+
+RemoteMode 對 main.py 來說就是一個遊戲模式（score / finished / result /
+update / draw / on_key_press），但不跑任何遊戲規則：
+輸入送到伺服器，update 只收狀態訊息。
+"""
+import socket
+
+import arcade
+
+import netcode
+from character import Player, autoscale
+from constants import TILE_SIZE
+from item import Pellet, PowerPellet, PowerPelletList
+from models.base_mode import ASSET_DIR, KEY_DIRECTIONS
+
+
+def parse_address(text):
+    """"host:port" → (host, port)"""
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class StateSprites:
+    def __init__(self):
+        self.state = netcode.ClientState()
+        self.pellets_eaten = 0
+
+        self.walls = arcade.SpriteList(use_spatial_hash=True)
+        self.pellets = arcade.SpriteList()
+        self.power_pellets = PowerPelletList()
+        self.ghosts = arcade.SpriteList()
+        self.player = Player()
+        self.player_list = arcade.SpriteList()
+        self.player_list.append(self.player)
+        self._tiles = None
+        self._wall_sprites = {}
+        self._pellet_sprites = {}
+        self._ghost_sprites = {}
+
+    def apply(self, payload):
+        """套用一則伺服器訊息並同步 sprite"""
+        changes = self.state.apply(payload)
+        if changes.keyframe:
+            self._rebuild()
+        else:
+            for idx in changes.pellets:
+                self._set_pellet(idx)
+            for idx in changes.walls:
+                self._set_wall(idx)
+            for gid in changes.removed:
+                sprite = self._ghost_sprites.pop(gid, None)
+                if sprite is not None:
+                    sprite.remove_from_sprite_lists()
+
+        for gid in changes.ghosts:
+            self._set_ghost(gid)
+        self.player.center_x, self.player.center_y = self.state.player[:2]
+        self.power_pellets.set_pulse(self.state.tick)
+        return changes
+
+    # ---------------- sprite 同步 ----------------
+
+    def _cell_origin(self, idx):
+        """格子索引 → 格子左下角的世界座標"""
+        r, c = divmod(idx, self.state.width)
+        return c * TILE_SIZE, (self.state.height - r - 1) * TILE_SIZE
+
+    def _rebuild(self):
+        """KEYFRAME：地圖不同時重建牆，其餘依目前狀態對齊"""
+        state = self.state
+        if state.tiles != self._tiles:
+            self._tiles = state.tiles
+            wall_img = ASSET_DIR / "wall.png"
+            wall_scale = autoscale(str(wall_img), TILE_SIZE)
+            self.walls = arcade.SpriteList(use_spatial_hash=True)
+            self._wall_sprites = {}
+            for idx, tile in enumerate(state.tiles):
+                if tile != 1:
+                    continue
+                w = arcade.Sprite(str(wall_img), wall_scale)
+                x, y = self._cell_origin(idx)
+                w.center_x = x + TILE_SIZE / 2
+                w.center_y = y + TILE_SIZE / 2
+                self._wall_sprites[idx] = w
+            self._pellet_sprites = {}
+            self.pellets.clear()
+            self.power_pellets.clear()
+        for idx in self._wall_sprites:
+            self._set_wall(idx)
+
+        for idx in range(len(state.pellets)):
+            self._set_pellet(idx)
+
+        for gid in list(self._ghost_sprites):
+            if gid not in state.ghosts:
+                self._ghost_sprites.pop(gid).remove_from_sprite_lists()
+
+    def _set_wall(self, idx):
+        sprite = self._wall_sprites.get(idx)
+        if sprite is None:
+            return
+        visible = not self.state.nav[idx]
+        if visible and not sprite.sprite_lists:
+            self.walls.append(sprite)
+        elif not visible and sprite.sprite_lists:
+            sprite.remove_from_sprite_lists()
+
+    def _set_pellet(self, idx):
+        kind = self.state.pellets[idx]
+        sprite = self._pellet_sprites.get(idx)
+        cls = {2: Pellet, 3: PowerPellet}.get(kind)
+        if sprite is not None and type(sprite) is cls and sprite.sprite_lists:
+            return
+        if sprite is not None and sprite.sprite_lists:
+            sprite.remove_from_sprite_lists()
+            if cls is None:
+                self.pellets_eaten += 1
+        if cls is None:
+            return
+        if type(sprite) is not cls:
+            sprite = cls(*self._cell_origin(idx))
+            self._pellet_sprites[idx] = sprite
+        (self.pellets if cls is Pellet else self.power_pellets).append(sprite)
+
+    def _set_ghost(self, gid):
+        color, _, _, x, y = self.state.ghosts[gid]
+        sprite = self._ghost_sprites.get(gid)
+        if sprite is None:
+            img = str(ASSET_DIR / f"ghost_{color}.png")
+            sprite = arcade.Sprite(img, autoscale(img, TILE_SIZE))
+            self._ghost_sprites[gid] = sprite
+            self.ghosts.append(sprite)
+        sprite.center_x = x
+        sprite.center_y = y
+
+    # ---------------- 繪圖 ----------------
+
+    def draw(self):
+        self.walls.draw()
+        self.pellets.draw()
+        self.power_pellets.draw()
+        self.ghosts.draw()
+        self.player_list.draw()
+
+
+class RemoteMode:
+    def __init__(self, address, mode_id):
+        self.score = 0
+        self.finished = False
+        self.result = None
+        self.tick = 0
+        self.wave = 1
+
+        self.view = StateSprites()
+        self._frames = netcode.FrameReader()
+        self._outbox = bytearray()   # 送出緩衝滿時還沒送出去的位元組，update() 再補送
+
+        self.sock = socket.create_connection(address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.setblocking(False)
+        self._send(netcode.hello(mode_id))
+
+    @property
+    def pellets_eaten(self):
+        return self.view.pellets_eaten
+
+    # ---------------- 輸入 ----------------
+
+    def _send(self, payload):
+        self._outbox += netcode.frame(payload)
+        self._flush()
+
+    def _flush(self):
+        """非阻塞地盡量送出緩衝；送出緩衝滿（BlockingIOError）只是暫時的，留到下次"""
+        while self._outbox and not self.finished:
+            try:
+                sent = self.sock.send(self._outbox)
+            except BlockingIOError:
+                return
+            except OSError:
+                self.finished = True
+                return
+            del self._outbox[:sent]
+
+    def on_key_press(self, key, modifiers):
+        direction = KEY_DIRECTIONS.get(key)
+        if direction is not None:
+            self.set_player_direction(*direction)
+
+    def set_player_direction(self, dx, dy):
+        self._send(netcode.player_input(dx, dy))
+
+    # ---------------- 接收狀態 ----------------
+
+    def update(self, dt):
+        if self.finished:
+            return
+        self._flush()
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b""
+            if not data:
+                # 伺服器斷線
+                self.finished = True
+                break
+            for payload in self._frames.feed(data):
+                self.view.apply(payload)
+
+        state = self.view.state
+        self.tick = state.tick
+        self.score = state.score
+        self.wave = state.wave
+        self.result = state.result
+        if state.finished:
+            self.finished = True
+            self.sock.close()
+
+    def draw(self):
+        self.view.draw()
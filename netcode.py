@@ -0,0 +1,354 @@
+"""
+遊戲狀態的 delta 壓縮編碼（伺服器 → 用戶端、重播串流共用）
+
+訊息（payload）格式，little-endian：
+    KEYFRAME : type u8、tick u32、mode_id u8、width u16、height u16、狀態、
+               tiles / nav / pellets（各 w*h bytes）、玩家、全部鬼
+    DELTA    : type u8、tick u32、flags u8、[玩家]、[狀態]、
+               鬼（新增或變動 / 只有小幅移動 / 移除）、豆子變動格、牆壁變動格
+
+只有跟上一則訊息不同的欄位才會寫進 DELTA。位置量化成 1/4 像素（u16），
+所以地圖長寬最多 MAX_MAP_SIZE（512）格；更大的地圖（HPA* 用的超大地圖）不能經由 netcode 傳送 / 錄製，
+keyframe 時 check_map_size 直接丟 ValueError。鬼的狀態與 AI 模式合成一個 byte（低 4 位元 / 高 4 位元）。
+網路傳輸時每則 payload 前面加 u32 長度（frame / FrameReader）。
+"""
+import struct
+
+from constants import TILE_SIZE
+from snapshot import AI_MODES, GHOST_COLORS, GHOST_STATES, RESULTS, diff_cells
+
+MSG_HELLO = 1       # client → server：mode_id u8
+MSG_INPUT = 2       # client → server：dx i8、dy i8
+MSG_KEYFRAME = 3    # server → client
+MSG_DELTA = 4       # server → client
+
+FLAG_PLAYER = 1
+FLAG_STATUS = 2
+
+POS_SCALE = 4       # 位置量化：1/4 像素
+# u16 位置放得下的最大地圖邊長（格）：最遠的中心點 (n - 0.5) * TILE_SIZE * POS_SCALE <= 0xFFFF
+MAX_MAP_SIZE = int(0xFFFF / (TILE_SIZE * POS_SCALE) + 0.5)
+
+_LEN = struct.Struct("<I")
+_HEAD = struct.Struct("<BI")
+_KEY_INFO = struct.Struct("<BHH")
+_STATUS = struct.Struct("<iHBB")
+_PLAYER = struct.Struct("<HHbb")
+_GHOST = struct.Struct("<HBBHH")
+_MOVE = struct.Struct("<Hbb")      # 只有位置變動的鬼：id、dx、dy（1/4 像素）
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_CELL = struct.Struct("<IB")
+_HELLO = struct.Struct("<BB")
+_INPUT = struct.Struct("<Bbb")
+
+
+# ---------------- framing ----------------
+
+def frame(payload):
+    return _LEN.pack(len(payload)) + payload
+
+
+class FrameReader:
+    """把 socket 收到的 bytes 切回一則則 payload"""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, data):
+        self._buf += data
+        out = []
+        while len(self._buf) >= _LEN.size:
+            (size,) = _LEN.unpack_from(self._buf, 0)
+            end = _LEN.size + size
+            if len(self._buf) < end:
+                break
+            out.append(bytes(self._buf[_LEN.size:end]))
+            del self._buf[:end]
+        return out
+
+
+def check_map_size(width, height):
+    """地圖太大、位置會超出 u16 時丟 ValueError（不要默默送出錯的座標）"""
+    if width > MAX_MAP_SIZE or height > MAX_MAP_SIZE:
+        raise ValueError(f"{width}x{height} map is too large for netcode (max {MAX_MAP_SIZE} tiles per side)")
+
+
+def hello(mode_id):
+    return _HELLO.pack(MSG_HELLO, mode_id)
+
+
+def player_input(dx, dy):
+    return _INPUT.pack(MSG_INPUT, dx, dy)
+
+
+def parse_client_message(payload):
+    """回傳 (type, args)；空的、長度不對或未知的訊息一律丟 ValueError"""
+    if not payload:
+        raise ValueError("empty client message")
+    kind = payload[0]
+    layout = {MSG_HELLO: _HELLO, MSG_INPUT: _INPUT}.get(kind)
+    if layout is None:
+        raise ValueError(f"unknown client message: {kind}")
+    if len(payload) != layout.size:
+        raise ValueError(f"client message {kind}: {len(payload)} bytes, expected {layout.size}")
+    return kind, layout.unpack(payload)[1:]
+
+
+# ---------------- 狀態擷取 ----------------
+
+def _q(v):
+    return max(0, min(0xFFFF, int(round(v * POS_SCALE))))
+
+
+_STATE_IDS = {state: i for i, state in enumerate(GHOST_STATES)}
+_AI_MODE_IDS = {ai_mode: i << 4 for i, ai_mode in enumerate(AI_MODES)}
+
+
+def _ghost_entries(mode):
+    return {
+        g.entity_id: (g._color_id, _STATE_IDS[g.state] | _AI_MODE_IDS[g.ai_mode],
+                      _q(g.center_x), _q(g.center_y))
+        for g in mode.ghosts
+    }
+
+
+def payload_tick(payload):
+    """伺服器訊息的 (type, tick)"""
+    return _HEAD.unpack_from(payload, 0)
+
+
+class StateEncoder:
+    """伺服器端：記住上一則送出的狀態，只編碼差異"""
+
+    def __init__(self, keyframe_interval=120):
+        self.keyframe_interval = keyframe_interval
+        self._last_key_tick = None
+        self._map = None
+        self._nav = b""
+        self._nav_version = None
+        self._pellets = b""
+        self._player = None
+        self._status = None
+        self._ghosts = {}
+
+    def encode(self, mode, force_keyframe=False):
+        """依需要產生 KEYFRAME 或 DELTA"""
+        if (force_keyframe or self._last_key_tick is None
+                or mode.map_bytes is not self._map
+                or mode.tick - self._last_key_tick >= self.keyframe_interval):
+            return self.keyframe(mode)
+        return self.delta(mode)
+
+    def _capture(self, mode):
+        player = mode.player
+        self._player = (_q(player.center_x), _q(player.center_y),
+                        int(player.change_x), int(player.change_y))
+        self._status = (mode.score, getattr(mode, "wave", 1),
+                        RESULTS.index(mode.result), int(mode.finished))
+
+    def keyframe(self, mode):
+        check_map_size(mode.grid_width, mode.grid_height)
+        self._last_key_tick = mode.tick
+        self._map = mode.map_bytes
+        self._nav = mode.map.nav.tobytes()
+        self._nav_version = mode.nav_version
+        self._pellets = bytes(mode.pellet_grid)
+        self._ghosts = _ghost_entries(mode)
+        self._capture(mode)
+
+        parts = [
+            _HEAD.pack(MSG_KEYFRAME, mode.tick),
+            _KEY_INFO.pack(mode.MODE_ID, mode.grid_width, mode.grid_height),
+            _STATUS.pack(*self._status),
+            self._map, self._nav, self._pellets,
+            _PLAYER.pack(*self._player),
+            _U8.pack(len(self._ghosts)),
+        ]
+        parts.extend(_GHOST.pack(gid, *entry) for gid, entry in self._ghosts.items())
+        return b"".join(parts)
+
+    def delta(self, mode):
+        old_player, old_status = self._player, self._status
+        self._capture(mode)
+        flags = 0
+        parts = []
+        if self._player != old_player:
+            flags |= FLAG_PLAYER
+            parts.append(_PLAYER.pack(*self._player))
+        if self._status != old_status:
+            flags |= FLAG_STATUS
+            parts.append(_STATUS.pack(*self._status))
+
+        ghosts = _ghost_entries(mode)
+        changed, moved = [], []
+        for gid, e in ghosts.items():
+            old = self._ghosts.get(gid)
+            if old == e:
+                continue
+            if old is not None and old[:2] == e[:2]:
+                dx, dy = e[2] - old[2], e[3] - old[3]
+                if -128 <= dx < 128 and -128 <= dy < 128:
+                    moved.append(_MOVE.pack(gid, dx, dy))
+                    continue
+            changed.append(_GHOST.pack(gid, *e))
+        removed = [gid for gid in self._ghosts if gid not in ghosts]
+        self._ghosts = ghosts
+        parts.append(_U8.pack(len(changed)))
+        parts.extend(changed)
+        parts.append(_U8.pack(len(moved)))
+        parts.extend(moved)
+        parts.append(_U8.pack(len(removed)))
+        parts.extend(_U16.pack(gid) for gid in removed)
+
+        pellets = bytes(mode.pellet_grid)
+        cells = diff_cells(self._pellets, pellets)
+        self._pellets = pellets
+        parts.append(_U16.pack(len(cells)))
+        parts.extend(_CELL.pack(idx, pellets[idx]) for idx in cells)
+
+        # 導覽格只有開關牆時才會變，版本沒變就不必比對
+        cells = []
+        if mode.nav_version != self._nav_version:
+            nav = mode.map.nav.tobytes()
+            cells = diff_cells(self._nav, nav)
+            self._nav = nav
+            self._nav_version = mode.nav_version
+        parts.append(_U16.pack(len(cells)))
+        parts.extend(_CELL.pack(idx, self._nav[idx]) for idx in cells)
+
+        return _HEAD.pack(MSG_DELTA, mode.tick) + _U8.pack(flags) + b"".join(parts)
+
+
+# ---------------- 用戶端 ----------------
+
+class Changes:
+    """一則訊息套用後的變動摘要（給 renderer 做增量更新）"""
+
+    def __init__(self, keyframe=False):
+        self.keyframe = keyframe
+        self.ghosts = []      # 新增或變動的鬼 id
+        self.removed = []     # 移除的鬼 id
+        self.pellets = []     # 豆子變動的格子索引
+        self.walls = []       # 牆壁變動的格子索引
+
+
+class ClientState:
+    """用戶端持有的遊戲狀態（純資料，不含 sprite）"""
+
+    def __init__(self):
+        self.tick = 0
+        self.mode_id = 0
+        self.width = 0
+        self.height = 0
+        self.score = 0
+        self.wave = 1
+        self.result = None
+        self.finished = False
+        self.tiles = b""
+        self.nav = bytearray()
+        self.pellets = bytearray()
+        self.player = (0.0, 0.0, 0, 0)     # x, y, dx, dy
+        self.ghosts = {}                   # id → (color, state, ai_mode, x, y)
+        self._ghost_q = {}                 # id → 量化後的 (x, y)，套用小幅移動用
+
+    def apply(self, payload):
+        kind, tick = _HEAD.unpack_from(payload, 0)
+        self.tick = tick
+        if kind == MSG_KEYFRAME:
+            return self._apply_keyframe(payload, _HEAD.size)
+        if kind == MSG_DELTA:
+            return self._apply_delta(payload, _HEAD.size)
+        raise ValueError(f"unknown server message: {kind}")
+
+    def _set_status(self, payload, offset):
+        score, wave, result, finished = _STATUS.unpack_from(payload, offset)
+        self.score, self.wave = score, wave
+        self.result, self.finished = RESULTS[result], bool(finished)
+        return offset + _STATUS.size
+
+    def _set_player(self, payload, offset):
+        qx, qy, dx, dy = _PLAYER.unpack_from(payload, offset)
+        self.player = (qx / POS_SCALE, qy / POS_SCALE, dx, dy)
+        return offset + _PLAYER.size
+
+    def _read_ghost(self, payload, offset):
+        gid, color, state, qx, qy = _GHOST.unpack_from(payload, offset)
+        self._ghost_q[gid] = (qx, qy)
+        self.ghosts[gid] = (GHOST_COLORS[color], GHOST_STATES[state & 0x0F], AI_MODES[state >> 4],
+                            qx / POS_SCALE, qy / POS_SCALE)
+        return gid, offset + _GHOST.size
+
+    def _apply_keyframe(self, payload, offset):
+        self.mode_id, self.width, self.height = _KEY_INFO.unpack_from(payload, offset)
+        offset += _KEY_INFO.size
+        offset = self._set_status(payload, offset)
+
+        n = self.width * self.height
+        self.tiles = payload[offset:offset + n]
+        self.nav = bytearray(payload[offset + n:offset + 2 * n])
+        self.pellets = bytearray(payload[offset + 2 * n:offset + 3 * n])
+        offset += 3 * n
+        offset = self._set_player(payload, offset)
+
+        self.ghosts = {}
+        self._ghost_q = {}
+        changes = Changes(keyframe=True)
+        count = payload[offset]
+        offset += 1
+        for _ in range(count):
+            gid, offset = self._read_ghost(payload, offset)
+            changes.ghosts.append(gid)
+        return changes
+
+    def _apply_delta(self, payload, offset):
+        changes = Changes()
+        flags = payload[offset]
+        offset += 1
+        if flags & FLAG_PLAYER:
+            offset = self._set_player(payload, offset)
+        if flags & FLAG_STATUS:
+            offset = self._set_status(payload, offset)
+
+        count = payload[offset]
+        offset += 1
+        for _ in range(count):
+            gid, offset = self._read_ghost(payload, offset)
+            changes.ghosts.append(gid)
+
+        count = payload[offset]
+        offset += 1
+        for _ in range(count):
+            gid, dx, dy = _MOVE.unpack_from(payload, offset)
+            offset += _MOVE.size
+            qx, qy = self._ghost_q[gid]
+            qx, qy = qx + dx, qy + dy
+            self._ghost_q[gid] = (qx, qy)
+            self.ghosts[gid] = self.ghosts[gid][:3] + (qx / POS_SCALE, qy / POS_SCALE)
+            changes.ghosts.append(gid)
+
+        count = payload[offset]
+        offset += 1
+        for _ in range(count):
+            (gid,) = _U16.unpack_from(payload, offset)
+            offset += _U16.size
+            self.ghosts.pop(gid, None)
+            self._ghost_q.pop(gid, None)
+            changes.removed.append(gid)
+
+        (count,) = _U16.unpack_from(payload, offset)
+        offset += _U16.size
+        for _ in range(count):
+            idx, kind = _CELL.unpack_from(payload, offset)
+            offset += _CELL.size
+            self.pellets[idx] = kind
+            changes.pellets.append(idx)
+
+        (count,) = _U16.unpack_from(payload, offset)
+        offset += _U16.size
+        for _ in range(count):
+            idx, walkable = _CELL.unpack_from(payload, offset)
+            offset += _CELL.size
+            self.nav[idx] = walkable
+            changes.walls.append(idx)
+        return changes
@@ -0,0 +1,630 @@
+"""
+鬼尋路用的可替換後端
+
+每個 Pathfinder 只做一件事：在導覽格上從 start 走到 target，回傳下一格。
+    next_step(nav_grid, width, height, start, target) → (row, col) 或 None
+nav_grid[r][c] 為真 = 可走，row 0 在最上方（每列可以是 bytes-like 或 0 / 1 / bool 的 list）；
+expanded 累計展開過的節點數。
+
+- BFSPathfinder   ：原本的廣度優先搜尋（最短路，展開整片 frontier）
+- AStarPathfinder ：Manhattan 啟發式 + 找到目標就停
+- JPSPathfinder   ：4 方向的 jump point search，直線走廊與開放廣場只展開跳點
+- HPAPathfinder   ：階層式（HPA*），超大地圖用；切成 cluster，只在入口圖上搜尋
+
+前三者都回傳最短路的下一格（步數相同時選到的路線可能不同）；
+HPA* 回傳近似最短路的下一格（exact = False）。
+換地圖時呼叫 prepare()、每 tick 呼叫 warm(count)、導覽格改變時（動態牆壁）呼叫 invalidate(cells)，
+有前處理 / 快取的後端（HPA*）據此分批建立或丟掉受影響的部分。
+"""
+import heapq
+from collections import OrderedDict, deque
+
+_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))   # 上下左右
+
+
+class Pathfinder:
+    name = ""
+    exact = True          # 回傳的下一格一定在最短路上
+
+    def __init__(self):
+        self.expanded = 0     # 累計展開的節點數（基準測試用）
+        self.searches = 0
+
+    def next_step(self, nav_grid, width, height, start, target):
+        raise NotImplementedError
+
+    def prepare(self, nav_grid, width, height):
+        """換地圖時呼叫，讓需要前處理的後端排好要建的資料"""
+
+    def warm(self, count):
+        """每 tick 呼叫：有前處理的後端趁這時建一點（count 為這次最多建幾份）"""
+
+    def invalidate(self, cells=None):
+        """導覽格的這些 (row, col) 變了（None = 整張）；沒有快取的後端不用處理"""
+
+
+class BFSPathfinder(Pathfinder):
+    name = "bfs"
+
+    def next_step(self, nav_grid, width, height, start, target):
+        self.searches += 1
+        q = deque([start])
+        parent = {start: None}
+        expanded = 0
+        found = False
+        while q:
+            r, c = q.popleft()
+            expanded += 1
+            if (r, c) == target:
+                found = True
+                break
+            for dr, dc in _DIRS:
+                nr, nc = r + dr, c + dc
+                if not (0 <= nr < height and 0 <= nc < width):
+                    continue
+                if not nav_grid[nr][nc] or (nr, nc) in parent:
+                    continue
+                parent[(nr, nc)] = (r, c)
+                q.append((nr, nc))
+        self.expanded += expanded
+
+        if not found or target == start:
+            return None
+        cur = target
+        while parent[cur] != start:
+            cur = parent[cur]
+        return cur
+
+
+class AStarPathfinder(Pathfinder):
+    name = "astar"
+
+    def next_step(self, nav_grid, width, height, start, target):
+        self.searches += 1
+        if start == target:
+            return None
+        tr, tc = target
+        sr, sc = start
+        # (f, h, row, col)：f 相同時優先展開離目標近的格子
+        h = abs(sr - tr) + abs(sc - tc)
+        heap = [(h, h, sr, sc)]
+        g = {start: 0}
+        parent = {start: None}
+        expanded = 0
+        found = False
+        while heap:
+            _, _, r, c = heapq.heappop(heap)
+            cur = (r, c)
+            expanded += 1
+            if cur == target:
+                found = True
+                break
+            ng = g[cur] + 1
+            for dr, dc in _DIRS:
+                nr, nc = r + dr, c + dc
+                if not (0 <= nr < height and 0 <= nc < width) or not nav_grid[nr][nc]:
+                    continue
+                nxt = (nr, nc)
+                if ng < g.get(nxt, ng + 1):
+                    g[nxt] = ng
+                    parent[nxt] = cur
+                    h = abs(nr - tr) + abs(nc - tc)
+                    heapq.heappush(heap, (ng + h, h, nr, nc))
+        self.expanded += expanded
+
+        if not found:
+            return None
+        while parent[cur] != start:
+            cur = parent[cur]
+        return cur
+
+
+class JPSPathfinder(Pathfinder):
+    """
+    4 方向 JPS：
+    - 水平移動只在「目標」或「出現 forced 的上下鄰格」（後方被牆擋住）時停下
+    - 垂直移動每一格都往左右做水平掃描，掃到跳點就在這一格停下
+      （左右的分岔一定會被水平掃描找到，不需要另外判斷 forced）
+    路徑由一串跳點組成，相鄰跳點之間是直線。
+    """
+
+    name = "jps"
+
+    def _walkable(self, r, c):
+        return 0 <= r < self._h and 0 <= c < self._w and self._nav[r][c]
+
+    def _jump_h(self, r, c, dc):
+        walkable = self._walkable
+        target = self._target
+        while True:
+            c += dc
+            if not walkable(r, c):
+                return None
+            self._scanned += 1
+            if (r, c) == target:
+                return r, c
+            if (walkable(r - 1, c) and not walkable(r - 1, c - dc)) or \
+                    (walkable(r + 1, c) and not walkable(r + 1, c - dc)):
+                return r, c
+
+    def _jump_v(self, r, c, dr):
+        walkable = self._walkable
+        target = self._target
+        while True:
+            r += dr
+            if not walkable(r, c):
+                return None
+            self._scanned += 1
+            if (r, c) == target:
+                return r, c
+            if self._jump_h(r, c, -1) or self._jump_h(r, c, 1):
+                return r, c
+
+    def _directions(self, r, c, d):
+        """從跳點 (r, c) 往下搜尋的方向；d = 抵達時的方向（起點為 None）"""
+        if d is None:
+            return _DIRS
+        dr, dc = d
+        if dr:
+            # 垂直抵達：繼續往前，並往左右展開
+            return ((dr, 0), (0, -1), (0, 1))
+        # 水平抵達：繼續往前，加上 forced 的上下方向
+        dirs = [(0, dc)]
+        walkable = self._walkable
+        for vr in (-1, 1):
+            if walkable(r + vr, c) and not walkable(r + vr, c - dc):
+                dirs.append((vr, 0))
+        return dirs
+
+    def next_step(self, nav_grid, width, height, start, target):
+        self.searches += 1
+        if start == target:
+            return None
+        self._nav, self._w, self._h, self._target = nav_grid, width, height, target
+        self._scanned = 0
+
+        tr, tc = target
+        sr, sc = start
+        h = abs(sr - tr) + abs(sc - tc)
+        heap = [(h, h, sr, sc, None)]
+        g = {start: 0}
+        parent = {start: None}
+        found = False
+        while heap:
+            _, _, r, c, d = heapq.heappop(heap)
+            cur = (r, c)
+            if cur == target:
+                found = True
+                break
+            for dr, dc in self._directions(r, c, d):
+                jp = self._jump_v(r, c, dr) if dr else self._jump_h(r, c, dc)
+                if jp is None:
+                    continue
+                ng = g[cur] + abs(jp[0] - r) + abs(jp[1] - c)
+                if ng < g.get(jp, ng + 1):
+                    g[jp] = ng
+                    parent[jp] = cur
+                    h = abs(jp[0] - tr) + abs(jp[1] - tc)
+                    heapq.heappush(heap, (ng + h, h, jp[0], jp[1], (dr, dc)))
+        self.expanded += self._scanned
+        self._nav = None
+
+        if not found:
+            return None
+        while parent[cur] != start:
+            cur = parent[cur]
+        # 第一個跳點和起點在同一直線上，往它的方向走一格
+        dr = (cur[0] > sr) - (cur[0] < sr)
+        dc = (cur[1] > sc) - (cur[1] < sc)
+        return sr + dr, sc + dc
+
+
+def _rect_distance(node, bounds):
+    """格子到矩形（r0, r1, c0, c1）的 Manhattan 距離（到目標 cluster 的啟發值）"""
+    r, c = node
+    r0, r1, c0, c1 = bounds
+    dr = r0 - r if r < r0 else (r - r1 + 1 if r >= r1 else 0)
+    dc = c0 - c if c < c0 else (c - c1 + 1 if c >= c1 else 0)
+    return dr + dc
+
+
+class _AbstractSearch:
+    """一個跨多次決策分段展開的抽象 A*（起點固定，終點是目標區塊的任一入口）"""
+
+    __slots__ = ("goals", "bounds", "g", "parent", "heap", "closest", "expanded", "end", "done")
+
+    def __init__(self, start, dist_s, entrances_s, goals, bounds):
+        self.goals = goals
+        self.bounds = bounds
+        self.g = {start: 0}
+        self.parent = {start: None}
+        self.heap = []
+        self.closest = None    # (啟發值, 節點)：還沒找到時先往這裡走
+        self.expanded = 0
+        self.end = None
+        self.done = False
+        links = [(n, d) for n, d in dist_s.items() if n in entrances_s and n != start]
+        if start in entrances_s:
+            links += entrances_s[start]
+        for n, cost in links:
+            if cost < self.g.get(n, cost + 1):
+                self.g[n] = cost
+                self.parent[n] = start
+                h = _rect_distance(n, bounds)
+                heapq.heappush(self.heap, (cost + h, h, cost, n))
+        if not self.heap:
+            self.done = True
+
+    def route(self):
+        """([(節點, 到路線終點的成本), ...], 終點是否為目標區塊的入口)"""
+        reached = self.end is not None
+        end = self.end if reached else (self.closest[1] if self.closest else next(iter(self.g)))
+        path = []
+        cur = end
+        while cur is not None:
+            path.append(cur)
+            cur = self.parent[cur]
+        path.reverse()
+        g = self.g
+        extra = 0 if reached else _rect_distance(end, self.bounds)
+        return [(n, g[end] - g[n] + extra) for n in path], reached
+
+
+class HPAPathfinder(Pathfinder):
+    """
+    HPA*（hierarchical pathfinding）：
+    - 地圖切成 cluster_size × cluster_size 的 cluster；相鄰 cluster 的邊界上，兩側都可走的連續段
+      放一組入口（段短放中間一組，段長放兩端各一組），入口兩側的格子是抽象圖的節點
+    - 每個 cluster 在 cluster 內從各入口 BFS，得到入口之間的距離（抽象圖的邊）；
+      prepare() 換地圖時只排入佇列，warm() 每 tick 建幾個，查詢碰到還沒建的 cluster 就當場建
+    - 查詢：起點 / 目標在各自 cluster 內 BFS 接上入口，在抽象圖上跑 A* 到目標區塊的入口，
+      只細化第一段（起點 cluster 內的 BFS 父節點）回傳下一格
+    - 每次決策最多做 step_nodes 單位的工作（展開一個節點 1 單位、建一個 cluster build_cost 單位，
+      建一個 cluster 約 1 ms ≈ 250 次展開）；沒找完的搜尋留到下一次決策接著展開，這段期間先朝目前離目標最近的節點走。
+      一次決策的工作上限：起點 / 目標 cluster 各一次 BFS（必要時各建一個 cluster）＋ step_nodes 次展開
+      （或展開途中建一個 cluster）；1001x1001 上 p99 約 1.3 ms（benchmarks/bench_hpa.py）
+    - 路徑與進行中的搜尋依「目標 cluster 內的連通區塊」快取（LRU）：目標在同一塊裡移動時沿用，
+      只要起點 cluster 碰得到路線上的節點就直接接上
+    - 單一搜尋展開超過 max_nodes 就停止，之後朝最近的節點走
+    - 沒找完的搜尋只給「目前最近的節點」，鬼可能先走過去又折回來；為了不在兩格之間來回：
+      鬼站在這段路線的盡頭時回傳 None（先不動，等搜尋往前展開），離開路線一格時退回去接上，
+      真的走離路線才從目前位置重新搜尋。但這仍是近似：目標走得到不保證一定抵達
+      （cluster 很小、step_nodes 很少時偶爾會繞不出來；預設值在隨機地圖上沒有觀察到）
+    """
+
+    name = "hpa"
+    exact = False
+
+    def __init__(self, cluster_size=16, step_nodes=50, build_cost=250, max_nodes=20000, cache_size=64):
+        super().__init__()
+        self.cluster_size = cluster_size
+        self.step_nodes = step_nodes
+        self.build_cost = build_cost
+        self.max_nodes = max_nodes
+        self.cache_size = cache_size
+        self._nav = None
+        self._w = self._h = 0
+        self._work = 0
+        self._borders = {}    # ("v" / "h", cr, cc) → [(這側格, 對側格), ...]（cluster 右側 / 下側邊界）
+        self._clusters = {}   # (cr, cc) → {入口格: [(相鄰節點, 成本), ...]}
+        self._pending = deque()       # 等 warm() 建立的 cluster
+        self._paths = OrderedDict()   # (目標 cluster, 區塊代表入口) → _AbstractSearch.route()
+        self._open = OrderedDict()    # (目標 cluster, 區塊代表入口) → 進行中的 _AbstractSearch
+
+        # 調校用統計
+        self.cache_hits = 0
+        self.truncated = 0     # 工作量用完、留到下次繼續的決策
+        self.clusters_built = 0
+
+    def prepare(self, nav_grid, width, height):
+        """換地圖時把所有 cluster 排進 warm() 的佇列（不在這裡一次建完，避免換地圖卡住）"""
+        self._use(nav_grid, width, height)
+        s = self.cluster_size
+        self._pending = deque((cr, cc) for cr in range((height + s - 1) // s)
+                              for cc in range((width + s - 1) // s))
+
+    def warm(self, count):
+        """建立佇列裡最多 count 個還沒建的 cluster"""
+        pending = self._pending
+        while count > 0 and pending:
+            key = pending.popleft()
+            if key not in self._clusters:
+                self._cluster(*key)
+                count -= 1
+
+    def _use(self, nav_grid, width, height):
+        if nav_grid is not self._nav or width != self._w or height != self._h:
+            self._nav, self._w, self._h = nav_grid, width, height
+            self.invalidate()
+
+    def invalidate(self, cells=None):
+        if cells is None:
+            self._borders.clear()
+            self._clusters.clear()
+            self._pending.clear()
+        else:
+            s = self.cluster_size
+            for r, c in cells:
+                cr, cc = r // s, c // s
+                for key in (("v", cr, cc), ("v", cr, cc - 1), ("h", cr, cc), ("h", cr - 1, cc)):
+                    self._borders.pop(key, None)
+                for key in ((cr, cc), (cr - 1, cc), (cr + 1, cc), (cr, cc - 1), (cr, cc + 1)):
+                    if self._clusters.pop(key, None) is not None:
+                        self._pending.append(key)
+        self._paths.clear()
+        self._open.clear()
+
+    # ---------------- 抽象圖 ----------------
+
+    def _bounds(self, cr, cc):
+        s = self.cluster_size
+        return cr * s, min((cr + 1) * s, self._h), cc * s, min((cc + 1) * s, self._w)
+
+    def _border(self, kind, cr, cc):
+        """cluster (cr, cc) 右側（"v"）或下側（"h"）邊界上的入口"""
+        key = (kind, cr, cc)
+        pairs = self._borders.get(key)
+        if pairs is not None:
+            return pairs
+        nav = self._nav
+        r0, r1, c0, c1 = self._bounds(cr, cc)
+        if kind == "v":
+            if c1 >= self._w:
+                line = []
+            else:
+                line = [((r, c1 - 1), (r, c1)) for r in range(r0, r1)]
+        else:
+            if r1 >= self._h:
+                line = []
+            else:
+                line = [((r1 - 1, c), (r1, c)) for c in range(c0, c1)]
+
+        pairs = []
+        run = []
+        for pair in line + [None]:
+            if pair is not None and nav[pair[0][0]][pair[0][1]] and nav[pair[1][0]][pair[1][1]]:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) < 6:
+                    pairs.append(run[len(run) // 2])
+                else:
+                    pairs.append(run[0])
+                    pairs.append(run[-1])
+                run = []
+        pairs = tuple(pairs)
+        self._borders[key] = pairs
+        return pairs
+
+    def _local_graph(self, cr, cc):
+        """cluster 內每格的可走鄰格（以 cluster 內的扁平索引表示）→ (r0, c0, 寬, 鄰格表)"""
+        r0, r1, c0, c1 = self._bounds(cr, cc)
+        w = c1 - c0
+        nav = self._nav
+        cells = bytearray()
+        for r in range(r0, r1):
+            cells.extend(nav[r][c0:c1])     # bytes-like 的列直接複製；list 的列逐格（0 / 1 / bool）
+        n = len(cells)
+        nbrs = []
+        for i in range(n):
+            if not cells[i]:
+                nbrs.append(())
+                continue
+            c = i % w
+            nb = []
+            if i >= w and cells[i - w]:
+                nb.append(i - w)
+            if i + w < n and cells[i + w]:
+                nb.append(i + w)
+            if c > 0 and cells[i - 1]:
+                nb.append(i - 1)
+            if c < w - 1 and cells[i + 1]:
+                nb.append(i + 1)
+            nbrs.append(nb)
+        return r0, c0, w, nbrs
+
+    def _bfs_local(self, nbrs, source):
+        """鄰格表上的 BFS → (距離表, 父節點表, 抵達順序)；-1 = 到不了"""
+        dist = [-1] * len(nbrs)
+        parent = [-1] * len(nbrs)
+        dist[source] = 0
+        order = [source]
+        for i in order:
+            d = dist[i] + 1
+            for j in nbrs[i]:
+                if dist[j] < 0:
+                    dist[j] = d
+                    parent[j] = i
+                    order.append(j)
+        self.expanded += len(order)
+        return dist, parent, order
+
+    def _cluster_bfs(self, cr, cc, source):
+        """cluster 內從 source 出發的 BFS → (格子 → 距離, 格子 → 父節點)"""
+        r0, c0, w, nbrs = self._local_graph(cr, cc)
+        dist, parent, order = self._bfs_local(nbrs, (source[0] - r0) * w + source[1] - c0)
+        cells = {i: (r0 + i // w, c0 + i % w) for i in order}
+        return ({cells[i]: dist[i] for i in order},
+                {cells[i]: cells.get(parent[i]) for i in order})
+
+    def _cluster(self, cr, cc):
+        """cluster 的入口與邊（prepare() 一次建好，或第一次用到時建立）"""
+        node = self._clusters.get((cr, cc))
+        if node is not None:
+            return node
+        links = {}
+        for kind, br, bc, mine in (("v", cr, cc, 0), ("v", cr, cc - 1, 1),
+                                   ("h", cr, cc, 0), ("h", cr - 1, cc, 1)):
+            if br < 0 or bc < 0:
+                continue
+            for pair in self._border(kind, br, bc):
+                links.setdefault(pair[mine], []).append((pair[1 - mine], 1))
+        if links:
+            r0, c0, w, nbrs = self._local_graph(cr, cc)
+            entrances = [(e, (e[0] - r0) * w + e[1] - c0) for e in links]
+            for e, i in entrances:
+                dist = self._bfs_local(nbrs, i)[0]
+                edges = links[e]
+                for other, j in entrances:
+                    if j != i and dist[j] >= 0:
+                        edges.append((other, dist[j]))
+        # 邊表轉成整數 tuple：GC 可以不再追蹤整張抽象圖（否則 gen2 回收會暫停好幾毫秒）
+        links = {e: tuple(edges) for e, edges in links.items()}
+        self._clusters[(cr, cc)] = links
+        self.clusters_built += 1
+        return links
+
+    # ---------------- 查詢 ----------------
+
+    def next_step(self, nav_grid, width, height, start, target):
+        self.searches += 1
+        if start == target:
+            return None
+        self._use(nav_grid, width, height)
+        self._work = self.step_nodes
+        built = self.clusters_built
+
+        s = self.cluster_size
+        scid = (start[0] // s, start[1] // s)
+        tcid = (target[0] // s, target[1] // s)
+        dist_s, parent_s = self._cluster_bfs(*scid, start)
+        entrances_s = self._cluster(*scid)
+        entrances_t = self._cluster(*tcid)
+        self._work -= (self.clusters_built - built) * self.build_cost
+        # 目標端：目標所在區塊（cluster 內連通的那一塊）接得到的入口與距離
+        dist_t = {n: d for n, d in self._cluster_bfs(*tcid, target)[0].items() if n in entrances_t}
+        direct = dist_s.get(target)
+        if not dist_t:
+            # 目標的區塊沒有入口接出去：只有同一塊裡才走得到
+            return self._first_step(start, target, parent_s) if direct is not None else None
+
+        # 同一個目標區塊的目標共用抽象路徑 / 搜尋（玩家在區塊裡移動時不用重來）
+        key = (tcid, min(dist_t))
+        route = self._paths.get(key)
+        if route is not None:
+            step = self._join(route, start, target, dist_s, parent_s, dist_t, direct)
+            if step is not None:
+                self._paths.move_to_end(key)
+                self.cache_hits += 1
+                return step
+
+        search = self._open.get(key)
+        if search is not None:
+            self._open.move_to_end(key)
+            self._expand(search)
+            step = self._join(search.route(), start, target, dist_s, parent_s, dist_t, direct)
+            if search.done:
+                del self._open[key]
+                self._remember(self._paths, key, search.route())
+            if step is not None:
+                return step
+            if not search.done and search.route()[0][-1][0] == start:
+                # 鬼站在還沒找完的路線盡頭：不要從這裡重來（新搜尋常常又指回上一格，兩格之間來回），
+                # 這次先不給下一格，等這個搜尋之後的決策繼續往前展開
+                return None
+            # 鬼已經離開這個搜尋的路線（被撞開 / 換了追法），從目前位置重新開始
+
+        search = _AbstractSearch(start, dist_s, entrances_s, set(dist_t), self._bounds(*tcid))
+        self._expand(search)
+        if search.done:
+            self._open.pop(key, None)
+            self._remember(self._paths, key, search.route())
+        else:
+            self._remember(self._open, key, search)
+        return self._join(search.route(), start, target, dist_s, parent_s, dist_t, direct)
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _expand(self, search):
+        """抽象 A* 往下展開，直到碰到目標區塊的入口、這次決策的工作量用完，或整個搜尋超過 max_nodes"""
+        s = self.cluster_size
+        g = search.g
+        parent = search.parent
+        heap = search.heap
+        bounds = search.bounds
+        goals = search.goals
+        expanded = 0
+        # 至少展開一個節點，建 cluster 把工作量用完時也有地方可以走
+        while heap and (self._work > 0 or search.closest is None):
+            _, h, gc, cur = heapq.heappop(heap)
+            if gc > g[cur]:
+                continue
+            if cur in goals:
+                search.end = cur
+                search.done = True
+                break
+            expanded += 1
+            self._work -= 1
+            if search.closest is None or h < search.closest[0]:
+                search.closest = (h, cur)
+            if search.expanded + expanded > self.max_nodes:
+                search.done = True
+                break
+            built = self.clusters_built
+            edges = self._cluster(cur[0] // s, cur[1] // s).get(cur, ())
+            self._work -= (self.clusters_built - built) * self.build_cost
+            for n, cost in edges:
+                ng = gc + cost
+                if ng < g.get(n, ng + 1):
+                    g[n] = ng
+                    parent[n] = cur
+                    nh = _rect_distance(n, bounds)
+                    heapq.heappush(heap, (ng + nh, nh, ng, n))
+        else:
+            if not heap:
+                search.done = True     # 抽象圖上到不了：停在離目標最近的節點
+        if heap and not search.done:
+            self.truncated += 1
+        search.expanded += expanded
+        self.expanded += expanded
+
+    def _join(self, route, start, target, dist_s, parent_s, dist_t, direct):
+        """
+        從目前位置接上路線：挑起點 cluster 內走得到（或就在隔壁）、總成本最小的路線節點，回傳往它的下一格；
+        同一塊裡直接走到目標比較近時直接走。接不上回傳 None
+        """
+        nodes, reached = route
+        tail = dist_t.get(nodes[-1][0]) if reached else 0
+        if tail is None:
+            nodes = ()
+        best = None
+        for i, (n, remaining) in enumerate(nodes):
+            d = dist_s.get(n)
+            if d is None and abs(n[0] - start[0]) + abs(n[1] - start[1]) == 1:
+                d = 1    # 隔壁 cluster 的路線節點（通常是剛走過來的那一格）：退回去接上，不必重新搜尋
+            if d is not None and (best is None or d + remaining + tail < best[0]):
+                best = (d + remaining + tail, i)
+        if direct is not None and (best is None or direct <= best[0]):
+            return self._first_step(start, target, parent_s)
+        if best is None:
+            return None
+        i = best[1]
+        hop = nodes[i][0]
+        if hop == start:
+            if i + 1 == len(nodes):
+                return None
+            hop = nodes[i + 1][0]
+        return self._first_step(start, hop, parent_s)
+
+    @staticmethod
+    def _first_step(start, hop, parent_s):
+        """細化第一段：hop 在起點 cluster 內就沿 BFS 父節點回推，否則 hop 就是隔壁格"""
+        if hop not in parent_s:
+            return hop
+        cur = hop
+        while parent_s[cur] != start:
+            cur = parent_s[cur]
+        return cur
+
+
+PATHFINDERS = {
+    cls.name: cls for cls in (BFSPathfinder, AStarPathfinder, JPSPathfinder, HPAPathfinder)
+}
+
+
+def make_pathfinder(name):
+    return PATHFINDERS[name]()
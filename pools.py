@@ -0,0 +1,31 @@
+"""
+Sprite 物件池
+
+鬼重生、豆子重生、換 Wave 重建地圖時，把用完的 sprite 放回池子，
+下次需要同一種 sprite 時直接取回並 reset，不重新載入貼圖或配置新物件。
+"""
+from collections import defaultdict
+
+
+class SpritePool:
+    def __init__(self):
+        self._free = defaultdict(list)   # key → 閒置的 sprite
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, key, factory):
+        """取出一個閒置的 sprite；池子是空的才呼叫 factory() 建立新的"""
+        free = self._free.get(key)
+        if free:
+            self.reused += 1
+            return free.pop()
+        self.created += 1
+        return factory()
+
+    def release(self, key, sprite):
+        """把 sprite 移出所有 SpriteList 並放回池子"""
+        sprite.remove_from_sprite_lists()
+        self._free[key].append(sprite)
+
+    def idle(self):
+        return sum(len(v) for v in self._free.values())
@@ -0,0 +1,304 @@
+"""
+觀戰用的重播串流：每 tick 一則 netcode DELTA，定期插入 KEYFRAME 供跳轉
+
+檔案格式（little-endian）：
+    header  : magic "PMRP"、version u16、keyframe_interval u16
+    records : 每則 u32 長度 + netcode payload（與網路封包相同）
+    end     : u32 0（結束標記；payload 不會是空的）
+    index   : keyframe 數 u32、最後 tick u32、(tick u32, offset u64) * N
+    trailer : index offset u64、magic "PMRI"
+
+串流寫到管線時同樣格式；讀的一方可以用 stream() 邊收邊解，讀到結束標記就停，不會把 index 當成 payload。
+只有寫完的檔案才有結束標記與 index（沒有 index 時 ReplayReader 會自己掃一遍）。
+
+    python replay.py info game.pmrp     # 長度、大小、每分鐘 bytes
+    python replay.py view game.pmrp     # 播放；← / → 跳 5 秒，空白鍵暫停
+"""
+import argparse
+import bisect
+import mmap
+import struct
+import sys
+import time
+
+import netcode
+
+MAGIC = b"PMRP"
+INDEX_MAGIC = b"PMRI"
+VERSION = 2
+
+KEYFRAME_INTERVAL = 300     # 每 5 秒一個 keyframe
+TICKS_PER_MINUTE = 60 * 60
+
+_HEADER = struct.Struct("<4sHH")
+_LEN = struct.Struct("<I")
+_INDEX_HEAD = struct.Struct("<II")
+_INDEX_ENTRY = struct.Struct("<IQ")
+_TRAILER = struct.Struct("<Q4s")
+_END = _LEN.pack(0)
+
+
+# ---------------- 寫入 ----------------
+
+class ReplayWriter:
+    """把遊戲模式每 tick 的狀態差異寫進檔案或管線"""
+
+    def __init__(self, target, keyframe_interval=KEYFRAME_INTERVAL):
+        # target：檔案路徑或已開啟的 binary 檔案物件（例如 sys.stdout.buffer）
+        self._owns_file = isinstance(target, str)
+        self._file = open(target, "wb") if self._owns_file else target
+        self.encoder = netcode.StateEncoder(keyframe_interval)
+        self.keyframes = []          # (tick, offset)
+        self.bytes_written = 0
+        self.ticks = 0
+        self.encode_ns = 0
+        self._last_tick = None
+        self._write(_HEADER.pack(MAGIC, VERSION, keyframe_interval))
+
+    def _write(self, data):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def record(self, mode):
+        """每次 mode.update 後呼叫；同一 tick 只記一次"""
+        if mode.tick == self._last_tick:
+            return
+        start = time.perf_counter_ns()
+        payload = self.encoder.encode(mode)
+        self.encode_ns += time.perf_counter_ns() - start
+
+        if payload[0] == netcode.MSG_KEYFRAME:
+            self.keyframes.append((mode.tick, self.bytes_written))
+        self._write(_LEN.pack(len(payload)) + payload)
+        self._last_tick = mode.tick
+        self.ticks += 1
+
+    def stats(self):
+        """串流大小與編碼成本"""
+        ticks = max(self.ticks, 1)
+        return {
+            "ticks": self.ticks,
+            "bytes": self.bytes_written,
+            "bytes_per_minute": self.bytes_written * TICKS_PER_MINUTE / ticks,
+            "encode_us_per_tick": self.encode_ns / ticks / 1000,
+            "keyframes": len(self.keyframes),
+        }
+
+    def close(self):
+        index_offset = self.bytes_written + len(_END)
+        parts = [_END, _INDEX_HEAD.pack(len(self.keyframes), self._last_tick or 0)]
+        parts.extend(_INDEX_ENTRY.pack(tick, offset) for tick, offset in self.keyframes)
+        parts.append(_TRAILER.pack(index_offset, INDEX_MAGIC))
+        self._write(b"".join(parts))
+        self._file.flush()
+        if self._owns_file:
+            self._file.close()
+
+
+# ---------------- 讀取 ----------------
+
+def _read_header(data):
+    magic, version, keyframe_interval = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a replay stream")
+    if version != VERSION:
+        raise ValueError(f"unsupported replay version: {version}")
+    return keyframe_interval
+
+
+def _read_exact(f, size):
+    data = b""
+    while len(data) < size:
+        more = f.read(size - len(data))
+        if not more:
+            return None
+        data += more
+    return data
+
+
+def stream(f):
+    """從管線 / 檔案物件依序讀出 payload（遇到結束標記或 EOF 結束）"""
+    header = _read_exact(f, _HEADER.size)
+    if not header:
+        return
+    _read_header(header)
+    while True:
+        head = _read_exact(f, _LEN.size)
+        if not head:
+            return
+        (size,) = _LEN.unpack(head)
+        if size == 0:
+            return
+        payload = _read_exact(f, size)
+        if not payload:
+            return
+        yield payload
+
+
+class ReplayReader:
+    """mmap 開啟重播檔，依 keyframe index 跳轉"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.keyframe_interval = _read_header(self._mmap)
+        self.size = len(self._mmap)
+
+        self.keyframes = []
+        self.end = self.size
+        self.last_tick = 0
+        self._load_index()
+
+        self.first_tick = netcode.payload_tick(self._payload_at(_HEADER.size)[0])[1] \
+            if self.end > _HEADER.size else 0
+        self._key_ticks = [tick for tick, _ in self.keyframes]
+
+    def _payload_at(self, offset):
+        (size,) = _LEN.unpack_from(self._mmap, offset)
+        start = offset + _LEN.size
+        return self._mmap[start:start + size], start + size
+
+    def _load_index(self):
+        if self.size >= _HEADER.size + _TRAILER.size:
+            index_offset, magic = _TRAILER.unpack_from(self._mmap, self.size - _TRAILER.size)
+            if magic == INDEX_MAGIC:
+                count, self.last_tick = _INDEX_HEAD.unpack_from(self._mmap, index_offset)
+                base = index_offset + _INDEX_HEAD.size
+                self.keyframes = [
+                    _INDEX_ENTRY.unpack_from(self._mmap, base + i * _INDEX_ENTRY.size)
+                    for i in range(count)
+                ]
+                self.end = index_offset - len(_END)
+                return
+
+        # 沒寫完的串流：掃一遍找 keyframe
+        offset = _HEADER.size
+        while offset + _LEN.size <= self.size:
+            payload, nxt = self._payload_at(offset)
+            if nxt > self.size or not payload:
+                break
+            kind, tick = netcode.payload_tick(payload)
+            if kind == netcode.MSG_KEYFRAME:
+                self.keyframes.append((tick, offset))
+            self.last_tick = tick
+            offset = nxt
+        self.end = offset
+
+    def payloads(self, offset=_HEADER.size):
+        """從 offset 開始依序產生 (offset, payload)"""
+        while offset < self.end:
+            payload, nxt = self._payload_at(offset)
+            yield offset, payload
+            offset = nxt
+
+    def seek(self, tick, view):
+        """
+        把 view（有 apply(payload) 的物件）帶到 tick 的狀態：
+        從 tick 之前最近的 keyframe 開始套用。回傳下一則訊息的 offset。
+        """
+        if not self.keyframes:
+            return self.end
+        i = bisect.bisect_right(self._key_ticks, tick) - 1
+        offset = self.keyframes[max(i, 0)][1]
+        for offset, payload in self.payloads(offset):
+            if netcode.payload_tick(payload)[1] > tick:
+                return offset
+            view.apply(payload)
+        return self.end
+
+    def stats(self):
+        ticks = max(self.last_tick - self.first_tick + 1, 1)
+        return {
+            "ticks": ticks,
+            "bytes": self.size,
+            "bytes_per_minute": self.size * TICKS_PER_MINUTE / ticks,
+            "keyframes": len(self.keyframes),
+        }
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+# ---------------- 檢視器 ----------------
+
+def view(path):
+    import arcade
+
+    from main import WINDOW_HEIGHT, WINDOW_WIDTH
+    from net_client import StateSprites
+
+    reader = ReplayReader(path)
+    seek_ticks = 5 * 60
+
+    class ReplayWindow(arcade.Window):
+        def __init__(self):
+            super().__init__(WINDOW_WIDTH, WINDOW_HEIGHT, f"Replay - {path}")
+            self.view = StateSprites()
+            self.offset = reader.seek(reader.first_tick, self.view)
+            self.paused = False
+            self.text = arcade.Text("", 10, 600, arcade.color.WHITE, 18)
+
+        def jump(self, tick):
+            tick = max(reader.first_tick, min(reader.last_tick, tick))
+            self.offset = reader.seek(tick, self.view)
+
+        def on_key_press(self, key, modifiers):
+            if key == arcade.key.SPACE:
+                self.paused = not self.paused
+            elif key == arcade.key.LEFT:
+                self.jump(self.view.state.tick - seek_ticks)
+            elif key == arcade.key.RIGHT:
+                self.jump(self.view.state.tick + seek_ticks)
+
+        def on_update(self, delta_time):
+            if self.paused or self.offset >= reader.end:
+                return
+            payload, self.offset = reader._payload_at(self.offset)
+            self.view.apply(payload)
+
+        def on_draw(self):
+            self.clear()
+            self.view.draw()
+            state = self.view.state
+            self.text.value = (f"Score: {state.score}  Wave: {state.wave}  "
+                               f"{state.tick / 60:6.1f}s / {reader.last_tick / 60:.1f}s")
+            self.text.draw()
+
+    ReplayWindow()
+    arcade.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重播串流工具")
+    parser.add_argument("command", choices=("info", "view"))
+    parser.add_argument("path", help="重播檔；info 可用 - 從 stdin 讀串流")
+    args = parser.parse_args()
+
+    if args.command == "view":
+        view(args.path)
+        return
+
+    if args.path == "-":
+        count = size = 0
+        first = last = None
+        for payload in stream(sys.stdin.buffer):
+            tick = netcode.payload_tick(payload)[1]
+            first = tick if first is None else first
+            last = tick
+            count += 1
+            size += _LEN.size + len(payload)
+        ticks = max((last or 0) - (first or 0) + 1, 1)
+        info = {"ticks": ticks, "bytes": size, "bytes_per_minute": size * TICKS_PER_MINUTE / ticks}
+    else:
+        reader = ReplayReader(args.path)
+        info = reader.stats()
+        reader.close()
+
+    print(f"{info['ticks']} ticks ({info['ticks'] / 60:.1f} s), {info['bytes']} bytes, "
+          f"{info['bytes_per_minute'] / 1024:.1f} KiB/min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+無畫面的權威遊戲伺服器（asyncio）
+
+每條連線是一個 session（一個遊戲模式實例）。所有 session 共用同一個
+固定頻率的 tick 迴圈：每 tick 依序 update 各 session，再把狀態以
+netcode 的 KEYFRAME / DELTA 送回用戶端。用戶端只送 HELLO 與方向輸入。
+
+    python server.py --host 127.0.0.1 --port 8765
+
+用戶端：PACMAN_SERVER=127.0.0.1:8765 python main.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import metrics
+import netcode
+from map_library import MapLibrary
+from models import ClassicMode, DynamicWallsMode, EndlessMode, WaveMode
+
+TICK_RATE = 60
+KEYFRAME_INTERVAL = 120         # 每 2 秒送一次完整狀態
+MAX_PENDING_BYTES = 64 * 1024   # 用戶端太慢時先不送，之後的 DELTA 會補上累積的差異
+
+MODES = {cls.MODE_ID: cls for cls in (ClassicMode, EndlessMode, WaveMode, DynamicWallsMode)}
+
+
+class Session:
+    def __init__(self, mode, writer):
+        self.mode = mode
+        self.writer = writer
+        self.encoder = netcode.StateEncoder(KEYFRAME_INTERVAL)
+        self.done = False   # 結束狀態已送出
+
+    def step(self, dt):
+        mode = self.mode
+        if not mode.finished:
+            mode.update(dt)
+        elif self.done:
+            return
+
+        if self.writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+            return
+        self.writer.write(netcode.frame(self.encoder.encode(mode)))
+        self.done = mode.finished
+
+
+class GameServer:
+    def __init__(self, tick_rate=TICK_RATE, map_library=None):
+        self.tick_rate = tick_rate
+        self.map_library = map_library
+        self.sessions = set()
+        self._next_session = 0    # metrics 的 session 標籤
+        self.tick_time = 0.0      # 最近一次 tick 更新所有 session 的耗時（秒）
+
+    async def handle_client(self, reader, writer):
+        frames = netcode.FrameReader()
+        session = None
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                for payload in frames.feed(data):
+                    kind, args = netcode.parse_client_message(payload)
+                    if kind == netcode.MSG_HELLO and session is None:
+                        mode = MODES[args[0]](self.map_library)
+                        netcode.check_map_size(mode.grid_width, mode.grid_height)
+                        session = Session(mode, writer)
+                        session.mode.metrics_session = self._next_session
+                        self._next_session += 1
+                        self.sessions.add(session)
+                    elif kind == netcode.MSG_INPUT and session is not None:
+                        dx, dy = (max(-1, min(1, v)) for v in args)
+                        session.mode.set_player_direction(dx, dy)
+        except ConnectionError:
+            pass
+        except (KeyError, ValueError) as e:
+            # 格式錯誤 / 未知模式的訊息、netcode 傳不了的超大地圖：記下來再斷線
+            print(f"dropping client {writer.get_extra_info('peername')}: {e!r}", file=sys.stderr)
+        finally:
+            self.sessions.discard(session)
+            if session is not None:
+                metrics.registry.end_session(session.mode)
+            writer.close()
+
+    async def run_ticks(self):
+        """固定 tick：落後時不補跑，直接對齊下一個 tick"""
+        loop = asyncio.get_running_loop()
+        period = 1 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            start = time.perf_counter()
+            for session in list(self.sessions):
+                session.step(period)
+            self.tick_time = time.perf_counter() - start
+
+            next_tick += period
+            now = loop.time()
+            if next_tick < now:
+                next_tick = now
+            await asyncio.sleep(next_tick - now)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await self.run_ticks()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pac-Man 無畫面遊戲伺服器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE)
+    parser.add_argument("--metrics-port", type=int, help="在 127.0.0.1 的這個埠提供 Prometheus 指標（/metrics）")
+    args = parser.parse_args()
+
+    if args.metrics_port is not None:
+        metrics.enable(args.metrics_port)
+
+    library_path = os.environ.get("PACMAN_MAP_LIBRARY")
+    map_library = MapLibrary(library_path) if library_path else None
+    server = GameServer(args.tick_rate, map_library)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        metrics.disable()
+
+
+if __name__ == "__main__":
+    main()
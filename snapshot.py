@@ -0,0 +1,252 @@
+"""
+遊戲狀態快照（save / resume / rewind / desync 二分搜尋用）
+
+二進位格式（little-endian）：
+    header   : magic "PMSS"、version u8、mode_id u8、width u16、height u16
+    state    : score i32、tick u32、finished u8、result u8
+    map      : width * height bytes（原始 tile 值 0~3）
+    pellets  : 一般豆子 bitset + Power Pellet bitset（各 ceil(w*h / 8) bytes）
+    player   : 位置、方向、排隊中的轉向、速度、次像素累加器、轉向緩衝剩餘 tick
+    ghosts   : 數量 u8，每隻固定欄位（含次像素累加器）+ recent_positions
+    rng      : random 模組的 Mersenne Twister 狀態
+    extra    : u32 長度 + 模式自訂資料（Wave 波次、Endless respawn 佇列…）
+
+所有浮點數用 f64 保存，restore 之後的模擬結果與原本逐位元相同。
+"""
+import random
+import struct
+
+MAGIC = b"PMSS"
+VERSION = 2
+
+GHOST_COLORS = ("red", "blue", "pink", "orange")
+GHOST_STATES = ("chase", "frightened", "eaten")
+AI_MODES = ("chase", "scatter", "patrol", "random_walk")
+RESULTS = (None, "GAME_OVER", "VICTORY")
+
+_HEADER = struct.Struct("<4sBBHH")
+_STATE = struct.Struct("<iIBB")
+_PLAYER = struct.Struct("<ddbbbbdBh")
+_GHOST = struct.Struct("<BddbbdBBBiiBiBddddHB")
+_RNG = struct.Struct("<625IBd")
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+
+# pellet_grid（0 / 1 / 2 / 3）→ '0' / '1' 字串，用 int(s, 2) 一次轉成 bitset
+_PELLET_BITS = bytes.maketrans(b"\x00\x01\x02\x03", b"0010")
+_POWER_BITS = bytes.maketrans(b"\x00\x01\x02\x03", b"0001")
+_BITS_TO_PELLET = bytes.maketrans(b"01", b"\x00\x02")
+_BITS_TO_POWER = bytes.maketrans(b"01", b"\x00\x03")
+
+
+def _bitset_size(n_cells):
+    return (n_cells + 7) // 8
+
+
+def pack_pellets(pellet_grid):
+    """pellet_grid → (一般豆子 bitset, Power Pellet bitset)"""
+    n = _bitset_size(len(pellet_grid))
+    raw = bytes(pellet_grid)
+    normal = int(raw.translate(_PELLET_BITS), 2) if raw else 0
+    power = int(raw.translate(_POWER_BITS), 2) if raw else 0
+    return normal.to_bytes(n, "big"), power.to_bytes(n, "big")
+
+
+def unpack_pellets(normal, power, n_cells):
+    """bitset → 與 pellet_grid 同格式的 bytes（0 / 2 / 3）"""
+    fmt = f"0{n_cells}b"
+    a = format(int.from_bytes(normal, "big"), fmt).encode().translate(_BITS_TO_PELLET)
+    b = format(int.from_bytes(power, "big"), fmt).encode().translate(_BITS_TO_POWER)
+    # 兩組 bitset 不會重疊，直接相加即為合併
+    merged = int.from_bytes(a, "big") + int.from_bytes(b, "big")
+    return merged.to_bytes(n_cells, "big")
+
+
+def diff_cells(current, target):
+    """回傳兩份等長 bytes 中內容不同的索引（只走訪有差異的位置）"""
+    if current == target:
+        return []
+    n = len(current)
+    x = int.from_bytes(current, "big") ^ int.from_bytes(target, "big")
+    cells = []
+    while x:
+        byte_pos = (x.bit_length() - 1) // 8
+        cells.append(n - 1 - byte_pos)
+        x &= ~(0xFF << (byte_pos * 8))
+    return cells
+
+
+def pack_player(player):
+    return _PLAYER.pack(
+        player.center_x, player.center_y,
+        int(player.change_x), int(player.change_y),
+        int(player.next_change_x), int(player.next_change_y),
+        player.speed,
+        player.move_acc,
+        -1 if player.turn_ticks_left is None else player.turn_ticks_left,
+    )
+
+
+def unpack_player(player, view, offset):
+    (x, y, cx, cy, nx, ny, speed, acc, ticks_left) = _PLAYER.unpack_from(view, offset)
+    player.center_x = x
+    player.center_y = y
+    player.change_x = cx
+    player.change_y = cy
+    player.next_change_x = nx
+    player.next_change_y = ny
+    player.speed = speed
+    player.move_acc = acc
+    player.turn_ticks_left = None if ticks_left < 0 else ticks_left
+    return offset + _PLAYER.size
+
+
+def pack_ghost(g):
+    patrol = g.patrol_target
+    recent = g.recent_positions
+    head = _GHOST.pack(
+        GHOST_COLORS.index(g.ghost_color),
+        g.center_x, g.center_y,
+        int(g.change_x), int(g.change_y),
+        g.speed,
+        g.move_acc,
+        GHOST_STATES.index(g.state),
+        int(g.alpha),
+        g.frightened_timer, g.frightened_duration,
+        AI_MODES.index(g.ai_mode),
+        g.mode_change_timer,
+        patrol is not None,
+        patrol[0] if patrol else 0.0,
+        patrol[1] if patrol else 0.0,
+        g.noise_offset, g.current_randomness,
+        g.stuck_counter,
+        len(recent),
+    )
+    flat = [v for pos in recent for v in pos]
+    return head + struct.pack(f"<{len(flat)}h", *flat)
+
+
+def read_ghost_color(view, offset):
+    return GHOST_COLORS[view[offset]]
+
+
+def unpack_ghost(g, view, offset):
+    (_, x, y, cx, cy, speed, acc, state, alpha, f_timer, f_duration,
+     ai_mode, mode_timer, has_patrol, px, py, noise, randomness,
+     stuck, n_recent) = _GHOST.unpack_from(view, offset)
+    offset += _GHOST.size
+
+    g.center_x = x
+    g.center_y = y
+    g.change_x = cx
+    g.change_y = cy
+    g.speed = speed
+    g.move_acc = acc
+    g.state = GHOST_STATES[state]
+    g.alpha = alpha
+    g.frightened_timer = f_timer
+    g.frightened_duration = f_duration
+    g.ai_mode = AI_MODES[ai_mode]
+    g.mode_change_timer = mode_timer
+    g.patrol_target = (px, py) if has_patrol else None
+    g.noise_offset = noise
+    g.current_randomness = randomness
+    g.stuck_counter = stuck
+
+    flat = struct.unpack_from(f"<{n_recent * 2}h", view, offset)
+    g.recent_positions = list(zip(flat[0::2], flat[1::2]))
+    return offset + 4 * n_recent
+
+
+def pack_rng():
+    _, internal, gauss = random.getstate()
+    return _RNG.pack(*internal, gauss is not None, gauss or 0.0)
+
+
+def unpack_rng(view, offset):
+    values = _RNG.unpack_from(view, offset)
+    gauss = values[626] if values[625] else None
+    random.setstate((3, values[:625], gauss))
+    return offset + _RNG.size
+
+
+def pack(mode):
+    """把 BaseMode 的完整狀態打包成 bytes"""
+    width, height = mode.grid_width, mode.grid_height
+    normal, power = pack_pellets(mode.pellet_grid)
+    extra = mode._pack_extra()
+
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, mode.MODE_ID, width, height),
+        _STATE.pack(mode.score, mode.tick, mode.finished, RESULTS.index(mode.result)),
+        mode.map_bytes,
+        normal,
+        power,
+        pack_player(mode.player),
+        _U8.pack(len(mode.ghosts)),
+    ]
+    parts.extend(pack_ghost(g) for g in mode.ghosts)
+    parts.append(pack_rng())
+    parts.append(_U32.pack(len(extra)))
+    parts.append(extra)
+    return b"".join(parts)
+
+
+def read_header(blob):
+    """檢查 magic / version，回傳 (mode_id, width, height)"""
+    magic, version, mode_id, width, height = _HEADER.unpack_from(blob, 0)
+    if magic != MAGIC:
+        raise ValueError("not a game snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version: {version}")
+    return mode_id, width, height
+
+
+def unpack(mode, blob):
+    """把 pack() 產生的 bytes 還原回 mode（原地更新，盡量重用既有 sprite）"""
+    mode_id, width, height = read_header(blob)
+    if mode_id != mode.MODE_ID:
+        raise ValueError(f"snapshot is for mode {mode_id}, not {mode.MODE_ID}")
+
+    view = memoryview(blob)
+    offset = _HEADER.size
+    score, tick, finished, result = _STATE.unpack_from(view, offset)
+    offset += _STATE.size
+
+    n_cells = width * height
+    map_bytes = bytes(view[offset:offset + n_cells])
+    offset += n_cells
+    if map_bytes != bytes(mode.map_bytes):
+        mode.build_world(map_bytes, width, height)
+
+    n_bits = _bitset_size(n_cells)
+    normal = view[offset:offset + n_bits]
+    power = view[offset + n_bits:offset + 2 * n_bits]
+    offset += 2 * n_bits
+    mode._apply_pellet_grid(unpack_pellets(normal, power, n_cells))
+
+    offset = unpack_player(mode.player, view, offset)
+
+    n_ghosts = view[offset]
+    offset += 1
+    ghost_offsets = []
+    colors = []
+    for _ in range(n_ghosts):
+        ghost_offsets.append(offset)
+        colors.append(read_ghost_color(view, offset))
+        n_recent = view[offset + _GHOST.size - 1]
+        offset += _GHOST.size + 4 * n_recent
+    ghosts = mode._match_ghosts(colors)
+    for g, g_offset in zip(ghosts, ghost_offsets):
+        unpack_ghost(g, view, g_offset)
+
+    offset = unpack_rng(view, offset)
+
+    (extra_len,) = _U32.unpack_from(view, offset)
+    offset += _U32.size
+    mode._unpack_extra(bytes(view[offset:offset + extra_len]))
+
+    mode.score = score
+    mode.tick = tick
+    mode.finished = bool(finished)
+    mode.result = RESULTS[result]
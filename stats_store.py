@@ -0,0 +1,133 @@
+"""
+本機排行榜與遊玩統計（SQLite，write-behind）
+
+所有 SQLite 操作都在背景執行緒上進行：
+- 遊戲結束時 record_session() 只把資料丟進 queue，不碰磁碟
+- 背景執行緒寫入後重新查詢該模式的排行榜 / 統計，更新快取
+- 選單只讀快取（top_scores / summary），永遠不會等 I/O
+"""
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "pacman_stats.sqlite3"
+LEADERBOARD_SIZE = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode          TEXT    NOT NULL,
+    score         INTEGER NOT NULL,
+    result        TEXT,
+    waves         INTEGER NOT NULL,
+    pellets_eaten INTEGER NOT NULL,
+    time_survived REAL    NOT NULL,
+    avg_tick_ms   REAL    NOT NULL,
+    created_at    REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_mode_score ON sessions (mode, score DESC);
+"""
+
+_STOP = object()
+
+
+class StatsStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = str(path)
+        self._queue = queue.Queue()
+
+        # 快取：mode → [(score, waves, time_survived), ...] / 統計 dict
+        self._leaderboards = {}
+        self._summaries = {}
+
+        self._thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+        self._thread.start()
+
+    # ---------------- 主執行緒 API（不阻塞） ----------------
+
+    def record_session(self, mode, score, result, waves, pellets_eaten,
+                       time_survived, avg_tick_ms):
+        """排入一筆遊戲紀錄，實際寫入由背景執行緒完成"""
+        self._queue.put_nowait((
+            mode, int(score), result, int(waves), int(pellets_eaten),
+            float(time_survived), float(avg_tick_ms), time.time(),
+        ))
+
+    def top_scores(self, mode):
+        """回傳快取中的排行榜（背景執行緒尚未載入時為空）"""
+        return self._leaderboards.get(mode, [])
+
+    def summary(self, mode):
+        """回傳快取中的模式統計（games / best / avg_score / max_waves / pellets）"""
+        return self._summaries.get(mode)
+
+    def close(self):
+        """等背景執行緒把 queue 寫完後結束"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    # ---------------- 背景執行緒 ----------------
+
+    def _run(self):
+        conn = sqlite3.connect(self.path)
+        conn.executescript(_SCHEMA)
+        for (mode,) in conn.execute("SELECT DISTINCT mode FROM sessions"):
+            self._refresh(conn, mode)
+
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # 一次把 queue 裡累積的紀錄寫進同一個 transaction
+            batch = [item]
+            stop = False
+            while True:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            with conn:
+                conn.executemany(
+                    "INSERT INTO sessions (mode, score, result, waves, pellets_eaten,"
+                    " time_survived, avg_tick_ms, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+            for mode in {row[0] for row in batch}:
+                self._refresh(conn, mode)
+            if stop:
+                break
+
+        conn.close()
+
+    def _refresh(self, conn, mode):
+        rows = conn.execute(
+            "SELECT score, waves, time_survived FROM sessions"
+            " WHERE mode = ? ORDER BY score DESC LIMIT ?",
+            (mode, LEADERBOARD_SIZE),
+        ).fetchall()
+        games, best, avg_score, max_waves, pellets = conn.execute(
+            "SELECT COUNT(*), MAX(score), AVG(score), MAX(waves), SUM(pellets_eaten)"
+            " FROM sessions WHERE mode = ?",
+            (mode,),
+        ).fetchone()
+
+        # 整個物件替換，主執行緒讀取時不需要鎖
+        self._leaderboards = {**self._leaderboards, mode: rows}
+        self._summaries = {**self._summaries, mode: {
+            "games": games,
+            "best": best or 0,
+            "avg_score": avg_score or 0.0,
+            "max_waves": max_waves or 0,
+            "pellets": pellets or 0,
+        }}
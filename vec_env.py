@@ -0,0 +1,460 @@
+"""
+向量化環境：用 NumPy 同步推進 N 場獨立的遊戲（訓練 / 評估 agent 用）。
+
+規則與 models/ 的三種模式相同（計分、Power Pellet、鬼被吃、Endless 重生、
+Wave 換圖加速），但不建立任何 arcade sprite：
+- 位置以整數像素（TILE_SIZE 單位）表示，y 軸向下（row 0 在最上方）
+- 移動逐像素推進，只在格子正中心決定轉向，出口查 map_library 的 exits bitmask
+- 鬼在格子中心以「離目標最近的出口」決策（帶隨機性），不跑 BFS
+
+    env = VecEnv(1024, mode="endless")
+    obs = env.reset()
+    obs, reward, done, info = env.step(actions)   # actions: (N,) 0=不變 1上 2下 3左 4右
+
+觀察預設每次回傳新的陣列（可以直接存進 replay buffer / n-step）。copy_obs=False 時省下這次複製，
+但每次 step() / reset() 回傳的都是同一組預先配置的陣列、原地改寫：要保留舊的觀察得自己 copy。
+"""
+import numpy as np
+
+from constants import GHOST_SPEED, PLAYER_SPEED, TILE_SIZE
+from map_library import (
+    EXIT_DOWN, EXIT_LEFT, EXIT_RIGHT, EXIT_UP, MapRecord, build_record,
+)
+
+MODES = ("classic", "endless", "wave")
+
+# 方向索引：0 = 停 / 1 上 / 2 下 / 3 左 / 4 右
+DX = np.array([0, 0, 0, -1, 1], dtype=np.int32)
+DY = np.array([0, -1, 1, 0, 0], dtype=np.int32)
+BIT = np.array([0, EXIT_UP, EXIT_DOWN, EXIT_LEFT, EXIT_RIGHT], dtype=np.uint8)
+REV = np.array([0, 2, 1, 4, 3], dtype=np.int8)
+
+# 與 BaseMode.load_map 相同的鬼順序
+GHOST_COLORS = ("red", "blue", "pink", "orange")
+NUM_GHOSTS = len(GHOST_COLORS)
+
+# info["result"] 代碼
+RESULT_NONE = 0
+RESULT_GAME_OVER = 1
+RESULT_VICTORY = 2
+RESULT_TRUNCATED = 3
+
+# 觀察格的 channel
+CH_WALL, CH_PELLET, CH_POWER, CH_PLAYER, CH_GHOST, CH_FRIGHTENED = range(6)
+NUM_CHANNELS = 6
+
+PELLET_SCORE = 10
+POWER_SCORE = 50
+GHOST_SCORE = 200
+WAVE_BONUS = 500
+
+FRIGHTENED_FRAMES = 600
+PELLET_RESPAWN_FRAMES = 15 * 60
+POWER_RESPAWN_FRAMES = 60 * 60
+GHOST_RESPAWN_FRAMES = 2 * 60
+
+GHOST_RANDOMNESS = 0.3   # 在路口隨機選方向的機率
+COLLIDE_DIST = TILE_SIZE * 3 // 4
+
+
+class VecEnv:
+    def __init__(self, num_envs, mode="classic", width=19, height=21, seed=0,
+                 map_library=None, pool_size=64, max_ticks=None, grid_obs=True, copy_obs=True):
+        if mode not in MODES:
+            raise ValueError(f"unknown mode: {mode}")
+        self.num_envs = n = int(num_envs)
+        self.mode = mode
+        self.max_ticks = max_ticks
+        self.grid_obs = grid_obs
+        self.copy_obs = copy_obs     # False：回傳的觀察是內部緩衝的 view，下一次 step() 會改寫
+        self.rng = np.random.default_rng(seed)
+
+        self._load_pool(map_library, width, height, seed, pool_size)
+        w, h = self.width, self.height
+        self.cells = cells = w * h
+        self._env_base = np.arange(n, dtype=np.int64) * cells
+        self._ghost_base = np.repeat(self._env_base, NUM_GHOSTS)
+
+        # 每場的地圖狀態（攤平成 N * H * W）
+        self.map_id = np.zeros(n, dtype=np.int64)
+        self.exits = np.zeros(n * cells, dtype=np.uint8)
+        self.pellets = np.zeros(n * cells, dtype=np.uint8)
+        self.pellet_timer = np.zeros(n * cells, dtype=np.int32)
+        self.pellet_count = np.zeros(n, dtype=np.int32)
+
+        # 玩家
+        self.px = np.zeros(n, dtype=np.int32)
+        self.py = np.zeros(n, dtype=np.int32)
+        self.pdir = np.zeros(n, dtype=np.int8)
+        self.want = np.zeros(n, dtype=np.int8)
+        self.p_acc = np.zeros(n, dtype=np.int32)
+        self.p_speed = int(round(PLAYER_SPEED * 256))
+
+        # 鬼（N * G 攤平）
+        g = n * NUM_GHOSTS
+        self.gx = np.zeros(g, dtype=np.int32)
+        self.gy = np.zeros(g, dtype=np.int32)
+        self.gdir = np.zeros(g, dtype=np.int8)
+        self.g_acc = np.zeros(g, dtype=np.int32)
+        self.g_alive = np.zeros(g, dtype=bool)
+        self.g_frightened = np.zeros(g, dtype=np.int32)
+        self.g_scatter = np.zeros(g, dtype=bool)
+        self.g_mode_timer = np.zeros(g, dtype=np.int32)
+        self.g_respawn = np.zeros(g, dtype=np.int32)
+        self.g_spawn = np.zeros((g, 2), dtype=np.int32)
+        self.g_color = np.tile(np.arange(NUM_GHOSTS), n)
+
+        # 計分 / 進度
+        self.score = np.zeros(n, dtype=np.int64)
+        self.wave = np.ones(n, dtype=np.int32)
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.g_speed = np.zeros(n, dtype=np.int32)
+        self.frightened_duration = np.zeros(n, dtype=np.int32)
+
+        self._grid = np.zeros((n, NUM_CHANNELS, h, w), dtype=np.uint8)
+        self._positions = np.zeros((n, 1 + NUM_GHOSTS, 2), dtype=np.float32)
+
+        # 散開目標：四個角落（格子中心像素）
+        corners = [(2, 2), (w - 3, 2), (2, h - 3), (w - 3, h - 3)]
+        self._scatter = np.array(
+            [(c * TILE_SIZE + TILE_SIZE // 2, r * TILE_SIZE + TILE_SIZE // 2) for c, r in corners],
+            dtype=np.int32,
+        )
+
+    # ---------------- 地圖池 ----------------
+
+    def _load_pool(self, map_library, width, height, seed, pool_size):
+        if map_library is not None:
+            records = [map_library.record(i) for i in range(len(map_library))]
+        else:
+            records = [
+                MapRecord(s, width, height, NUM_GHOSTS,
+                          memoryview(build_record(s, width, height, NUM_GHOSTS)))
+                for s in range(seed, seed + pool_size)
+            ]
+
+        self.width = records[0].width
+        self.height = records[0].height
+        self._pool_tiles = np.stack([np.frombuffer(r.tiles, dtype=np.uint8) for r in records])
+        self._pool_exits = np.stack([np.frombuffer(r.exits, dtype=np.uint8) for r in records])
+        self._pool_walls = (self._pool_tiles == 1).reshape(len(records), self.height, self.width)
+        self._pool_player = np.array([r.player_spawn for r in records], dtype=np.int32)
+        self._pool_ghosts = np.array([r.ghost_spawns[:NUM_GHOSTS] for r in records], dtype=np.int32)
+        self._pool_pellets = np.where(self._pool_tiles >= 2, self._pool_tiles, 0).astype(np.uint8)
+        self._pool_pellet_count = (self._pool_pellets > 0).sum(axis=1).astype(np.int32)
+
+    # ---------------- reset ----------------
+
+    def reset(self):
+        """重設所有場次，回傳觀察"""
+        self._reset_envs(np.arange(self.num_envs))
+        return self._observe()
+
+    def _reset_envs(self, envs, keep_progress=False):
+        """重設指定場次；keep_progress=True 時保留分數與波次（Wave 換圖）"""
+        if len(envs) == 0:
+            return
+        cells = self.cells
+        k = self.rng.integers(0, len(self._pool_tiles), size=len(envs))
+        self.map_id[envs] = k
+
+        rows = self._env_base[envs][:, None] + np.arange(cells)
+        self.exits[rows] = self._pool_exits[k]
+        self.pellets[rows] = self._pool_pellets[k]
+        self.pellet_timer[rows] = 0
+        self.pellet_count[envs] = self._pool_pellet_count[k]
+
+        half = TILE_SIZE // 2
+        spawn = self._pool_player[k]
+        self.px[envs] = spawn[:, 0] * TILE_SIZE + half
+        self.py[envs] = spawn[:, 1] * TILE_SIZE + half
+        self.pdir[envs] = 0
+        self.want[envs] = 0
+        self.p_acc[envs] = 0
+
+        if not keep_progress:
+            self.score[envs] = 0
+            self.wave[envs] = 1
+            self.tick[envs] = 0
+
+        # Wave 模式依波次強化鬼（速度 +15% / 波，驚嚇時間縮短）
+        factor = 1.0 + 0.15 * (self.wave[envs] - 1) if self.mode == "wave" else 1.0
+        self.g_speed[envs] = np.round(GHOST_SPEED * factor * 256).astype(np.int32)
+        duration = FRIGHTENED_FRAMES - 60 * (self.wave[envs] - 1) if self.mode == "wave" else FRIGHTENED_FRAMES
+        self.frightened_duration[envs] = np.maximum(180, duration)
+
+        gi = (envs[:, None] * NUM_GHOSTS + np.arange(NUM_GHOSTS)).ravel()
+        g_spawn = self._pool_ghosts[k].reshape(-1, 2)
+        self.g_spawn[gi] = g_spawn * TILE_SIZE + half
+        self.gx[gi] = self.g_spawn[gi, 0]
+        self.gy[gi] = self.g_spawn[gi, 1]
+        self.gdir[gi] = 0
+        self.g_acc[gi] = 0
+        self.g_alive[gi] = True
+        self.g_frightened[gi] = 0
+        self.g_scatter[gi] = False
+        self.g_mode_timer[gi] = self.rng.integers(120, 301, size=len(gi))
+        self.g_respawn[gi] = 0
+
+    # ---------------- step ----------------
+
+    def step(self, actions):
+        """推進一個 tick；回傳 (obs, reward, done, info)"""
+        actions = np.asarray(actions, dtype=np.int8)
+        self.want = np.where(actions > 0, actions, self.want)
+        prev_score = self.score.copy()
+        self.tick += 1
+
+        self._update_timers()
+        self._move_player()
+        self._move_ghosts()
+
+        result = np.zeros(self.num_envs, dtype=np.int8)
+        self._eat_pellets()
+        self._collide(result)
+        self._check_progress(result)
+
+        if self.max_ticks is not None:
+            result[(result == RESULT_NONE) & (self.tick >= self.max_ticks)] = RESULT_TRUNCATED
+
+        reward = (self.score - prev_score).astype(np.float32)
+        done = result != RESULT_NONE
+        info = {"result": result, "score": self.score.copy(), "wave": self.wave.copy()}
+
+        # 自動重設結束的場次
+        self._reset_envs(np.flatnonzero(done))
+        return self._observe(), reward, done, info
+
+    def _update_timers(self):
+        self.g_frightened = np.maximum(self.g_frightened - 1, 0)
+
+        self.g_mode_timer -= 1
+        flip = np.flatnonzero(self.g_mode_timer <= 0)
+        if len(flip):
+            self.g_scatter[flip] = self.rng.random(len(flip)) < 0.4
+            self.g_mode_timer[flip] = self.rng.integers(120, 301, size=len(flip))
+
+        if self.mode == "endless":
+            # 豆子重生
+            active = np.flatnonzero(self.pellet_timer)
+            if len(active):
+                self.pellet_timer[active] -= 1
+                ready = active[self.pellet_timer[active] == 0]
+                if len(ready):
+                    env = ready // self.cells
+                    self.pellets[ready] = self._pool_pellets[self.map_id[env], ready % self.cells]
+                    np.add.at(self.pellet_count, env, 1)
+
+            # 鬼重生
+            waiting = np.flatnonzero(self.g_respawn)
+            if len(waiting):
+                self.g_respawn[waiting] -= 1
+                ready = waiting[self.g_respawn[waiting] == 0]
+                if len(ready):
+                    self.gx[ready] = self.g_spawn[ready, 0]
+                    self.gy[ready] = self.g_spawn[ready, 1]
+                    self.gdir[ready] = 0
+                    self.g_frightened[ready] = 0
+                    self.g_alive[ready] = True
+
+    def _move_player(self):
+        self.p_acc += self.p_speed
+        steps = self.p_acc >> 8
+        self.p_acc &= 255
+        half = TILE_SIZE // 2
+
+        for s in range(int(steps.max(initial=0))):
+            idx = np.flatnonzero(steps > s)
+            px, py = self.px[idx], self.py[idx]
+            want, pdir = self.want[idx], self.pdir[idx]
+
+            # 任何時候都可以直接回頭
+            pdir = np.where((want > 0) & (want == REV[pdir]), want, pdir)
+
+            centre = ((px % TILE_SIZE) == half) & ((py % TILE_SIZE) == half)
+            c = np.flatnonzero(centre)
+            if len(c):
+                cell = (py[c] // TILE_SIZE) * self.width + px[c] // TILE_SIZE
+                ex = self.exits[self._env_base[idx[c]] + cell]
+                d = pdir[c]
+                d = np.where((ex & BIT[want[c]]) != 0, want[c], d)
+                d = np.where((ex & BIT[d]) == 0, 0, d)
+                pdir[c] = d
+
+            self.pdir[idx] = pdir
+            self.px[idx] = px + DX[pdir]
+            self.py[idx] = py + DY[pdir]
+
+    def _ghost_targets(self):
+        """依個性計算每隻鬼的目標（像素座標）"""
+        px = np.repeat(self.px, NUM_GHOSTS)
+        py = np.repeat(self.py, NUM_GHOSTS)
+        pdir = np.repeat(self.pdir, NUM_GHOSTS)
+        tx, ty = px.copy(), py.copy()
+
+        color = self.g_color
+        # pink：埋伏玩家前方 4 格
+        pink = color == 2
+        tx[pink] += DX[pdir[pink]] * 4 * TILE_SIZE
+        ty[pink] += DY[pdir[pink]] * 4 * TILE_SIZE
+
+        # blue：以紅鬼為基準包抄（2 * player - red）
+        blue = np.flatnonzero(color == 1)
+        red = blue - 1
+        tx[blue] = np.where(self.g_alive[red], 2 * px[blue] - self.gx[red], px[blue])
+        ty[blue] = np.where(self.g_alive[red], 2 * py[blue] - self.gy[red], py[blue])
+
+        # orange：靠近玩家 8 格內就躲回角落
+        dx = self.gx - px
+        dy = self.gy - py
+        shy = (color == 3) & (dx * dx + dy * dy < (8 * TILE_SIZE) ** 2)
+
+        scatter = self.g_scatter | shy
+        corner = self._scatter[color]
+        tx = np.where(scatter, corner[:, 0], tx)
+        ty = np.where(scatter, corner[:, 1], ty)
+        return tx, ty
+
+    def _move_ghosts(self):
+        self.g_acc += np.repeat(self.g_speed, NUM_GHOSTS)
+        steps = np.where(self.g_alive, self.g_acc >> 8, 0)
+        self.g_acc &= 255
+        max_steps = int(steps.max(initial=0))
+        if max_steps == 0:
+            return
+
+        tx, ty = self._ghost_targets()
+        half = TILE_SIZE // 2
+        dirs = np.arange(1, 5, dtype=np.int8)
+
+        for s in range(max_steps):
+            idx = np.flatnonzero(steps > s)
+            gx, gy, gdir = self.gx[idx], self.gy[idx], self.gdir[idx]
+
+            centre = ((gx % TILE_SIZE) == half) & ((gy % TILE_SIZE) == half)
+            c = np.flatnonzero(centre)
+            if len(c):
+                gi = idx[c]
+                cx, cy = gx[c], gy[c]
+                cell = (cy // TILE_SIZE) * self.width + cx // TILE_SIZE
+                ex = self.exits[self._ghost_base[gi] + cell]
+
+                # 候選出口（不走回頭路；死路時才允許回頭）
+                valid = (ex[:, None] & BIT[1:][None, :]) != 0
+                no_back = valid & (dirs[None, :] != REV[gdir[c]][:, None])
+                valid = np.where(no_back.any(axis=1)[:, None], no_back, valid)
+
+                nx = cx[:, None] + DX[1:][None, :] * TILE_SIZE - tx[gi][:, None]
+                ny = cy[:, None] + DY[1:][None, :] * TILE_SIZE - ty[gi][:, None]
+                cost = (nx * nx + ny * ny).astype(np.float64)
+
+                random_pick = (self.g_frightened[gi] > 0) | (self.rng.random(len(gi)) < GHOST_RANDOMNESS)
+                if random_pick.any():
+                    cost[random_pick] = self.rng.random((int(random_pick.sum()), 4))
+
+                cost[~valid] = np.inf
+                choice = dirs[np.argmin(cost, axis=1)]
+                gdir[c] = np.where(valid.any(axis=1), choice, 0)
+
+            self.gdir[idx] = gdir
+            self.gx[idx] = gx + DX[gdir]
+            self.gy[idx] = gy + DY[gdir]
+
+    def _eat_pellets(self):
+        cell = (self.py // TILE_SIZE) * self.width + self.px // TILE_SIZE
+        flat = self._env_base + cell
+        kind = self.pellets[flat]
+        hit = np.flatnonzero(kind)
+        if len(hit) == 0:
+            return
+
+        flat_hit = flat[hit]
+        kind_hit = kind[hit]
+        self.pellets[flat_hit] = 0
+        self.pellet_count[hit] -= 1
+        self.score[hit] += np.where(kind_hit == 3, POWER_SCORE, PELLET_SCORE)
+
+        if self.mode == "endless":
+            self.pellet_timer[flat_hit] = np.where(
+                kind_hit == 3, POWER_RESPAWN_FRAMES, PELLET_RESPAWN_FRAMES
+            )
+
+        power = hit[kind_hit == 3]
+        if len(power):
+            gi = (power[:, None] * NUM_GHOSTS + np.arange(NUM_GHOSTS)).ravel()
+            alive = gi[self.g_alive[gi]]
+            self.g_frightened[alive] = np.repeat(self.frightened_duration[power], NUM_GHOSTS)[self.g_alive[gi]]
+
+    def _collide(self, result):
+        px = np.repeat(self.px, NUM_GHOSTS)
+        py = np.repeat(self.py, NUM_GHOSTS)
+        touch = self.g_alive & (np.abs(self.gx - px) < COLLIDE_DIST) & (np.abs(self.gy - py) < COLLIDE_DIST)
+        gi = np.flatnonzero(touch)
+        if len(gi) == 0:
+            return
+
+        env = gi // NUM_GHOSTS
+        eaten = self.g_frightened[gi] > 0
+        ge = gi[eaten]
+        if len(ge):
+            self.g_alive[ge] = False
+            self.g_frightened[ge] = 0
+            np.add.at(self.score, env[eaten], GHOST_SCORE)
+            if self.mode == "endless":
+                self.g_respawn[ge] = GHOST_RESPAWN_FRAMES
+
+        result[env[~eaten]] = RESULT_GAME_OVER
+
+    def _check_progress(self, result):
+        if self.mode == "endless":
+            return
+        cleared = np.flatnonzero((self.pellet_count == 0) & (result == RESULT_NONE))
+        if len(cleared) == 0:
+            return
+
+        if self.mode == "classic":
+            result[cleared] = RESULT_VICTORY
+        else:
+            self.score[cleared] += WAVE_BONUS * self.wave[cleared]
+            self.wave[cleared] += 1
+            self._reset_envs(cleared, keep_progress=True)
+
+    # ---------------- 觀察 ----------------
+
+    def _observe(self):
+        """
+        回傳 dict：
+        - "positions": (N, 1 + G, 2) float32，玩家與鬼的位置（格子單位，死亡的鬼為 -1）
+        - "grid"     : (N, C, H, W) uint8，grid_obs=True 時才有
+        copy_obs=False 時兩者都是每次重用的內部緩衝
+        """
+        pos = self._positions
+        scale = 1.0 / TILE_SIZE
+        pos[:, 0, 0] = self.px * scale - 0.5
+        pos[:, 0, 1] = self.py * scale - 0.5
+        gx = np.where(self.g_alive, self.gx * scale - 0.5, -1.0).reshape(-1, NUM_GHOSTS)
+        gy = np.where(self.g_alive, self.gy * scale - 0.5, -1.0).reshape(-1, NUM_GHOSTS)
+        pos[:, 1:, 0] = gx
+        pos[:, 1:, 1] = gy
+        obs = {"positions": pos}
+
+        if self.grid_obs:
+            n, h, w = self.num_envs, self.height, self.width
+            grid = self._grid
+            grid[:, CH_WALL] = self._pool_walls[self.map_id]
+            pellets = self.pellets.reshape(n, h, w)
+            np.equal(pellets, 2, out=grid[:, CH_PELLET], casting="unsafe")
+            np.equal(pellets, 3, out=grid[:, CH_POWER], casting="unsafe")
+
+            grid[:, CH_PLAYER:] = 0
+            env = np.arange(n)
+            grid[env, CH_PLAYER, self.py // TILE_SIZE, self.px // TILE_SIZE] = 1
+
+            alive = np.flatnonzero(self.g_alive)
+            channel = np.where(self.g_frightened[alive] > 0, CH_FRIGHTENED, CH_GHOST)
+            grid[alive // NUM_GHOSTS, channel,
+                 self.gy[alive] // TILE_SIZE, self.gx[alive] // TILE_SIZE] = 1
+            obs["grid"] = grid
+        if self.copy_obs:
+            return {key: value.copy() for key, value in obs.items()}
+        return obs